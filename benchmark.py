@@ -1,205 +1,928 @@
 #!/usr/bin/env python3
 """
-Script de benchmark para comparar performance CPU vs GPU
+Suite de benchmark por etapa do detector de silêncio
+
+Mede separadamente decodificação, transferência, envelope, limiar, corte e
+codificação, para arquivos de segundos a horas e lotes de 1 a 1000
+arquivos. Todos os backends rodam o mesmo algoritmo (soma acumulada do
+envelope de manage-silence.py); os resultados vão para um JSON que pode
+ser comparado com uma linha de base para detectar regressões. Com --check,
+verifica que todos os backends decidem exatamente os mesmos cortes (e que o
+batch_size de um perfil de ajuste não desvia o --inplace-wav); com
+--check-startup, que importar manage-silence.py e rodar --help cabem no
+orçamento de tempo de inicialização; com --check-distributed N, que N
+workers locais no modo --distributed dividem os arquivos sem repetir
+nenhum e retomam o trabalho de um worker morto; com --check-watch, que o
+modo --watch corta cada arquivo uma vez só, mesmo depois de reiniciar; com
+--check-stream-copy, que --stream-copy corta MP3/M4A/AAC sem recodificar.
+
+Exemplos:
+    python benchmark.py --output resultados.json
+    python benchmark.py --preset full --backends numpy,numba,torch-cpu,cuda
+    python benchmark.py --compare baseline.json --tolerance 10
+    python benchmark.py --check
+    python benchmark.py --check-startup --startup-budget 0.5
+    python benchmark.py --check-distributed 4
+    python benchmark.py --check-watch
+    python benchmark.py --check-stream-copy
 """
 
-import time
 import os
-import torch
-import numpy as np
 import sys
-sys.path.append('.')
-from manage_silence import GPUAudioProcessor
-import librosa
+import re
+import json
+import hashlib
+import time
+import argparse
+import platform
+import shutil
+import signal
+import tempfile
+import subprocess
+import importlib.util
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
 import soundfile as sf
 
-def create_test_audio(duration_seconds=60, sample_rate=44100, output_path="test_audio.wav"):
-    """Cria um arquivo de áudio de teste com silêncio no início e fim"""
-    
-    # Gera áudio de teste
-    t = np.linspace(0, duration_seconds, int(duration_seconds * sample_rate))
-    
-    # Sinal principal (música simulada)
-    main_signal = (
-        0.3 * np.sin(2 * np.pi * 440 * t) +  # Nota A4
-        0.2 * np.sin(2 * np.pi * 880 * t) +  # Nota A5
-        0.1 * np.sin(2 * np.pi * 220 * t)    # Nota A3
-    )
-    
-    # Adiciona silêncio no início (5 segundos)
-    silence_start = np.zeros(int(5 * sample_rate))
-    
-    # Adiciona silêncio no fim (3 segundos)
-    silence_end = np.zeros(int(3 * sample_rate))
-    
-    # Combina tudo
-    full_audio = np.concatenate([silence_start, main_signal, silence_end])
-    
-    # Salva arquivo
-    sf.write(output_path, full_audio, sample_rate)
-    print(f"✅ Arquivo de teste criado: {output_path} ({len(full_audio)/sample_rate:.1f}s)")
-    
+STAGES = ['decode', 'transfer', 'envelope', 'threshold', 'slice', 'encode']
+
+# Módulos que manage-silence.py só pode importar quando precisa deles
+HEAVY_MODULES = ['torch', 'librosa', 'numba', 'scipy']
+
+# Durações (s) de arquivo único e tamanhos de lote de cada preset
+PRESETS = {
+    'quick': {'durations': [1, 10, 60], 'batch_sizes': [1, 10, 100]},
+    'full': {'durations': [1, 60, 600, 3600], 'batch_sizes': [1, 10, 100, 1000]},
+}
+
+SILENCE_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'manage-silence.py')
+
+def load_silence_module():
+    """Carrega manage-silence.py (o hífen no nome impede um import normal)"""
+    if 'manage_silence' in sys.modules:
+        return sys.modules['manage_silence']
+    path = SILENCE_SCRIPT
+    spec = importlib.util.spec_from_file_location('manage_silence', path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules['manage_silence'] = module
+    spec.loader.exec_module(module)
+    return module
+
+def create_test_audio(duration_seconds=60, sample_rate=44100, output_path="test_audio.wav",
+                      seed: int = 0, block_seconds: int = 10):
+    """
+    Cria um arquivo de áudio de teste com silêncio no início, no meio e no fim
+
+    O arquivo é gerado e gravado em blocos, então durações de horas não
+    precisam caber em memória. Os silêncios têm um ruído de fundo leve.
+    """
+    rng = np.random.default_rng(seed)
+    total = int(duration_seconds * sample_rate)
+
+    # Silêncio: 10% no início, 5% no fim e uma pausa de 10% no meio
+    silent = [(0, int(0.10 * total)),
+              (int(0.45 * total), int(0.55 * total)),
+              (total - int(0.05 * total), total)]
+
+    with sf.SoundFile(output_path, 'w', sample_rate, 1, 'PCM_16') as output:
+        block = block_seconds * sample_rate
+        for offset in range(0, total, block):
+            index = np.arange(offset, min(offset + block, total))
+            t = index / sample_rate
+
+            # Sinal principal (música simulada)
+            signal = (
+                0.3 * np.sin(2 * np.pi * 440 * t) +  # Nota A4
+                0.2 * np.sin(2 * np.pi * 880 * t) +  # Nota A5
+                0.1 * np.sin(2 * np.pi * 220 * t)    # Nota A3
+            )
+            for start, end in silent:
+                signal[(index >= start) & (index < end)] = 0.0
+            signal += 0.0005 * rng.standard_normal(len(signal))
+            output.write(signal)
+
     return output_path
 
-def benchmark_cpu_processing(file_path):
-    """Benchmark do processamento CPU (simulado)"""
-    print("\n🖥️  BENCHMARK CPU")
-    print("-" * 40)
-    
-    start_time = time.time()
-    
-    # Simula processamento CPU tradicional
-    audio_data, sr = librosa.load(file_path, sr=None)
-    
-    # Detecção de silêncio simples (CPU)
-    threshold = 10 ** (-40 / 20)  # -40 dB
-    
-    # Encontra regiões não-silenciosas
-    non_silent = np.abs(audio_data) > threshold
-    
-    if non_silent.any():
-        start_idx = np.where(non_silent)[0][0]
-        end_idx = np.where(non_silent)[0][-1]
-        trimmed_audio = audio_data[start_idx:end_idx]
-    else:
-        trimmed_audio = audio_data
-    
-    cpu_time = time.time() - start_time
-    
-    print(f"⏱️  Tempo CPU: {cpu_time:.3f}s")
-    print(f"📊 Duração original: {len(audio_data)/sr:.1f}s")
-    print(f"📊 Duração processada: {len(trimmed_audio)/sr:.1f}s")
-    
-    return cpu_time, len(trimmed_audio)
-
-def benchmark_gpu_processing(file_path):
-    """Benchmark do processamento GPU"""
-    print("\n🚀 BENCHMARK GPU")
-    print("-" * 40)
-    
-    start_time = time.time()
-    
-    # Usa o processador GPU otimizado
-    processor = GPUAudioProcessor(silence_threshold_db=-40)
-    
-    # Carrega e processa
-    audio_data, sr = librosa.load(file_path, sr=None)
-    audio_tensor = torch.from_numpy(audio_data).float().to(processor.device)
-    
-    start_idx, end_idx = processor.detect_silence_gpu(audio_tensor, sr)
-    trimmed_tensor = audio_tensor[start_idx:end_idx]
-    
-    gpu_time = time.time() - start_time
-    
-    print(f"⏱️  Tempo GPU: {gpu_time:.3f}s")
-    print(f"📊 Duração original: {len(audio_data)/sr:.1f}s")
-    print(f"📊 Duração processada: {len(trimmed_tensor)/sr:.1f}s")
-    print(f"🎯 Dispositivo: {processor.device}")
-    
-    return gpu_time, len(trimmed_tensor)
-
-def run_comprehensive_benchmark():
-    """Executa benchmark completo"""
-    print("🏁 BENCHMARK COMPLETO - CPU vs GPU")
-    print("=" * 60)
-    
-    # Verifica se GPU está disponível
-    if not torch.cuda.is_available():
-        print("⚠️  GPU não disponível - executando apenas teste CPU")
-        gpu_available = False
-    else:
-        gpu_available = True
-        print(f"🚀 GPU detectada: {torch.cuda.get_device_name()}")
-    
-    # Cria arquivos de teste de diferentes tamanhos
-    test_files = []
-    durations = [30, 60, 120, 300]  # 30s, 1min, 2min, 5min
-    
-    print(f"\n📁 Criando arquivos de teste...")
+def available_backends() -> List[str]:
+    """Backends que podem rodar nesta máquina (importa o PyTorch, se instalado)"""
+    backends = ['numpy']
+    if importlib.util.find_spec('numba') is not None:
+        backends.append('numba')
+    if importlib.util.find_spec('torch') is not None:
+        torch = load_silence_module().load_torch()
+        backends.append('torch-cpu')
+        if torch.cuda.is_available():
+            backends.append('cuda')
+    return backends
+
+def make_backend(ms, name: str):
+    """Backend de detecção de manage-silence.py correspondente ao nome do benchmark"""
+    if name == 'numpy':
+        return ms.NumpyBackend()
+    if name == 'numba':
+        return ms.NumbaBackend()
+    torch = ms.load_torch()
+    return ms.TorchBackend(torch.device('cuda' if name == 'cuda' else 'cpu'))
+
+def run_case(ms, processor, backend, file_paths: List[str],
+             work_dir: str) -> Tuple[Dict[str, float], List[List[Tuple[int, int]]], List[int]]:
+    """
+    Executa uma vez o fluxo completo de um caso, medindo cada etapa
+
+    Args:
+        ms: Módulo manage-silence carregado
+        processor: GPUAudioProcessor com os parâmetros de detecção
+        backend: Backend de detecção (ver make_backend)
+        file_paths: Arquivos do lote (o mesmo arquivo pode se repetir)
+        work_dir: Pasta para os arquivos codificados
+
+    Returns:
+        Tuple com (segundos por etapa, trechos mantidos de cada arquivo, taxa de cada arquivo)
+    """
+    timings = dict.fromkeys(STAGES, 0.0)
+
+    started = time.perf_counter()
+    decoded = [ms.load_mono(file_path) for file_path in file_paths]
+    audios = [audio for audio, _ in decoded]
+    sample_rates = [sr for _, sr in decoded]
+    timings['decode'] = time.perf_counter() - started
+
+    lengths = [len(audio) for audio in audios]
+    masks = [None] * len(audios)
+
+    # Mesmo agrupamento de detect_silence_batch: um lote por taxa de amostragem
+    groups = {}
+    for i, sr in enumerate(sample_rates):
+        groups.setdefault(sr, []).append(i)
+
+    threshold = processor.db_to_amplitude(processor.silence_threshold_db)
+    for sr, indices in groups.items():
+        window_size, hop_length = processor.window_params(sr)
+
+        # Empacota no host e transfere o lote de uma vez
+        started = time.perf_counter()
+        packed = np.zeros((len(indices), max(lengths[i] for i in indices)), dtype=np.float32)
+        for row, i in enumerate(indices):
+            packed[row, :lengths[i]] = audios[i]
+        batch = backend.transfer(packed)
+        backend.synchronize()
+        timings['transfer'] += time.perf_counter() - started
+
+        started = time.perf_counter()
+        energy = backend.energy(batch, window_size, hop_length)
+        backend.synchronize()
+        timings['envelope'] += time.perf_counter() - started
+
+        started = time.perf_counter()
+        mask = backend.mask(energy, threshold)
+        for row, i in enumerate(indices):
+            masks[i] = mask[row, :lengths[i] // hop_length + 1]
+        timings['threshold'] += time.perf_counter() - started
+        del batch, energy
+
+    started = time.perf_counter()
+    segments = [processor.segments_from_window_mask(mask, sr, n)
+                for mask, sr, n in zip(masks, sample_rates, lengths)]
+    trimmed = [np.concatenate([audio[start:end] for start, end in segs])
+               for audio, segs in zip(audios, segments)]
+    timings['slice'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for i, (audio, sr) in enumerate(zip(trimmed, sample_rates)):
+        sf.write(os.path.join(work_dir, f"out_{i}.wav"), audio, sr)
+    timings['encode'] = time.perf_counter() - started
+
+    return timings, segments, sample_rates
+
+def benchmark_case(ms, processor, backend: str, name: str, file_paths: List[str],
+                   audio_seconds: float, repeat: int, work_dir: str) -> Dict:
+    """Repete um caso e resume cada etapa pela mediana"""
+    implementation = make_backend(ms, backend)
+    runs = []
+    for _ in range(repeat):
+        timings, segments, sample_rates = run_case(ms, processor, implementation, file_paths, work_dir)
+        runs.append(timings)
+
+    stages = {stage: float(np.median([run[stage] for run in runs])) for stage in STAGES}
+    total = sum(stages.values())
+    return {
+        'key': f"{backend}/{name}",
+        'case': name,
+        'backend': backend,
+        'audio_seconds': audio_seconds,
+        'files': len(file_paths),
+        'repeat': repeat,
+        'stages': stages,
+        'total': total,
+        'throughput': audio_seconds / total if total > 0 else 0.0,
+        'stage_throughput': {stage: audio_seconds / seconds if seconds > 0 else None
+                             for stage, seconds in stages.items()},
+        'kept_seconds': sum((end - start) / sr for segs, sr in zip(segments, sample_rates)
+                            for start, end in segs),
+        # Resumo dos cortes de todos os arquivos, para comparar backends
+        'segments_digest': hashlib.sha1(json.dumps(segments).encode()).hexdigest(),
+    }
+
+def synthetic_cases(args: argparse.Namespace, work_dir: str) -> List[Tuple[str, List[str], float]]:
+    """Gera os arquivos de teste: um por duração, e lotes de cópias do arquivo curto"""
+    durations = sorted(set(args.durations) | {args.batch_duration})
+    test_files = {}
     for duration in durations:
-        filename = f"test_{duration}s.wav"
-        create_test_audio(duration, output_path=filename)
-        test_files.append((filename, duration))
-    
-    # Executa benchmarks
+        path = os.path.join(work_dir, f"test_{duration:g}s.wav")
+        test_files[duration] = create_test_audio(duration, args.sample_rate, path, seed=args.seed)
+
+    cases = [(f"{duration:g}s/x1", [test_files[duration]], duration) for duration in args.durations]
+    for files in args.batch_sizes:
+        name = f"{args.batch_duration:g}s/x{files}"
+        if name not in [case[0] for case in cases]:
+            cases.append((name, [test_files[args.batch_duration]] * files, args.batch_duration * files))
+    return cases
+
+def corpus_cases(corpus_dir: str, batch: int) -> List[Tuple[str, List[str], float]]:
+    """Casos a partir de um corpus de generate_corpus.py, em lotes de `batch` arquivos"""
+    with open(os.path.join(corpus_dir, 'manifest.json')) as f:
+        entries = json.load(f)['files']
+
+    cases = []
+    for first in range(0, len(entries), batch):
+        chunk = entries[first:first + batch]
+        name = f"corpus/{first:05d}-{first + len(chunk) - 1:05d}"
+        cases.append((name, [os.path.join(corpus_dir, entry['file']) for entry in chunk],
+                      sum(entry['frames'] / entry['sample_rate'] for entry in chunk)))
+    return cases
+
+def run_suite(args: argparse.Namespace) -> Dict:
+    """Gera os arquivos de teste e mede todos os casos em todos os backends"""
+    ms = load_silence_module()
+    processor = ms.GPUAudioProcessor(silence_threshold_db=args.threshold_db,
+                                     remove_internal_silence=args.remove_internal_silence)
+
     results = []
-    
-    for filename, duration in test_files:
-        print(f"\n" + "="*60)
-        print(f"🎵 TESTANDO ARQUIVO: {filename} ({duration}s)")
-        print("="*60)
-        
-        # Benchmark CPU
-        cpu_time, cpu_samples = benchmark_cpu_processing(filename)
-        
-        # Benchmark GPU (se disponível)
-        if gpu_available:
-            gpu_time, gpu_samples = benchmark_gpu_processing(filename)
-            speedup = cpu_time / gpu_time if gpu_time > 0 else 0
+    with tempfile.TemporaryDirectory() as work_dir:
+        # Caso: (nome, arquivos do lote, segundos de áudio)
+        if args.corpus:
+            cases = corpus_cases(args.corpus, args.corpus_batch)
         else:
-            gpu_time = 0
-            gpu_samples = 0
-            speedup = 0
-        
-        results.append({
-            'duration': duration,
-            'cpu_time': cpu_time,
-            'gpu_time': gpu_time,
-            'speedup': speedup,
-            'filename': filename
-        })
-        
-        # Limpa arquivo de teste
-        os.remove(filename)
-    
-    # Mostra resultados finais
-    print(f"\n" + "="*60)
-    print("📊 RESULTADOS FINAIS")
-    print("="*60)
-    
-    print(f"{'Duração':<10} {'CPU (s)':<10} {'GPU (s)':<10} {'Speedup':<10}")
-    print("-" * 45)
-    
-    total_cpu_time = 0
-    total_gpu_time = 0
-    
+            cases = synthetic_cases(args, work_dir)
+        warmup = cases[0][1][:1]
+
+        for backend in args.backends:
+            # Aquecimento: inicialização do dispositivo não entra na medida
+            run_case(ms, processor, make_backend(ms, backend), warmup, work_dir)
+
+            for name, file_paths, audio_seconds in cases:
+                result = benchmark_case(ms, processor, backend, name, file_paths, audio_seconds,
+                                        args.repeat, work_dir)
+                results.append(result)
+                print(f"  {result['key']:<28} {result['total']:>9.4f}s "
+                      f"{result['throughput']:>12.1f}x tempo real")
+
+    consistent = check_consistency(results)
+    return {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'platform': platform.platform(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'torch': ms.torch.__version__ if ms.torch is not None else None,
+            'cuda_device': (ms.torch.cuda.get_device_name()
+                            if ms.torch is not None and ms.torch.cuda.is_available() else None),
+            'sample_rate': args.sample_rate,
+            'corpus': args.corpus,
+            'threshold_db': args.threshold_db,
+            'remove_internal_silence': args.remove_internal_silence,
+            'consistent': consistent,
+        },
+        'results': results,
+    }
+
+def check_consistency(results: List[Dict]) -> bool:
+    """Avisa se backends diferentes decidiram cortes diferentes no mesmo caso"""
+    by_case = {}
     for result in results:
-        total_cpu_time += result['cpu_time']
-        total_gpu_time += result['gpu_time']
-        
-        if gpu_available:
-            print(f"{result['duration']}s{'':<6} {result['cpu_time']:<10.3f} "
-                  f"{result['gpu_time']:<10.3f} {result['speedup']:<10.1f}x")
-        else:
-            print(f"{result['duration']}s{'':<6} {result['cpu_time']:<10.3f} {'N/A':<10} {'N/A':<10}")
-    
-    print("-" * 45)
-    
-    if gpu_available and total_gpu_time > 0:
-        overall_speedup = total_cpu_time / total_gpu_time
-        print(f"{'TOTAL':<10} {total_cpu_time:<10.3f} {total_gpu_time:<10.3f} {overall_speedup:<10.1f}x")
-        
-        print(f"\n🎉 RESUMO:")
-        print(f"   🖥️  Tempo total CPU: {total_cpu_time:.3f}s")
-        print(f"   🚀 Tempo total GPU: {total_gpu_time:.3f}s")
-        print(f"   ⚡ Speedup médio: {overall_speedup:.1f}x")
-        print(f"   💾 Economia de tempo: {((total_cpu_time - total_gpu_time) / total_cpu_time * 100):.1f}%")
-    else:
-        print(f"{'TOTAL':<10} {total_cpu_time:<10.3f} {'N/A':<10} {'N/A':<10}")
-        print(f"\n📝 Para ver o speedup da GPU, instale CUDA e PyTorch com suporte GPU")
-
-def main():
-    """Função principal"""
-    print("🔥 BENCHMARK: Processamento de Áudio CPU vs GPU")
-    print("Este benchmark vai testar a performance do seu sistema")
-    print()
-    
-    response = input("Deseja executar o benchmark completo? (s/n): ").lower().strip()
-    
-    if response in ['s', 'sim', 'y', 'yes']:
-        run_comprehensive_benchmark()
+        by_case.setdefault(result['case'], []).append(result)
+
+    consistent = True
+    for case, group in by_case.items():
+        reference = group[0]['segments_digest']
+        for result in group[1:]:
+            if result['segments_digest'] != reference:
+                consistent = False
+                print(f"⚠️  {result['backend']} diverge de {group[0]['backend']} em {case}")
+    return consistent
+
+def check_signals(ms, args: argparse.Namespace) -> List[Tuple[str, np.ndarray, int]]:
+    """
+    Sinais difíceis para a comparação entre backends
+
+    Cobre os casos de borda do envelope (vazio, menor que uma janela, tudo
+    silêncio, nível colado no limiar), taxas e tamanhos sorteados e, com
+    --corpus, os arquivos do corpus.
+    """
+    rng = np.random.default_rng(args.seed)
+    threshold = 10 ** (args.threshold_db / 20)
+    signals = [
+        ("vazio", np.zeros(0, dtype=np.float32), 16000),
+        ("uma amostra", np.full(1, 0.5, dtype=np.float32), 16000),
+        ("menor que a janela", (0.1 * rng.standard_normal(1000)).astype(np.float32), 16000),
+        ("só silêncio", np.zeros(3 * 44100, dtype=np.float32), 44100),
+    ]
+
+    # Nível constante a um passo de float32 do limiar, acima e abaixo
+    level = np.float32(threshold)
+    for label, value in [("no limiar", level),
+                         ("logo acima do limiar", np.nextafter(level, np.float32(1))),
+                         ("logo abaixo do limiar", np.nextafter(level, np.float32(0)))]:
+        signals.append((label, np.full(2 * 22050, value, dtype=np.float32), 22050))
+
+    for i in range(args.check_signals):
+        sr = int(rng.choice([8000, 11025, 16000, 22050, 44100, 48000]))
+        audio = (rng.uniform(0.5, 1.5) * threshold * rng.standard_normal(int(rng.integers(0, 8 * sr))))
+        # Rajadas de som e pausas de tamanhos variados
+        for start in rng.integers(0, max(len(audio), 1), 4):
+            audio[start:start + int(rng.integers(1, 2 * sr))] *= rng.uniform(0.01, 20)
+        signals.append((f"aleatório {i}", audio.astype(np.float32), sr))
+
+    if args.corpus:
+        with open(os.path.join(args.corpus, 'manifest.json')) as f:
+            for entry in json.load(f)['files']:
+                audio, sr = ms.load_mono(os.path.join(args.corpus, entry['file']))
+                signals.append((entry['file'], audio, sr))
+    return signals
+
+def check_backends(args: argparse.Namespace) -> List[str]:
+    """
+    Compara os cortes de cada backend com os do NumPy, sinal a sinal
+
+    Confere os limites de detect_silence_gpu, os trechos nos dois modos
+    (só bordas e com pausas internas) e o modo em lote.
+
+    Returns:
+        Descrição das divergências (vazia se todos concordam)
+    """
+    ms = load_silence_module()
+    signals = check_signals(ms, args)
+
+    def decisions(backend) -> Dict:
+        edges = ms.GPUAudioProcessor(silence_threshold_db=args.threshold_db, backend=backend)
+        internal = ms.GPUAudioProcessor(silence_threshold_db=args.threshold_db, backend=backend,
+                                        remove_internal_silence=True)
+        results = {}
+        for label, audio, sr in signals:
+            results[label] = (edges.detect_silence_gpu(audio, sr),
+                              internal.analyze_audio(audio, sr))
+        results['lote'] = edges.detect_silence_batch([audio for _, audio, _ in signals],
+                                                     [sr for _, _, sr in signals])
+        return results
+
+    reference = decisions(make_backend(ms, 'numpy'))
+    mismatches = []
+    for name in args.backends:
+        if name == 'numpy':
+            continue
+        results = decisions(make_backend(ms, name))
+        diverging = [label for label in reference if results[label] != reference[label]]
+        status = "✅" if not diverging else f"❌ {len(diverging)} divergência(s)"
+        print(f"  {name:<10} {len(reference)} verificações {status}")
+        mismatches.extend(f"{name}: {label}" for label in diverging)
+    return mismatches
+
+def check_profile_modes() -> List[str]:
+    """
+    Confere que o batch_size de um perfil de ajuste não desvia o --inplace-wav
+
+    Roda manage-silence.py --inplace-wav com um perfil que pede lotes
+    vetorizados: o WAV tem de ser cortado no próprio arquivo (mesmo inode),
+    e não regravado por outro caminho.
+
+    Returns:
+        Descrição das falhas (vazia se tudo passou)
+    """
+    ms = load_silence_module()
+    failures = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        audio_dir = os.path.join(work_dir, 'audio')
+        os.makedirs(audio_dir)
+        path = create_test_audio(10, output_path=os.path.join(audio_dir, 'inplace.wav'))
+        profile_path = os.path.join(work_dir, 'profile.json')
+        with open(profile_path, 'w') as f:
+            json.dump({'version': ms.PROFILE_VERSION, 'host': platform.node(),
+                       'options': {'batch_size': 4}}, f)
+
+        before = os.stat(path)
+        result = subprocess.run([sys.executable, SILENCE_SCRIPT, '--tuning-profile', profile_path,
+                                 '--inplace-wav'], cwd=work_dir, capture_output=True, text=True)
+        after = os.stat(path)
+        ok = result.returncode == 0 and after.st_ino == before.st_ino and after.st_size < before.st_size
+        print(f"  perfil batch_size=4 + --inplace-wav: {before.st_size} → {after.st_size} bytes, "
+              f"inode {'mantido' if after.st_ino == before.st_ino else 'trocado'} {'✅' if ok else '❌'}")
+        if result.returncode != 0:
+            failures.append(f"--inplace-wav com perfil: saiu com {result.returncode}")
+        if after.st_ino != before.st_ino:
+            failures.append("--inplace-wav com perfil: o arquivo foi regravado (inode trocado)")
+        if after.st_size >= before.st_size:
+            failures.append("--inplace-wav com perfil: o arquivo não foi cortado")
+    return failures
+
+def time_command(command: List[str], repeat: int) -> Tuple[float, str]:
+    """Mediana do tempo de parede de um comando em um processo novo, e a última saída"""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = subprocess.run(command, capture_output=True, text=True, check=True)
+        timings.append(time.perf_counter() - started)
+    return float(np.median(timings)), result.stdout
+
+def check_startup(budget: float, repeat: int) -> List[str]:
+    """
+    Confere o custo de inicialização de manage-silence.py
+
+    Cada comando roda em um interpretador novo: só importar o módulo e
+    rodar --help devem caber no orçamento e não podem carregar nenhum dos
+    HEAVY_MODULES (torch, librosa, ...), que ficam para a primeira detecção.
+
+    Returns:
+        Descrição das falhas (vazia se tudo passou)
+    """
+    probe = (
+        "import importlib.util, json, sys\n"
+        f"spec = importlib.util.spec_from_file_location('manage_silence', {SILENCE_SCRIPT!r})\n"
+        "module = importlib.util.module_from_spec(spec)\n"
+        "spec.loader.exec_module(module)\n"
+        f"print(json.dumps([name for name in {HEAVY_MODULES!r} if name in sys.modules]))\n"
+    )
+    commands = {
+        'import': [sys.executable, '-c', probe],
+        '--help': [sys.executable, SILENCE_SCRIPT, '--help'],
+    }
+
+    failures = []
+    for name, command in commands.items():
+        seconds, output = time_command(command, repeat)
+        ok = seconds <= budget
+        print(f"  {name:<10} {seconds:>8.3f}s {'✅' if ok else '❌'}")
+        if not ok:
+            failures.append(f"{name}: {seconds:.3f}s > {budget:g}s")
+        if name == 'import':
+            loaded = json.loads(output.strip().splitlines()[-1])
+            if loaded:
+                failures.append(f"import carregou {', '.join(loaded)}")
+    return failures
+
+def run_workers(audio_dir: str, workers: int, kill_first: bool = False) -> float:
+    """
+    Roda `workers` processos de manage-silence.py --distributed na mesma pasta
+
+    Args:
+        audio_dir: Pasta de trabalho (com a subpasta audio/)
+        workers: Número de processos
+        kill_first: Mata o primeiro worker (SIGKILL) assim que ele conclui o
+            primeiro arquivo, quando já está com a lease do próximo
+
+    Returns:
+        Tempo de parede até o último worker terminar
+    """
+    command = [sys.executable, SILENCE_SCRIPT, '--no-tuning-profile', '--distributed',
+               '--workers', '1', '--lease-ttl', '2']
+    started = time.perf_counter()
+    processes = [subprocess.Popen(command + ['--worker-id', f'w{i}'], cwd=audio_dir,
+                                  stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                 for i in range(workers)]
+    if kill_first:
+        journal = os.path.join(audio_dir, 'audio', '.silence-journal.d', 'w0.jsonl')
+        while processes[0].poll() is None and not (os.path.exists(journal) and os.path.getsize(journal)):
+            time.sleep(0.01)
+        processes[0].send_signal(signal.SIGKILL)
+    for process in processes:
+        process.wait()
+    return time.perf_counter() - started
+
+def completions(audio_dir: str) -> List[str]:
+    """Arquivos registrados no diário compartilhado, uma vez por registro"""
+    journal_dir = os.path.join(audio_dir, 'audio', '.silence-journal.d')
+    files = []
+    for name in sorted(os.listdir(journal_dir)):
+        with open(os.path.join(journal_dir, name)) as f:
+            files.extend(json.loads(line)['file'] for line in f if line.strip())
+    return files
+
+def check_distributed(workers: int, num_files: int, duration: float) -> List[str]:
+    """
+    Confere o modo --distributed com processos locais na mesma pasta
+
+    Um worker sozinho e `workers` juntos processam cópias do mesmo conjunto
+    de arquivos: cada arquivo deve ser registrado uma única vez e sair
+    idêntico ao do worker sozinho. Depois, o primeiro worker é morto no
+    meio do lote e os outros devem retomar as leases dele e terminar tudo.
+
+    Returns:
+        Descrição das falhas (vazia se tudo passou)
+    """
+    failures = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        source = os.path.join(work_dir, 'source')
+        os.makedirs(source)
+        for i in range(num_files):
+            create_test_audio(duration, output_path=os.path.join(source, f"dist_{i:03d}.wav"), seed=i)
+
+        runs = {}
+        for name, count in (('single', 1), ('multi', workers), ('killed', workers)):
+            run_dir = os.path.join(work_dir, name)
+            shutil.copytree(source, os.path.join(run_dir, 'audio'))
+            runs[name] = (run_workers(run_dir, count, kill_first=name == 'killed'), run_dir)
+
+        single_time, single_dir = runs['single']
+        multi_time, multi_dir = runs['multi']
+        print(f"  1 worker:  {single_time:>7.2f}s")
+        print(f"  {workers} workers: {multi_time:>7.2f}s ({single_time / multi_time:.2f}x, "
+              f"{os.cpu_count()} núcleo(s))")
+
+        files = completions(multi_dir)
+        if len(files) != num_files or len(set(files)) != num_files:
+            failures.append(f"{workers} workers: {len(files)} registro(s) para {num_files} arquivo(s)")
+        for i in range(num_files):
+            name = f"dist_{i:03d}.wav"
+            expected, _ = sf.read(os.path.join(single_dir, 'audio', name))
+            produced, _ = sf.read(os.path.join(multi_dir, 'audio', name))
+            if expected.shape != produced.shape or not np.array_equal(expected, produced):
+                failures.append(f"{name}: saída diferente da de um worker sozinho")
+
+        killed_dir = runs['killed'][1]
+        finished = len(set(completions(killed_dir)))
+        leases = os.listdir(os.path.join(killed_dir, 'audio', '.silence-leases'))
+        print(f"  worker morto no meio: {finished}/{num_files} concluídos, {len(leases)} lease(s) restante(s)")
+        if finished != num_files:
+            failures.append(f"worker morto: só {finished} de {num_files} arquivo(s) concluídos")
+        if leases:
+            failures.append(f"worker morto: {len(leases)} lease(s) não liberada(s)")
+    return failures
+
+# Contêineres do --check-stream-copy: extensão → opções de codificação do ffmpeg
+STREAM_COPY_ENCODINGS = {
+    'mp3': ['-c:a', 'libmp3lame', '-b:a', '128k'],
+    'm4a': ['-c:a', 'aac', '-b:a', '128k'],
+    'aac': ['-c:a', 'aac', '-b:a', '128k', '-f', 'adts'],
+}
+
+def probe_audio(file_path: str) -> Dict:
+    """
+    Codec, taxa, canais, duração e MD5 de cada pacote do áudio, sem decodificar
+
+    Usa só o ffmpeg (framemd5 com -c copy): a duração é a soma das durações
+    dos pacotes, e os hashes mostram se a saída reaproveitou os pacotes.
+    """
+    result = subprocess.run(['ffmpeg', '-hide_banner', '-i', file_path, '-map', '0:a', '-c', 'copy',
+                             '-f', 'framemd5', '-'], capture_output=True, text=True, check=True)
+    stream = re.search(r"Audio: (\w+).*?, (\d+) Hz, ([^,]+)", result.stderr)
+    time_base, packets = 1.0, []
+    for line in result.stdout.splitlines():
+        if line.startswith('#tb 0:'):
+            numerator, denominator = line.split(':', 1)[1].split('/')
+            time_base = int(numerator) / int(denominator)
+        elif line and not line.startswith('#'):
+            fields = [field.strip() for field in line.split(',')]
+            packets.append((int(fields[3]), fields[5]))
+    return {'codec': stream.group(1), 'sample_rate': int(stream.group(2)), 'channels': stream.group(3),
+            'duration': sum(duration for duration, _ in packets) * time_base,
+            'packets': [digest for _, digest in packets]}
+
+def check_stream_copy(duration: float) -> List[str]:
+    """
+    Confere o corte por cópia de stream (--stream-copy) em MP3, M4A e AAC
+
+    Os arquivos são codificados aqui com o ffmpeg a partir do mesmo áudio de
+    teste e cortados por manage-silence.py --stream-copy
+    --remove-internal-silence. A duração final deve bater com os trechos
+    registrados no diário, a menos de dois frames do codec por corte, e cada
+    pacote da saída deve ser um pacote do original, na mesma ordem: se algo
+    tivesse sido recodificado, os pacotes seriam outros.
+
+    Returns:
+        Descrição das falhas (vazia se tudo passou)
+    """
+    if not shutil.which('ffmpeg'):
+        return ["ffmpeg não encontrado no PATH"]
+
+    failures = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        audio_dir = os.path.join(work_dir, 'audio')
+        os.makedirs(audio_dir)
+        source = create_test_audio(duration, output_path=os.path.join(work_dir, 'source.wav'))
+        before = {}
+        for extension, options in STREAM_COPY_ENCODINGS.items():
+            path = os.path.join(audio_dir, f"copy.{extension}")
+            subprocess.run(['ffmpeg', '-v', 'error', '-y', '-i', source] + options + [path], check=True)
+            before[extension] = probe_audio(path)
+
+        subprocess.run([sys.executable, SILENCE_SCRIPT, '--no-tuning-profile', '--stream-copy',
+                        '--remove-internal-silence'], cwd=work_dir, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        with open(os.path.join(audio_dir, '.silence-journal.jsonl')) as f:
+            journal = {os.path.basename(entry['file']): entry for entry in map(json.loads, f)}
+
+        for extension, info in before.items():
+            name = f"copy.{extension}"
+            if name not in journal:
+                failures.append(f"{name}: não foi processado")
+                continue
+            after = probe_audio(os.path.join(audio_dir, name))
+            hashes, output_hashes = info['packets'], after['packets']
+            segments = journal[name]['segments']
+            expected = sum(end - start for start, end in segments) / info['sample_rate']
+            frame = (1152 if info['codec'] == 'mp3' else 1024) / info['sample_rate']
+            tolerance = 2 * frame * (len(segments) + 1)
+
+            # Pacotes da saída em ordem dentro dos do original (cada trecho é uma fatia contígua)
+            positions = {digest: index for index, digest in enumerate(hashes)}
+            found = [positions.get(digest) for digest in output_hashes]
+            copied = None not in found and found == sorted(found)
+
+            ok = abs(after['duration'] - expected) <= tolerance and copied
+            print(f"  {name:<9} {info['duration']:>6.2f}s → {after['duration']:>6.2f}s "
+                  f"(trechos: {expected:.2f}s, {len(segments)} trecho(s)), "
+                  f"{len(output_hashes)}/{len(hashes)} pacotes copiados {'✅' if ok else '❌'}")
+            if abs(after['duration'] - expected) > tolerance:
+                failures.append(f"{name}: duração {after['duration']:.3f}s, esperado {expected:.3f}s "
+                                f"± {tolerance:.3f}s")
+            if not copied:
+                failures.append(f"{name}: pacotes diferentes dos originais (houve recodificação)")
+            for key in ('codec', 'sample_rate', 'channels'):
+                if after[key] != info[key]:
+                    failures.append(f"{name}: {key} mudou de {info[key]} para {after[key]}")
+    return failures
+
+def run_watcher(work_dir: str, until, timeout: float = 60.0) -> str:
+    """
+    Roda manage-silence.py --watch in (sem pasta audio/) até until() ou o timeout
+
+    Returns:
+        Saída do processo, encerrado com SIGINT como pelo Ctrl+C
+    """
+    command = [sys.executable, SILENCE_SCRIPT, '--no-tuning-profile', '--watch', 'in', '--watch-poll',
+               '--settle', '0.5', '--poll-interval', '0.2']
+    process = subprocess.Popen(command, cwd=work_dir, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                               text=True)
+    deadline = time.monotonic() + timeout
+    while process.poll() is None and not until() and time.monotonic() < deadline:
+        time.sleep(0.05)
+    process.send_signal(signal.SIGINT)
+    output, _ = process.communicate()
+    return output
+
+def check_watch(num_files: int) -> List[str]:
+    """
+    Confere que o modo --watch processa cada arquivo uma vez só, inclusive entre reinícios
+
+    Sem pasta audio/ no diretório de trabalho, um vigia processa os arquivos
+    de in/ e é encerrado; um segundo vigia na mesma pasta não pode regravar
+    nem registrar de novo os arquivos já cortados, só um arquivo novo.
+
+    Returns:
+        Descrição das falhas (vazia se tudo passou)
+    """
+    failures = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        input_dir = os.path.join(work_dir, 'in')
+        os.makedirs(input_dir)
+        for i in range(num_files):
+            create_test_audio(3, output_path=os.path.join(input_dir, f"watch_{i:03d}.wav"), seed=i)
+        journal = os.path.join(input_dir, '.silence-journal.jsonl')
+
+        def journaled() -> List[str]:
+            if not os.path.exists(journal):
+                return []
+            with open(journal) as f:
+                return [json.loads(line)['file'] for line in f if line.strip()]
+
+        output = run_watcher(work_dir, lambda: len(journaled()) >= num_files)
+        first = journaled()
+        print(f"  1ª execução: {len(first)}/{num_files} arquivo(s) no diário")
+        if len(first) != num_files or len(set(first)) != num_files:
+            failures.append(f"1ª execução: {len(first)} registro(s) para {num_files} arquivo(s)")
+        if "❌" in output:
+            failures.append("1ª execução: arquivos dados como falha")
+        trimmed = {name: os.stat(os.path.join(input_dir, name)).st_mtime_ns
+                   for name in os.listdir(input_dir) if name.endswith('.wav')}
+
+        # Reinício: só o arquivo novo pode ser processado
+        create_test_audio(3, output_path=os.path.join(input_dir, "watch_new.wav"), seed=num_files)
+        output = run_watcher(work_dir, lambda: len(journaled()) > num_files)
+        second = journaled()[num_files:]
+        rewritten = [name for name, mtime_ns in trimmed.items()
+                     if os.stat(os.path.join(input_dir, name)).st_mtime_ns != mtime_ns]
+        print(f"  reinício: {len(second)} registro(s) novo(s), {len(rewritten)} arquivo(s) regravado(s)")
+        if [os.path.basename(path) for path in second] != ["watch_new.wav"]:
+            failures.append(f"reinício: registros novos {[os.path.basename(path) for path in second]}, "
+                            f"esperado só watch_new.wav")
+        if rewritten:
+            failures.append(f"reinício: {', '.join(sorted(rewritten))} cortado(s) de novo")
+        if "❌" in output:
+            failures.append("reinício: arquivos dados como falha")
+        if os.path.exists(os.path.join(work_dir, 'audio')):
+            failures.append("a pasta audio/ foi criada fora da pasta vigiada")
+    return failures
+
+def print_report(report: Dict) -> None:
+    """Tabela com o tempo de cada etapa por caso"""
+    print("\n📊 RESULTADOS POR ETAPA (s, mediana)")
+    header = f"{'Caso':<28}" + "".join(f"{stage:>11}" for stage in STAGES) + f"{'total':>11}"
+    print(header)
+    print("-" * len(header))
+    for result in report['results']:
+        print(f"{result['key']:<28}"
+              + "".join(f"{result['stages'][stage]:>11.4f}" for stage in STAGES)
+              + f"{result['total']:>11.4f}")
+
+def compare_reports(current: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """
+    Compara o throughput de cada caso com a linha de base
+
+    Args:
+        current: Relatório atual
+        baseline: Relatório de referência
+        tolerance: Queda máxima aceita, em porcentagem
+
+    Returns:
+        Chaves dos casos que regrediram além da tolerância
+    """
+    reference = {result['key']: result for result in baseline['results']}
+    regressions = []
+
+    print(f"\n📈 COMPARAÇÃO COM A LINHA DE BASE (tolerância {tolerance:g}%)")
+    print(f"{'Caso':<28}{'base':>12}{'atual':>12}{'variação':>11}")
+    for result in current['results']:
+        base = reference.get(result['key'])
+        if base is None or base['throughput'] <= 0:
+            print(f"{result['key']:<28}{'—':>12}{result['throughput']:>12.1f}{'novo':>11}")
+            continue
+
+        change = (result['throughput'] / base['throughput'] - 1) * 100
+        regressed = change < -tolerance
+        if regressed:
+            regressions.append(result['key'])
+        print(f"{result['key']:<28}{base['throughput']:>12.1f}{result['throughput']:>12.1f}"
+              f"{change:>+10.1f}%{' ❌' if regressed else ''}")
+
+    return regressions
+
+def parse_list(value: str, cast=float) -> List:
+    return [cast(item) for item in value.split(',') if item.strip()]
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Lê as opções de linha de comando"""
+    parser = argparse.ArgumentParser(description="Benchmark por etapa do detector de silêncio")
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="quick",
+                        help="Conjunto de durações e lotes (padrão: quick)")
+    parser.add_argument("--durations", type=parse_list,
+                        help="Durações (s) de arquivo único, separadas por vírgula")
+    parser.add_argument("--batch-sizes", type=lambda value: parse_list(value, int),
+                        help="Tamanhos de lote, separados por vírgula")
+    parser.add_argument("--batch-duration", type=float, default=1.0,
+                        help="Duração (s) de cada arquivo nos lotes (padrão: 1)")
+    parser.add_argument("--backends", type=lambda value: parse_list(value, str),
+                        help="Backends a medir (padrão: todos disponíveis)")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="Repetições por caso; vale a mediana (padrão: 3)")
+    parser.add_argument("--sample-rate", type=int, default=44100,
+                        help="Taxa de amostragem dos arquivos de teste (padrão: 44100)")
+    parser.add_argument("--threshold-db", type=float, default=-40,
+                        help="Limite de silêncio em dB (padrão: -40)")
+    parser.add_argument("--remove-internal-silence", action="store_true",
+                        help="Mede o modo que também encurta pausas internas")
+    parser.add_argument("--corpus", metavar="DIR",
+                        help="Mede um corpus de generate_corpus.py em vez dos arquivos de teste")
+    parser.add_argument("--corpus-batch", type=int, default=32,
+                        help="Arquivos por lote no modo --corpus (padrão: 32)")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="Semente do ruído dos arquivos de teste (padrão: 0)")
+    parser.add_argument("--output", default="benchmark_results.json",
+                        help="JSON com os resultados (padrão: benchmark_results.json)")
+    parser.add_argument("--input",
+                        help="Usa um JSON já gravado em vez de rodar o benchmark")
+    parser.add_argument("--compare", metavar="BASELINE",
+                        help="JSON de referência; sai com erro se o throughput regredir")
+    parser.add_argument("--tolerance", type=float, default=10.0,
+                        help="Queda de throughput aceita no --compare, em %% (padrão: 10)")
+    parser.add_argument("--check", action="store_true",
+                        help="Só verifica se os backends decidem os mesmos cortes que o NumPy")
+    parser.add_argument("--check-signals", type=int, default=200,
+                        help="Sinais aleatórios do --check (padrão: 200)")
+    parser.add_argument("--check-startup", action="store_true",
+                        help="Só verifica o tempo de inicialização de manage-silence.py")
+    parser.add_argument("--startup-budget", type=float, default=0.5,
+                        help="Tempo máximo (s) de import e --help no --check-startup (padrão: 0.5)")
+    parser.add_argument("--check-distributed", type=int, metavar="N",
+                        help="Só verifica o modo --distributed de manage-silence.py com N workers locais")
+    parser.add_argument("--distributed-files", type=int, default=24,
+                        help="Arquivos do --check-distributed (padrão: 24)")
+    parser.add_argument("--distributed-duration", type=float, default=20.0,
+                        help="Duração (s) de cada arquivo do --check-distributed (padrão: 20)")
+    parser.add_argument("--check-watch", type=int, nargs="?", const=5, metavar="N",
+                        help="Só verifica que o modo --watch de manage-silence.py processa N arquivos "
+                             "uma vez só, inclusive depois de reiniciar (padrão: 5)")
+    parser.add_argument("--check-stream-copy", action="store_true",
+                        help="Só verifica o corte por cópia de stream (--stream-copy) em MP3, M4A e AAC "
+                             "gerados com o ffmpeg")
+    parser.add_argument("--stream-copy-duration", type=float, default=20.0,
+                        help="Duração (s) do áudio do --check-stream-copy (padrão: 20)")
+    args = parser.parse_args(argv)
+
+    if args.check_startup or args.check_distributed or args.check_watch or args.check_stream_copy:
+        return args
+
+    preset = PRESETS[args.preset]
+    args.durations = args.durations or preset['durations']
+    args.batch_sizes = args.batch_sizes or preset['batch_sizes']
+    args.backends = args.backends or available_backends()
+    unknown = set(args.backends) - set(available_backends())
+    if unknown:
+        parser.error(f"backend indisponível: {', '.join(sorted(unknown))}")
+    return args
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Função principal; retorna o código de saída"""
+    args = parse_args(argv)
+
+    if args.check_startup:
+        print(f"⏱️  Inicialização de manage-silence.py (orçamento {args.startup_budget:g}s, "
+              f"mediana de {args.repeat})")
+        failures = check_startup(args.startup_budget, args.repeat)
+        for failure in failures:
+            print(f"  ❌ {failure}")
+        if failures:
+            return 1
+        print("✅ Inicialização dentro do orçamento")
+        return 0
+
+    if args.check_distributed:
+        print(f"🌐 Modo distribuído: {args.check_distributed} workers locais, "
+              f"{args.distributed_files} arquivo(s) de {args.distributed_duration:g}s")
+        failures = check_distributed(args.check_distributed, args.distributed_files,
+                                     args.distributed_duration)
+        for failure in failures:
+            print(f"  ❌ {failure}")
+        if failures:
+            return 1
+        print("✅ Cada arquivo foi processado uma vez e o trabalho do worker morto foi retomado")
+        return 0
+
+    if args.check_stream_copy:
+        print(f"📼 Cópia de stream: MP3, M4A e AAC de {args.stream_copy_duration:g}s")
+        failures = check_stream_copy(args.stream_copy_duration)
+        for failure in failures:
+            print(f"  ❌ {failure}")
+        if failures:
+            return 1
+        print("✅ Cortes com a duração esperada, sem recodificar nenhum pacote")
+        return 0
+
+    if args.check_watch:
+        print(f"👀 Modo vigia: {args.check_watch} arquivo(s), reiniciado uma vez")
+        failures = check_watch(args.check_watch)
+        for failure in failures:
+            print(f"  ❌ {failure}")
+        if failures:
+            return 1
+        print("✅ Cada arquivo foi cortado uma vez, e o reinício só processou o arquivo novo")
+        return 0
+
+    if args.check:
+        print(f"🔬 Comparando backends com o NumPy: {', '.join(args.backends)}")
+        mismatches = check_backends(args)
+        print("🎛️  Perfil de ajuste com modos de gravação próprios")
+        mismatches += check_profile_modes()
+        for mismatch in mismatches:
+            print(f"  ❌ {mismatch}")
+        if mismatches:
+            return 1
+        print("✅ Todos os backends decidem os mesmos cortes e o perfil respeita o --inplace-wav")
+        return 0
+
+    if args.input:
+        with open(args.input) as f:
+            report = json.load(f)
     else:
-        print("Benchmark cancelado.")
+        print(f"🏁 BENCHMARK: backends {', '.join(args.backends)}, "
+              f"{args.repeat} repetição(ões) por caso")
+        report = run_suite(args)
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Resultados salvos em {args.output}")
+
+    print_report(report)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare_reports(report, baseline, args.tolerance)
+        if regressions:
+            print(f"\n❌ {len(regressions)} caso(s) regrediram: {', '.join(regressions)}")
+            return 1
+        print("\n✅ Nenhuma regressão de throughput")
+
+    return 0
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
@@ -1,11 +1,26 @@
 #!/usr/bin/env python3
 """
 Script para verificar se o sistema está pronto para processamento GPU
+
+Com --autotune, mede nesta máquina backends, número de workers, tamanhos
+de lote e de bloco, e grava o perfil que manage-silence.py carrega ao
+iniciar.
 """
 
+import os
+import io
 import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import contextlib
 import subprocess
 import importlib
+import importlib.util
+from datetime import datetime, timezone
 
 def check_python_version():
     """Verifica versão do Python"""
@@ -155,8 +170,231 @@ def estimate_performance():
     except ImportError:
         print("   ❌ Não foi possível estimar performance")
 
-def main():
+def load_silence_module():
+    """Carrega manage-silence.py (o hífen no nome impede um import normal)"""
+    if 'manage_silence' in sys.modules:
+        return sys.modules['manage_silence']
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'manage-silence.py')
+    spec = importlib.util.spec_from_file_location('manage_silence', path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules['manage_silence'] = module
+    spec.loader.exec_module(module)
+    return module
+
+def autotune_samples(args, work_dir):
+    """Arquivos de amostra: os de --autotune-dir ou arquivos de teste gerados"""
+    audio_extensions = ['.wav', '.mp3', '.m4a', '.flac', '.ogg', '.aac']
+    if args.autotune_dir:
+        return sorted(os.path.join(args.autotune_dir, file) for file in os.listdir(args.autotune_dir)
+                      if any(file.lower().endswith(ext) for ext in audio_extensions))
+
+    from benchmark import create_test_audio
+    samples = []
+    for i in range(args.autotune_files):
+        sample_rate = [44100, 48000][i % 2]
+        path = os.path.join(work_dir, f"sample_{i:03d}.wav")
+        samples.append(create_test_audio(args.autotune_duration, sample_rate, path, seed=i))
+    return samples
+
+def run_trial(samples, trial_dir, run):
+    """
+    Copia as amostras para uma pasta limpa e mede run(cópias)
+
+    O processamento grava por cima dos arquivos, então cada tentativa usa
+    cópias novas; só o processamento entra na medida, não a cópia.
+    """
+    shutil.rmtree(trial_dir, ignore_errors=True)
+    os.makedirs(trial_dir)
+    copies = [shutil.copy(path, trial_dir) for path in samples]
+    with contextlib.redirect_stdout(io.StringIO()):
+        started = time.perf_counter()
+        run(copies)
+        return time.perf_counter() - started
+
+def pick_fastest(timings, tolerance=0.03):
+    """Opção mais rápida; empates (dentro da tolerância) ficam com a primeira, a mais leve"""
+    best = min(timings.values())
+    return next(option for option, seconds in timings.items() if seconds <= best * (1 + tolerance))
+
+def report_timings(label, timings, chosen, audio_seconds):
+    print(f"\n   {label}:")
+    for option, seconds in timings.items():
+        mark = "  ⬅️" if option == chosen else ""
+        print(f"      {str(option):<10} {seconds:>8.3f}s {audio_seconds / seconds:>9.1f}x tempo real{mark}")
+
+# Roda em um processo novo: import do backend, preparo do dispositivo e primeira
+# detecção (compilação do Numba), custos que cada execução de manage-silence.py paga
+SETUP_PROBE = """
+import sys, time, importlib.util
+import numpy as np
+spec = importlib.util.spec_from_file_location('manage_silence', sys.argv[1])
+ms = importlib.util.module_from_spec(spec)
+sys.modules['manage_silence'] = ms
+spec.loader.exec_module(ms)
+audio = np.random.default_rng(0).standard_normal(44100).astype(np.float32)
+started = time.perf_counter()
+ms.GPUAudioProcessor(backend=ms.make_backend(sys.argv[2])).analyze_audio(audio, 44100)
+print(time.perf_counter() - started)
+"""
+
+def backend_setup_time(name):
+    """Segundos de import e preparo de um backend, medidos a frio em um processo novo"""
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'manage-silence.py')
+    result = subprocess.run([sys.executable, '-c', SETUP_PROBE, path, name],
+                            capture_output=True, text=True, check=True)
+    return float(result.stdout.strip().splitlines()[-1])
+
+def tune_backend(ms, decoded, repeat=3):
+    """
+    Custo de cada backend em uma execução: preparo a frio mais a detecção de todos os arquivos
+
+    Só a detecção aquecida favoreceria o torch na CPU por milissegundos,
+    enquanto importá-lo custa segundos em toda execução.
+
+    Returns:
+        Tuple com (segundos totais por backend, segundos de preparo por backend)
+    """
+    candidates = ['numpy']
+    if ms.numba_available():
+        candidates.append('numba')
+    if importlib.util.find_spec('torch') is not None:
+        candidates.append('torch')
+
+    timings = {}
+    setup = {}
+    for name in candidates:
+        setup[name] = backend_setup_time(name)
+        processor = ms.GPUAudioProcessor(backend=ms.make_backend(name))
+        processor.analyze_audio(*decoded[0])  # Aquecimento (compilação, dispositivo)
+        runs = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            for audio, sr in decoded:
+                processor.analyze_audio(audio, sr)
+            runs.append(time.perf_counter() - started)
+        timings[name] = setup[name] + min(runs)
+    return timings, setup
+
+def autotune(args):
+    """
+    Mede as opções de desempenho nesta máquina e grava o perfil de ajuste
+
+    Cada etapa fixa o melhor resultado da anterior: backend de detecção,
+    threads de processamento, tamanho do lote vetorizado e tamanho do
+    bloco do modo streaming. Janela e salto do envelope não são ajustados,
+    porque mudam os cortes e não só a velocidade.
+    """
+    ms = load_silence_module()
+    profile_path = args.profile or ms.DEFAULT_PROFILE_PATH
+    cpus = os.cpu_count() or 1
+
+    print("🎛️  AUTOAJUSTE DE DESEMPENHO")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        samples = autotune_samples(args, work_dir)
+        if not samples:
+            print("❌ Nenhum arquivo de amostra encontrado")
+            return False
+        trial_dir = os.path.join(work_dir, "trial")
+        decoded = [ms.load_mono(path) for path in samples]
+        audio_seconds = sum(len(audio) / sr for audio, sr in decoded)
+        print(f"   Amostras: {len(samples)} arquivo(s), {audio_seconds:.0f}s de áudio; {cpus} núcleo(s)")
+
+        backend_timings, backend_setup = tune_backend(ms, decoded)
+        backend = pick_fastest(backend_timings)
+        report_timings("Backend (preparo a frio + detecção)", backend_timings, backend, audio_seconds)
+        print("      preparo: " + ", ".join(f"{name} {seconds:.3f}s" for name, seconds in backend_setup.items()))
+        processor = ms.GPUAudioProcessor(backend=ms.make_backend(backend))
+
+        # Aquecimento: imports e caches do primeiro arquivo não entram nas medidas
+        run_trial(samples[:1], trial_dir, lambda files: processor.process_batch_parallel(files, 1))
+
+        worker_options = sorted({1, 2, 4, 8, 16, cpus} & set(range(1, min(2 * cpus, len(samples)) + 1)))
+        worker_timings = {}
+        for workers in worker_options:
+            worker_timings[workers] = run_trial(
+                samples, trial_dir, lambda files: processor.process_batch_parallel(files, workers))
+        workers = pick_fastest(worker_timings)
+        report_timings("Threads de processamento", worker_timings, workers, audio_seconds)
+
+        # Lote 0 = um arquivo por thread (o modo medido acima)
+        batch_timings = {0: worker_timings[workers]}
+        for batch_size in [size for size in (4, 16, 64) if size <= len(samples)]:
+            batch_timings[batch_size] = run_trial(
+                samples, trial_dir,
+                lambda files: processor.process_batch_vectorized(files, batch_size, workers))
+        batch_size = pick_fastest(batch_timings)
+        report_timings("Tamanho do lote vetorizado", batch_timings, batch_size, audio_seconds)
+
+        block_timings = {}
+        for block_size in (65536, 262144, 1048576):
+            streaming = ms.GPUAudioProcessor(backend=processor.backend, streaming=True,
+                                             block_size=block_size)
+            block_timings[block_size] = run_trial(
+                samples, trial_dir, lambda files: streaming.process_batch_parallel(files, workers))
+        block_size = pick_fastest(block_timings)
+        report_timings("Bloco do modo streaming (frames)", block_timings, block_size, audio_seconds)
+
+    torch = sys.modules.get('torch')
+    profile = {
+        'version': ms.PROFILE_VERSION,
+        'created': datetime.now(timezone.utc).isoformat(),
+        'host': platform.node(),
+        'cpus': cpus,
+        'gpu': torch.cuda.get_device_name() if torch is not None and torch.cuda.is_available() else None,
+        'samples': {'files': len(samples), 'audio_seconds': round(audio_seconds, 3)},
+        'options': {
+            'backend': backend,
+            'workers': workers,
+            'batch_size': batch_size,
+            'block_size': block_size,
+        },
+        'measurements': {
+            'backend': backend_timings,
+            'backend_setup': backend_setup,
+            'workers': worker_timings,
+            'batch_size': batch_timings,
+            'block_size': block_timings,
+        },
+    }
+
+    # Grava em um temporário e renomeia: nunca deixa um perfil pela metade
+    os.makedirs(os.path.dirname(os.path.abspath(profile_path)), exist_ok=True)
+    temp_path = profile_path + ".tmp"
+    with open(temp_path, 'w') as f:
+        json.dump(profile, f, indent=2)
+    os.replace(temp_path, profile_path)
+
+    print("\n" + "=" * 50)
+    print(f"💾 Perfil salvo em {profile_path}")
+    print(f"   backend={backend}, workers={workers}, batch_size={batch_size}, block_size={block_size}")
+    print("   manage-silence.py passa a usar esses valores (a linha de comando tem prioridade)")
+    return True
+
+def parse_args(argv=None):
+    """Lê as opções de linha de comando"""
+    parser = argparse.ArgumentParser(description="Verifica se o sistema está pronto e, "
+                                                 "com --autotune, mede a melhor configuração")
+    parser.add_argument("--autotune", action="store_true",
+                        help="Mede backends, workers, lotes e blocos e grava o perfil de ajuste")
+    parser.add_argument("--profile", metavar="PATH",
+                        help="Onde gravar o perfil (padrão: o que manage-silence.py lê, "
+                             "~/.config/manage-silence/profile.json)")
+    parser.add_argument("--autotune-dir", metavar="DIR",
+                        help="Usa os áudios desta pasta como amostra (são copiados, não alterados)")
+    parser.add_argument("--autotune-files", type=int, default=16,
+                        help="Arquivos de teste gerados sem --autotune-dir (padrão: 16)")
+    parser.add_argument("--autotune-duration", type=float, default=20.0,
+                        help="Duração (s) de cada arquivo de teste gerado (padrão: 20)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
     """Função principal"""
+    args = parse_args(argv)
+    if args.autotune:
+        return 0 if autotune(args) else 1
+
     print("🔍 VERIFICAÇÃO DO SISTEMA")
     print("=" * 50)
     
@@ -208,4 +446,4 @@ def main():
         print("💡 Execute: python install_gpu_deps.py")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Gerador determinístico de corpus sintético para testes de carga
+
+Cada arquivo simula uma gravação de fala: rajadas com envelope de sílabas
+(voz com harmônicos + ruído de fricativas), pausas curtas e longas,
+silêncio no início e no fim e um ruído de sala que pode ficar abaixo ou
+acima do limite de silêncio. O áudio é gerado e gravado em blocos, então
+arquivos de horas e corpora de milhares de arquivos não passam pela
+memória inteiros. A mesma semente gera sempre o mesmo corpus, com
+qualquer número de jobs (no OGG só o número de série do stream muda; as
+amostras são idênticas).
+
+Exemplos:
+    python generate_corpus.py --files 1000 --min-duration 5 --max-duration 120
+    python generate_corpus.py --files 3 --min-duration 3600 --max-duration 7200 --formats flac
+"""
+
+import os
+import json
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+import numpy as np
+import soundfile as sf
+from scipy import signal
+
+# Extensão → (formato soundfile, subtipo)
+CONTAINERS = {
+    'wav': ('WAV', 'PCM_16'),
+    'flac': ('FLAC', 'PCM_16'),
+    'ogg': ('OGG', 'VORBIS'),
+    'mp3': ('MP3', 'MPEG_LAYER_III'),
+}
+
+MANIFEST_NAME = "manifest.json"
+
+def db_to_amplitude(db: float) -> float:
+    return 10 ** (db / 20)
+
+def plan_file(seed: int, index: int, args: argparse.Namespace) -> Dict:
+    """
+    Sorteia os parâmetros e a linha do tempo de fala de um arquivo
+
+    Só depende da semente e do índice, então o plano de cada arquivo é o
+    mesmo independente da ordem ou do processo em que é gerado.
+
+    Returns:
+        Entrada do manifesto, com os trechos de fala em segundos
+    """
+    rng = np.random.default_rng([seed, index])
+    container = args.formats[rng.integers(len(args.formats))]
+    duration = float(rng.uniform(args.min_duration, args.max_duration))
+
+    # Silêncio nas bordas: até 10% da duração (no máximo 30s) de cada lado
+    lead = float(rng.uniform(0, min(0.1 * duration, 30.0)))
+    tail = float(rng.uniform(0, min(0.1 * duration, 30.0)))
+
+    speech = []
+    cursor = lead
+    while cursor < duration - tail:
+        talk = float(rng.exponential(args.mean_talk))
+        end = min(cursor + max(talk, 0.3), duration - tail)
+        speech.append([round(cursor, 4), round(end, 4)])
+
+        # Pausas: a maioria curta (respiração), algumas longas
+        if rng.random() < args.long_pause_rate:
+            cursor = end + float(rng.uniform(1.5, 8.0))
+        else:
+            cursor = end + float(rng.uniform(0.15, 0.8))
+
+    return {
+        'file': f"corpus_{index:05d}.{container}",
+        'index': index,
+        'container': container,
+        'sample_rate': int(args.sample_rates[rng.integers(len(args.sample_rates))]),
+        'channels': int(args.channels[rng.integers(len(args.channels))]),
+        'duration': round(duration, 4),
+        'noise_floor_db': round(float(rng.uniform(*args.noise_floor_db)), 2),
+        'speech_level_db': round(float(rng.uniform(-18, -6)), 2),
+        'pitch_hz': round(float(rng.uniform(90, 240)), 2),
+        'syllable_rate': round(float(rng.uniform(3.5, 6.0)), 3),
+        'speech': speech,
+    }
+
+class SpeechSynth:
+    """
+    Sintetiza fala e ruído de sala bloco a bloco, com estado contínuo
+
+    Fase do oscilador e estado dos filtros passam de um bloco para o
+    seguinte, então o resultado não tem emendas entre blocos.
+    """
+
+    def __init__(self, plan: Dict, rng: np.random.Generator):
+        self.sr = plan['sample_rate']
+        self.rng = rng
+        self.pitch = plan['pitch_hz']
+        self.syllable_rate = plan['syllable_rate']
+        self.speech_gain = db_to_amplitude(plan['speech_level_db'])
+
+        speech = np.array(plan['speech'], dtype=np.float64).reshape(-1, 2)
+        self.starts = speech[:, 0] * self.sr
+        self.ends = speech[:, 1] * self.sr
+        self.ramp = 0.01 * self.sr
+
+        # Intensidade de cada sílaba (sorteada de antemão; poucos valores por segundo)
+        self.syllable_gain = rng.uniform(0.2, 1.0, int(plan['duration'] * self.syllable_rate) + 2)
+        self.phase = 0.0
+
+        # Fricativas: ruído em banda de 1–4 kHz (limitada pela taxa)
+        high = min(4000.0, 0.45 * self.sr)
+        self.band = signal.butter(2, [1000.0, high], btype='bandpass', fs=self.sr)
+        self.band_state = signal.lfilter_zi(*self.band) * 0
+
+        # Ruído de sala: branco passado por um passa-baixa de um polo,
+        # escalado para o RMS do nível sorteado
+        self.pole = 0.95
+        self.floor_state = np.zeros(1)
+        gain = np.sqrt((1 - self.pole) / (1 + self.pole))
+        self.floor_scale = db_to_amplitude(plan['noise_floor_db']) / gain
+
+    def gate(self, index: np.ndarray) -> np.ndarray:
+        """Ganho 0–1 de cada amostra: dentro de um trecho de fala, com rampas de 10ms"""
+        if len(self.starts) == 0:
+            return np.zeros(len(index))
+        position = np.searchsorted(self.starts, index, side='right') - 1
+        valid = position >= 0
+        position = np.maximum(position, 0)
+        distance = np.minimum(index - self.starts[position], self.ends[position] - index)
+        return np.where(valid, np.clip(distance / self.ramp, 0.0, 1.0), 0.0)
+
+    def render(self, offset: int, frames: int) -> np.ndarray:
+        """Gera `frames` amostras mono a partir da amostra `offset`"""
+        index = np.arange(offset, offset + frames, dtype=np.float64)
+        t = index / self.sr
+
+        # Voz: harmônicos de um pitch com vibrato lento, fase acumulada
+        pitch = self.pitch * (1 + 0.08 * np.sin(2 * np.pi * 0.3 * t))
+        phase = self.phase + 2 * np.pi * np.cumsum(pitch) / self.sr
+        self.phase = float(phase[-1] % (2 * np.pi))
+        voiced = sum(np.sin(k * phase) / k for k in range(1, 9))
+
+        fricative, self.band_state = signal.lfilter(*self.band, self.rng.standard_normal(frames),
+                                                    zi=self.band_state)
+
+        # Envelope de sílabas: pulsos de cosseno elevado com intensidade variável
+        cycles = self.syllable_rate * t
+        envelope = (0.5 - 0.5 * np.cos(2 * np.pi * cycles)) ** 1.5
+        envelope *= self.syllable_gain[np.minimum(cycles.astype(np.int64), len(self.syllable_gain) - 1)]
+
+        speech = (0.25 * voiced + 0.5 * fricative) * envelope * self.gate(index)
+
+        floor, self.floor_state = signal.lfilter([1 - self.pole], [1, -self.pole],
+                                                 self.rng.standard_normal(frames), zi=self.floor_state)
+        return self.speech_gain * speech + self.floor_scale * floor
+
+def generate_file(plan: Dict, seed: int, output_dir: str, block_seconds: float) -> Dict:
+    """
+    Gera um arquivo do corpus em blocos e grava com nome final só no fim
+
+    Returns:
+        Entrada do manifesto, com o número de frames gravados
+    """
+    rng = np.random.default_rng([seed, plan['index'], 1])
+    synth = SpeechSynth(plan, rng)
+    sr, channels = plan['sample_rate'], plan['channels']
+    container, subtype = CONTAINERS[plan['container']]
+    total = int(plan['duration'] * sr)
+    block = max(1, int(block_seconds * sr))
+
+    # Canais extras: mesma fonte com ganho diferente e um pouco de ruído próprio
+    channel_gain = np.linspace(1.0, 0.7, channels)
+
+    path = os.path.join(output_dir, plan['file'])
+    temp_path = path + ".part"
+    with sf.SoundFile(temp_path, 'w', sr, channels, subtype, format=container) as output:
+        for offset in range(0, total, block):
+            frames = min(block, total - offset)
+            mono = synth.render(offset, frames)
+            data = mono[:, None] * channel_gain[None, :]
+            if channels > 1:
+                data[:, 1:] += synth.floor_scale * 0.05 * rng.standard_normal((frames, channels - 1))
+            output.write(np.clip(data, -1.0, 1.0))
+    os.replace(temp_path, path)
+
+    return dict(plan, frames=total)
+
+def parse_list(value: str, cast=float) -> List:
+    return [cast(item) for item in value.split(',') if item.strip()]
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Lê as opções de linha de comando"""
+    parser = argparse.ArgumentParser(description="Gera um corpus sintético de gravações de fala")
+    parser.add_argument("--output-dir", default="corpus",
+                        help="Pasta do corpus (padrão: corpus)")
+    parser.add_argument("--files", type=int, default=100,
+                        help="Número de arquivos (padrão: 100)")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="Semente do corpus (padrão: 0)")
+    parser.add_argument("--min-duration", type=float, default=5.0,
+                        help="Duração mínima em segundos (padrão: 5)")
+    parser.add_argument("--max-duration", type=float, default=120.0,
+                        help="Duração máxima em segundos (padrão: 120)")
+    parser.add_argument("--sample-rates", type=lambda value: parse_list(value, int),
+                        default=[16000, 22050, 44100, 48000],
+                        help="Taxas de amostragem sorteadas (padrão: 16000,22050,44100,48000)")
+    parser.add_argument("--channels", type=lambda value: parse_list(value, int), default=[1, 2],
+                        help="Números de canais sorteados (padrão: 1,2)")
+    parser.add_argument("--formats", type=lambda value: parse_list(value, str),
+                        default=['wav', 'flac', 'ogg'],
+                        help=f"Contêineres sorteados, entre {', '.join(CONTAINERS)} (padrão: wav,flac,ogg)")
+    parser.add_argument("--noise-floor-db", type=parse_list, default=[-75.0, -35.0],
+                        help="Faixa do ruído de sala em dBFS, 'min,max' (padrão: -75,-35)")
+    parser.add_argument("--mean-talk", type=float, default=6.0,
+                        help="Duração média (s) de cada trecho de fala (padrão: 6)")
+    parser.add_argument("--long-pause-rate", type=float, default=0.2,
+                        help="Fração das pausas que são longas, 1.5–8s (padrão: 0.2)")
+    parser.add_argument("--block-seconds", type=float, default=10.0,
+                        help="Tamanho do bloco de geração em segundos (padrão: 10)")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1,
+                        help="Arquivos gerados em paralelo (padrão: número de núcleos)")
+    args = parser.parse_args(argv)
+
+    unknown = set(args.formats) - set(CONTAINERS)
+    if unknown:
+        parser.error(f"formato desconhecido: {', '.join(sorted(unknown))}")
+    if len(args.noise_floor_db) != 2:
+        parser.error("--noise-floor-db espera 'min,max'")
+    return args
+
+def generate_corpus(argv: Optional[List[str]] = None) -> Dict:
+    args = parse_args(argv)
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    plans = [plan_file(args.seed, index, args) for index in range(args.files)]
+    total_seconds = sum(plan['duration'] for plan in plans)
+    print(f"🎲 Gerando {args.files} arquivo(s), {total_seconds / 3600:.2f}h de áudio "
+          f"(semente {args.seed}, {args.jobs} em paralelo)")
+
+    entries = []
+    with ProcessPoolExecutor(max_workers=args.jobs) as executor:
+        futures = [executor.submit(generate_file, plan, args.seed, args.output_dir, args.block_seconds)
+                   for plan in plans]
+        for i, future in enumerate(futures, 1):
+            entries.append(future.result())
+            if i % 100 == 0 or i == len(futures):
+                print(f"  [{i}/{len(futures)}] {entries[-1]['file']}")
+
+    manifest = {
+        'seed': args.seed,
+        'total_seconds': round(total_seconds, 4),
+        'files': entries,
+    }
+    with open(os.path.join(args.output_dir, MANIFEST_NAME), 'w') as f:
+        json.dump(manifest, f, indent=1)
+
+    print(f"✅ Corpus salvo em '{args.output_dir}' (manifesto: {MANIFEST_NAME})")
+    return manifest
+
+if __name__ == "__main__":
+    generate_corpus()
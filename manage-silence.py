@@ -1,215 +1,4327 @@
 import os
+import sys
+import csv
+import json
+import heapq
+import fnmatch
+import itertools
+import hashlib
+import shutil
+import sqlite3
+import signal
+import socket
+import stat as stat_module
+import struct
+import subprocess
+import tempfile
+import cProfile
+import pstats
+import contextlib
 import numpy as np
-import librosa
 import soundfile as sf
-import torch
-import torch.nn.functional as F
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import importlib.util
+from concurrent.futures import Future, ThreadPoolExecutor, ProcessPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
 import time
-from typing import List, Tuple, Optional
+import queue
+import platform
+import threading
+import argparse
+from typing import Dict, Iterable, Iterator, List, Tuple, Optional
 
-# Configuração para usar GPU se disponível
-device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
-print(f"🚀 Usando dispositivo: {device}")
-if torch.cuda.is_available():
-    print(f"   GPU: {torch.cuda.get_device_name()}")
-    print(f"   Memória GPU: {torch.cuda.get_device_properties(0).total_memory / 1e9:.1f} GB")
+try:
+    import resource
+except ImportError:  # Windows: sem getrusage
+    resource = None
+
+# PyTorch e o dispositivo só são carregados na primeira detecção que precisa
+# deles (load_torch): importar torch leva segundos, e --help, hosts só com
+# CPU e chamadas por arquivo não devem pagar esse custo
+torch = None
+device = None
+_TORCH_LOCK = threading.Lock()
+
+def load_torch():
+    """
+    Importa o PyTorch (uma vez) e configura o dispositivo
+
+    Returns:
+        O módulo torch, ou None se não estiver instalado
+    """
+    global torch, device
+    with _TORCH_LOCK:
+        if torch is None:
+            try:
+                import torch as module
+            except ImportError:
+                return None
+
+            # Configuração para usar GPU se disponível
+            device = module.device('cuda' if module.cuda.is_available() else 'cpu')
+            print(f"🚀 Usando dispositivo: {device}")
+            if module.cuda.is_available():
+                print(f"   GPU: {module.cuda.get_device_name()}")
+                print(f"   Memória GPU: {module.cuda.get_device_properties(0).total_memory / 1e9:.1f} GB")
+            torch = module
+    return torch
+
+def cuda_driver_present() -> bool:
+    """Indício barato (sem importar torch) de que há uma GPU NVIDIA utilizável"""
+    if os.environ.get('CUDA_VISIBLE_DEVICES') in ('', '-1'):
+        return False
+    return os.path.exists('/proc/driver/nvidia/version') or shutil.which('nvidia-smi') is not None
+
+def gpu_expected(backend: str) -> bool:
+    """Se o backend escolhido vai rodar na GPU, sem criá-lo (nem importar torch)"""
+    return backend in ('auto', 'torch') and cuda_driver_present()
+
+def is_tensor(audio) -> bool:
+    """Se o áudio é um tensor PyTorch, sem importar torch para descobrir"""
+    module = sys.modules.get('torch')
+    return module is not None and module.is_tensor(audio)
+
+# Tamanho padrão de bloco (em frames) para leitura em streaming
+DEFAULT_BLOCK_SIZE = 262144
+
+# Extensões suportadas (librosa suporta mais formatos)
+AUDIO_EXTENSIONS = ('.wav', '.mp3', '.m4a', '.flac', '.ogg', '.aac', '.wma')
+AUDIO_SUFFIXES = frozenset(AUDIO_EXTENSIONS)
+
+# Arquivos descobertos à frente do processamento para ordenar os mais longos primeiro
+DEFAULT_LOOKAHEAD = 1000
+
+# Perfil de ajuste da máquina, gerado por `check_system.py --autotune`
+DEFAULT_PROFILE_PATH = os.path.join(os.path.expanduser("~"), ".config", "manage-silence", "profile.json")
+PROFILE_VERSION = 1
+
+# Opções que o perfil pode definir (quando não vêm da linha de comando)
+PROFILE_OPTIONS = ('backend', 'workers', 'batch_size', 'block_size', 'window_ms', 'hop_divisor')
+
+def load_tuning_profile(path: str) -> Dict:
+    """
+    Lê o perfil de ajuste gerado por `check_system.py --autotune`
+
+    Perfis de outra máquina ou de outra versão são ignorados, já que os
+    números foram medidos em outro hardware.
+
+    Args:
+        path: Caminho do perfil (JSON)
+
+    Returns:
+        Opções do perfil (vazio se não houver perfil utilizável)
+    """
+    try:
+        with open(path) as f:
+            profile = json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        print(f"⚠️  Perfil de ajuste ilegível ({path}): {e}")
+        return {}
+
+    if profile.get('version') != PROFILE_VERSION:
+        print(f"⚠️  Perfil de ajuste de outra versão, ignorado: {path}")
+        return {}
+    if profile.get('host') != platform.node():
+        print(f"⚠️  Perfil de ajuste gerado em '{profile.get('host')}', ignorado: {path}")
+        return {}
+    return {key: profile['options'][key] for key in PROFILE_OPTIONS if key in profile.get('options', {})}
+
+def window_energy(buffer: np.ndarray, count: int, window_size: int, hop_length: int) -> np.ndarray:
+    """
+    Média dos quadrados das `count` primeiras janelas de um buffer
+
+    A janela i cobre [i * hop_length, i * hop_length + window_size); o que
+    passar do fim do buffer conta como zero (mesmo padding de detect_silence_gpu).
+    """
+    cumsum = np.concatenate(([0.0], np.cumsum(np.square(buffer, dtype=np.float64))))
+    starts = np.minimum(np.arange(count) * hop_length, len(buffer))
+    ends = np.minimum(starts + window_size, len(buffer))
+    return (cumsum[ends] - cumsum[starts]) / window_size
+
+class NumpyBackend:
+    """
+    Envelope por soma acumulada em NumPy (referência dos outros backends)
+
+    Todo backend segue o mesmo contrato: transfer() leva um lote
+    (arquivos, amostras) para onde o envelope é calculado, energy() devolve
+    a média dos quadrados por janela (soma acumulada sequencial em float64)
+    e mask() aplica o limiar e traz a máscara para o host. Com a mesma
+    ordem de soma, os backends de CPU dão máscaras (e cortes) idênticos bit
+    a bit.
+    """
+
+    name = 'numpy'
+    # Bytes por amostra usados no host pelo envelope (quadrados, soma
+    # acumulada e a cópia do concatenate, todos em float64)
+    scratch_bytes = 24
+
+    def transfer(self, packed: np.ndarray):
+        """Leva o lote para o dispositivo do backend"""
+        return packed
+
+    def synchronize(self) -> None:
+        """Espera o trabalho assíncrono terminar (só importa na GPU)"""
+
+    def energy(self, data, window_size: int, hop_length: int):
+        """Média dos quadrados de cada janela, na última dimensão"""
+        num_samples = data.shape[-1]
+        count = num_samples // hop_length + 1
+        rows = data.reshape(int(np.prod(data.shape[:-1])), num_samples)
+        energy = np.empty((len(rows), count), dtype=np.float64)
+        for row, audio in enumerate(rows):
+            energy[row] = window_energy(audio, count, window_size, hop_length)
+        return energy.reshape(data.shape[:-1] + (count,))
+
+    def mask(self, energy, threshold: float) -> np.ndarray:
+        """Máscara de janelas não-silenciosas, no host"""
+        return np.sqrt(energy) > threshold
+
+def numba_energy_kernel():
+    """
+    Carrega (uma vez) o kernel Numba de silence_kernels.py
+
+    O kernel fica em um módulo próprio, sempre carregado com o mesmo nome: o
+    cache em disco do Numba reimporta o módulo de origem pelo nome, e este
+    script roda tanto como __main__ quanto carregado por outros scripts.
+    """
+    if 'silence_kernels' not in sys.modules:
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'silence_kernels.py')
+        spec = importlib.util.spec_from_file_location('silence_kernels', path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        sys.modules['silence_kernels'] = module
+    return sys.modules['silence_kernels'].window_energy_kernel
+
+class NumbaBackend(NumpyBackend):
+    """Envelope em um kernel Numba de passada única, sem o buffer da soma acumulada"""
+
+    name = 'numba'
+    scratch_bytes = 0
+
+    def __init__(self):
+        self.kernel = numba_energy_kernel()
+
+    def energy(self, data, window_size: int, hop_length: int):
+        num_samples = data.shape[-1]
+        count = num_samples // hop_length + 1
+        rows = data.reshape(int(np.prod(data.shape[:-1])), num_samples)
+        energy = np.empty((len(rows), count), dtype=np.float64)
+        for row, audio in enumerate(rows):
+            self.kernel(np.ascontiguousarray(audio), window_size, hop_length, energy[row])
+        return energy.reshape(data.shape[:-1] + (count,))
+
+class TorchBackend:
+    """Envelope por soma acumulada em tensores PyTorch (CPU ou GPU)"""
+
+    name = 'torch'
+
+    def __init__(self, target=None):
+        if load_torch() is None:
+            raise RuntimeError("backend 'torch' requer o PyTorch")
+        self.device = target if target is not None else device
+        # Na CPU, a cópia float64 onde a soma acumulada é feita in-place
+        self.scratch_bytes = 0 if self.device.type == 'cuda' else 8
+
+    def transfer(self, packed: np.ndarray):
+        if torch.is_tensor(packed):
+            return packed.to(self.device)
+        return torch.from_numpy(np.ascontiguousarray(packed)).to(self.device)
+
+    def synchronize(self) -> None:
+        if self.device.type == 'cuda':
+            torch.cuda.synchronize(self.device)
+
+    @staticmethod
+    def prefix_energy(audio_tensor: 'torch.Tensor', window_size: int, hop_length: int) -> 'torch.Tensor':
+        """Média dos quadrados por janela, com as amostras na última dimensão"""
+        num_samples = audio_tensor.shape[-1]
+        if num_samples == 0:
+            return torch.zeros(audio_tensor.shape[:-1] + (1,), dtype=torch.float64, device=audio_tensor.device)
+
+        # Soma acumulada dos quadrados em float64, calculada in-place: custo
+        # O(n) e um único buffer, independente da sobreposição das janelas
+        cumsum = audio_tensor.to(torch.float64)
+        cumsum.mul_(cumsum)
+        cumsum.cumsum_(-1)
+
+        # Janela i cobre [i * hop, i * hop + window), com padding de zeros no final
+        starts = torch.arange(num_samples // hop_length + 1, device=audio_tensor.device) * hop_length
+        ends = torch.clamp(starts + window_size, max=num_samples)
+        zero = torch.zeros((), dtype=torch.float64, device=audio_tensor.device)
+        upper = torch.where(ends > 0, cumsum[..., (ends - 1).clamp(min=0)], zero)
+        lower = torch.where(starts > 0, cumsum[..., (starts - 1).clamp(min=0)], zero)
+        del cumsum
+
+        return torch.clamp(upper - lower, min=0) / window_size
+
+    def energy(self, data, window_size: int, hop_length: int):
+        return self.prefix_energy(self.transfer(data), window_size, hop_length)
+
+    def mask(self, energy, threshold: float) -> np.ndarray:
+        # Só a máscara (uma fração do tamanho do áudio) volta para a CPU
+        return (torch.sqrt(energy) > threshold).cpu().numpy()
+
+BACKENDS = ('auto', 'numpy', 'numba', 'torch')
+
+def numba_available() -> bool:
+    return importlib.util.find_spec('numba') is not None
+
+def make_backend(name: str = 'auto'):
+    """
+    Cria o backend de detecção pelo nome
+
+    'auto' usa torch quando há GPU CUDA, senão o kernel Numba (mais rápido
+    que torch na CPU e sem o custo de importá-lo) e, sem Numba, NumPy. Sem
+    driver NVIDIA, o torch nem chega a ser importado.
+    """
+    if name == 'auto':
+        if (cuda_driver_present() and importlib.util.find_spec('torch') is not None
+                and load_torch().cuda.is_available()):
+            return TorchBackend()
+        return NumbaBackend() if numba_available() else NumpyBackend()
+    if name == 'numpy':
+        return NumpyBackend()
+    if name == 'numba':
+        if not numba_available():
+            raise RuntimeError("backend 'numba' requer o pacote numba")
+        return NumbaBackend()
+    if name == 'torch':
+        return TorchBackend()
+    raise ValueError(f"backend desconhecido: {name}")
+
+class StreamingRMSEnvelope:
+    """
+    Envelope RMS incremental, alimentado bloco a bloco
+
+    Produz exatamente as mesmas janelas de detect_silence_gpu (janela de
+    window_size amostras a cada hop_length, com padding de zeros no final),
+    mas mantém em memória apenas o bloco atual mais uma janela de sobra.
+    """
+
+    def __init__(self, window_size: int, hop_length: int):
+        self.window_size = window_size
+        self.hop_length = hop_length
+        self.total_samples = 0
+        self._buffer = np.zeros(0, dtype=np.float64)
+        self._energies = []
+        self._emitted = 0
+
+    def update(self, block: np.ndarray) -> np.ndarray:
+        """
+        Adiciona um bloco mono de amostras ao envelope
+
+        Returns:
+            Energia das janelas que ficaram completas com este bloco
+        """
+        block = np.asarray(block, dtype=np.float64)
+        self.total_samples += len(block)
+        buffer = np.concatenate((self._buffer, block))
+        energy = np.zeros(0, dtype=np.float64)
+
+        if len(buffer) >= self.window_size:
+            # Janelas completas podem ser calculadas imediatamente
+            count = (len(buffer) - self.window_size) // self.hop_length + 1
+            energy = window_energy(buffer, count, self.window_size, self.hop_length)
+            self._energies.append(energy)
+            self._emitted += count
+            buffer = buffer[count * self.hop_length:].copy()
+
+        self._buffer = buffer
+        return energy
+
+    def finish(self) -> np.ndarray:
+        """Fecha o envelope e retorna a energia média de todas as janelas"""
+        total_windows = self.total_samples // self.hop_length + 1
+        remaining = total_windows - self._emitted
+        if remaining > 0:
+            # Janelas finais recebem padding implícito de zeros
+            self._energies.append(window_energy(self._buffer, remaining, self.window_size, self.hop_length))
+            self._emitted += remaining
+        self._buffer = np.zeros(0, dtype=np.float64)
+
+        if not self._energies:
+            return np.zeros(0, dtype=np.float64)
+        return np.concatenate(self._energies)
+
+class StreamingTrimmer:
+    """
+    Remove silêncio em uma única passada sobre um stream de PCM
+
+    Recebe blocos (frames, canais) em ordem, decide os cortes à medida que
+    as janelas do envelope ficam completas e entrega ao writer apenas o
+    áudio mantido, com o mesmo resultado de GPUAudioProcessor sobre o
+    arquivo completo. Só o trecho ainda indeciso (silêncio depois do último
+    som) fica em memória: com remove_internal_silence ele é limitado por
+    min_silence_duration; no modo só-bordas, em formatos que aceitam
+    truncate (PCM sem compressão), passando de max_pending_seconds ele é
+    gravado e, se acabar sendo o silêncio final, cortado no fim.
+    """
+
+    # Formatos soundfile em que o writer aceita truncate durante a escrita
+    TRUNCATABLE_FORMATS = {'WAV', 'WAVEX', 'W64', 'AIFF', 'AU', 'CAF', 'RAW'}
+
+    def __init__(self, processor: 'GPUAudioProcessor', sr: int, writer,
+                 max_pending_seconds: float = 120.0):
+        self.sr = sr
+        self.writer = writer
+        self.window_size, self.hop_length = processor.window_params(sr)
+        self.envelope = StreamingRMSEnvelope(self.window_size, self.hop_length)
+        self.threshold = processor.db_to_amplitude(processor.silence_threshold_db)
+        self.remove_internal_silence = processor.remove_internal_silence
+        self.min_silence = int(processor.min_silence_duration * sr)
+        self.pad = int(min(processor.silence_gap, processor.min_silence_duration) * sr) // 2
+        self.max_pending = int(max_pending_seconds * sr)
+        self.can_truncate = getattr(writer, 'format', None) in self.TRUNCATABLE_FORMATS
+
+        self._pending = []          # blocos ainda não decididos, em ordem
+        self._pending_start = 0     # índice global do primeiro frame pendente
+        self._pending_frames = 0
+        self._held = []             # início de uma pausa longa, mantido como respiro
+        self._evaluated = 0         # próxima janela a avaliar
+        self.sound_end = None       # fim do último trecho com som (amostra global)
+        self.frames_in = 0
+        self.frames_written = 0
+        self._confirmed = 0         # frames gravados que com certeza ficam
+
+    def _take(self, upto: int) -> List[np.ndarray]:
+        """Remove da fila os frames pendentes anteriores a `upto`"""
+        count = min(upto - self._pending_start, self._pending_frames)
+        taken = []
+        while count > 0:
+            block = self._pending[0]
+            if len(block) <= count:
+                taken.append(self._pending.pop(0))
+                count -= len(block)
+                self._pending_start += len(block)
+                self._pending_frames -= len(block)
+            else:
+                taken.append(block[:count])
+                self._pending[0] = block[count:]
+                self._pending_start += count
+                self._pending_frames -= count
+                count = 0
+        return taken
+
+    def _write(self, blocks: List[np.ndarray]) -> None:
+        for block in blocks:
+            self.writer.write(block)
+            self.frames_written += len(block)
+
+    def _on_sound(self, window: int) -> None:
+        """Trata uma janela com som: decide a pausa anterior a ela"""
+        start = window * self.hop_length
+        end = (window + 1) * self.hop_length + self.window_size
+
+        if self.sound_end is None:
+            # Primeiro som: tudo antes dele é silêncio inicial
+            self._take(start)
+        elif start > self.sound_end:
+            gap = start - self.sound_end
+            if self.remove_internal_silence and gap > self.min_silence:
+                if not self._held:
+                    self._held = self._take(self.sound_end + self.pad)
+                self._write(self._held)
+                self._held = []
+                self._take(start - self.pad)
+
+        self.sound_end = end if self.sound_end is None else max(self.sound_end, end)
+
+    def _advance(self, energy: np.ndarray) -> None:
+        for offset in np.flatnonzero(np.sqrt(energy) > self.threshold):
+            self._on_sound(self._evaluated + int(offset))
+        self._evaluated += len(energy)
+
+        if self.sound_end is None:
+            # Nenhum som ainda: som futuro só pode começar na próxima janela
+            self._take(self._evaluated * self.hop_length)
+            return
+
+        # O que vai até o fim do último som já está decidido
+        if self._pending_start <= self.sound_end:
+            self._write(self._take(self.sound_end))
+            self._confirmed = self.frames_written
+
+        next_start = self._evaluated * self.hop_length
+        if self.remove_internal_silence and next_start - self.sound_end > self.min_silence:
+            # A pausa atual já é longa: guarda o respiro inicial e descarta o meio
+            if not self._held:
+                self._held = self._take(self.sound_end + self.pad)
+            self._take(next_start - self.pad)
+        elif (not self.remove_internal_silence and self.can_truncate
+              and self._pending_frames > self.max_pending):
+            # Pausa interna longa no modo só-bordas: grava e decide no fim
+            self._write(self._take(self._pending_start + self._pending_frames))
+
+    def feed(self, block: np.ndarray) -> None:
+        """
+        Processa um bloco de frames
+
+        Args:
+            block: Array (frames, canais) em qualquer dtype aceito pelo writer
+        """
+        if len(block) == 0:
+            return
+        self._pending.append(block)
+        self._pending_frames += len(block)
+        self.frames_in += len(block)
+
+        mono = block.mean(axis=1, dtype=np.float64)
+        if np.issubdtype(block.dtype, np.integer):
+            mono /= np.iinfo(block.dtype).max + 1
+        self._advance(self.envelope.update(mono))
+
+    def finish(self) -> int:
+        """
+        Fecha o stream: processa as últimas janelas e descarta o silêncio final
+
+        Returns:
+            Número de frames mantidos
+        """
+        energy = self.envelope.finish()
+        self._advance(energy[self._evaluated:])
+
+        if self.sound_end is not None and self._pending_start <= self.sound_end:
+            self._write(self._take(min(self.sound_end, self.frames_in)))
+            self._confirmed = self.frames_written
+        self._pending, self._held = [], []
+        self._pending_frames = 0
+
+        if self.frames_written > self._confirmed:
+            # Silêncio final já gravado (modo só-bordas com pausa longa)
+            self.writer.truncate(self._confirmed)
+            self.frames_written = self._confirmed
+        return self.frames_written
+
+def load_mono(file_path: str) -> Optional[Tuple[np.ndarray, int]]:
+    """Carrega um arquivo como áudio mono; retorna None em caso de erro"""
+    try:
+        import librosa
+        return librosa.load(file_path, sr=None, mono=True)
+    except Exception as e:
+        print(f"  ❌ Erro ao carregar {os.path.basename(file_path)}: {str(e)}")
+        return None
+
+def replace_file(temp_path: str, file_path: str) -> None:
+    """
+    Substitui file_path por um temporário já completo, resistindo a quedas
+
+    Os dados do temporário vão para o disco (fsync) antes do rename
+    atômico, e o diretório depois dele: após uma queda o destino é o
+    arquivo antigo ou o novo inteiro, nunca um arquivo pela metade.
+    """
+    fd = os.open(temp_path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+    os.replace(temp_path, file_path)
+    # Sem O_DIRECTORY (Windows) não há como sincronizar o diretório
+    if hasattr(os, 'O_DIRECTORY'):
+        fd = os.open(os.path.dirname(os.path.abspath(file_path)), os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+def write_audio(file_path: str, audio_data: np.ndarray, sr: int,
+                block_size: int = DEFAULT_BLOCK_SIZE) -> None:
+    """
+    Equivalente a sf.write, mas gravando em blocos e de forma atômica
+
+    O encoder Vorbis do libsndfile pode travar o processo (segfault)
+    quando recebe milhões de frames em uma única chamada. O áudio é gravado
+    em um temporário ao lado do destino, que só o substitui completo.
+    """
+    channels = 1 if audio_data.ndim == 1 else audio_data.shape[1]
+    temp_path = file_path + ".tmp"
+    # O contêiner vem da extensão do destino, não da do temporário
+    container = os.path.splitext(file_path)[1].lstrip('.').upper()
+    try:
+        with sf.SoundFile(temp_path, 'w', sr, channels, format=container) as output:
+            for start in range(0, len(audio_data), block_size):
+                output.write(audio_data[start:start + block_size])
+        replace_file(temp_path, file_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+def write_segments(file_path: str, audio_data: np.ndarray, sr: int, segments) -> bool:
+    """
+    Grava os trechos mantidos de um áudio já decodificado
+
+    Args:
+        file_path: Destino do áudio processado
+        audio_data: Áudio mono completo
+        sr: Taxa de amostragem
+        segments: Intervalos [início, fim) a manter, em amostras
+
+    Returns:
+        True se gravado (ou mantido) com sucesso, False caso contrário
+    """
+    filename = os.path.basename(file_path)
+    try:
+        trimmed_audio = np.concatenate([audio_data[start:end] for start, end in segments])
+        original_duration = len(audio_data) / sr
+        trimmed_duration = len(trimmed_audio) / sr
+
+        if trimmed_duration < 0.1:  # Se muito curto, mantém original
+            print(f"  ⚠️  {filename}: áudio muito curto após remoção, mantendo original")
+            return True
+
+        print(f"  ⏱️  {filename}: {original_duration:.1f}s → {trimmed_duration:.1f}s "
+              f"({((original_duration - trimmed_duration) / original_duration * 100):.1f}% removido)")
+        write_audio(file_path, trimmed_audio, sr)
+        return True
+
+    except Exception as e:
+        print(f"  ❌ Erro ao salvar {filename}: {str(e)}")
+        return False
+
+class SharedAudio:
+    """
+    Descritor de um áudio mono guardado em memória compartilhada
+
+    Só o descritor (nome do bloco, número de amostras e taxa) é serializado
+    entre processos; as amostras ficam em multiprocessing.shared_memory e
+    nunca passam pelo pickle.
+    """
+
+    def __init__(self, name: str, length: int, sr: int):
+        self.name = name
+        self.length = length
+        self.sr = sr
+
+    @classmethod
+    def from_array(cls, audio_data: np.ndarray, sr: int) -> 'SharedAudio':
+        """Copia o áudio para um novo bloco de memória compartilhada"""
+        audio_data = np.asarray(audio_data, dtype=np.float32)
+        shm = shared_memory.SharedMemory(create=True, size=max(audio_data.nbytes, 1))
+        try:
+            np.ndarray(audio_data.shape, dtype=np.float32, buffer=shm.buf)[:] = audio_data
+        finally:
+            shm.close()
+        return cls(shm.name, len(audio_data), sr)
+
+    @property
+    def duration(self) -> float:
+        return self.length / self.sr
+
+    def apply(self, func, *args):
+        """Executa func(audio, *args) sobre uma visão do bloco, sem copiá-lo"""
+        shm = shared_memory.SharedMemory(name=self.name)
+        try:
+            audio_data = np.ndarray((self.length,), dtype=np.float32, buffer=shm.buf)
+            result = func(audio_data, *args)
+            del audio_data
+            return result
+        finally:
+            try:
+                shm.close()
+            except BufferError:
+                # Ainda há uma visão viva (ex.: num traceback); o mapeamento
+                # é liberado quando ela for coletada
+                pass
+
+    def unlink(self) -> None:
+        """Libera o bloco de memória compartilhada"""
+        try:
+            shm = shared_memory.SharedMemory(name=self.name)
+        except FileNotFoundError:
+            return
+        shm.close()
+        shm.unlink()
+
+def load_mono_shared(file_path: str) -> Optional[SharedAudio]:
+    """Decodifica um arquivo direto para memória compartilhada (roda no worker)"""
+    loaded = load_mono(file_path)
+    if loaded is None:
+        return None
+    audio_data, sr = loaded
+    return SharedAudio.from_array(audio_data, sr)
+
+def write_segments_shared(file_path: str, shared: SharedAudio, segments) -> bool:
+    """Grava os trechos mantidos de um áudio em memória compartilhada (roda no worker)"""
+    return shared.apply(lambda audio_data: write_segments(file_path, audio_data, shared.sr, segments))
+
+def partial_content_key(file_path: str, sample_size: int = 65536) -> str:
+    """
+    Chave de conteúdo barata: tamanho + hash do começo e do fim do arquivo
+
+    Custa no máximo 2 * sample_size bytes de leitura, independente do
+    tamanho do arquivo.
+    """
+    size = os.path.getsize(file_path)
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, 'rb') as f:
+        digest.update(f.read(sample_size))
+        if size > 2 * sample_size:
+            f.seek(size - sample_size)
+        digest.update(f.read(sample_size))
+    return f"{size}:{digest.hexdigest()}"
+
+class AnalysisCache:
+    """
+    Cache persistente de análises, endereçado por conteúdo
+
+    Cada entrada é indexada pela chave de conteúdo do arquivo e pelos
+    parâmetros do detector, e guarda os trechos mantidos e a chave do
+    arquivo gerado. Como a saída também é registrada, um arquivo que já
+    foi processado é reconhecido em O(1) (consulta por caminho + tamanho +
+    mtime, sem ler o arquivo) e não é decodificado de novo.
+
+    Usa SQLite com WAL e timeout de lock, então vários processos podem
+    compartilhar o mesmo cache; o número de entradas é limitado e as
+    menos usadas recentemente são descartadas.
+    """
+
+    def __init__(self, path: str, max_entries: int = 100000):
+        self.path = path
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self._writes = 0
+        self._lock = threading.Lock()
+
+        connection = self._connection()
+        connection.execute("""
+            CREATE TABLE IF NOT EXISTS analysis (
+                content_key TEXT NOT NULL,
+                params TEXT NOT NULL,
+                role TEXT NOT NULL,
+                path TEXT,
+                size INTEGER,
+                mtime_ns INTEGER,
+                segments TEXT,
+                output_key TEXT,
+                last_access REAL,
+                PRIMARY KEY (content_key, params)
+            )
+        """)
+        connection.execute("CREATE INDEX IF NOT EXISTS analysis_stat ON analysis (path, size, mtime_ns, params)")
+        connection.execute("CREATE INDEX IF NOT EXISTS analysis_access ON analysis (last_access)")
+
+    def _connection(self) -> sqlite3.Connection:
+        # Uma conexão por thread; o SQLite cuida do lock entre processos
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            self._local.connection = connection
+        return connection
+
+    def lookup(self, file_path: str, params: str) -> Tuple[Optional[Dict], str]:
+        """
+        Procura o arquivo no cache
+
+        Returns:
+            Tuple com (entrada ou None, chave de conteúdo do arquivo)
+        """
+        connection = self._connection()
+        stat = os.stat(file_path)
+        path = os.path.abspath(file_path)
+
+        row = connection.execute(
+            "SELECT content_key, role, segments, output_key FROM analysis "
+            "WHERE path = ? AND size = ? AND mtime_ns = ? AND params = ?",
+            (path, stat.st_size, stat.st_mtime_ns, params)).fetchone()
+        content_key = row[0] if row else partial_content_key(file_path)
+        if row is None:
+            row = connection.execute(
+                "SELECT content_key, role, segments, output_key FROM analysis "
+                "WHERE content_key = ? AND params = ?", (content_key, params)).fetchone()
+        if row is None:
+            return None, content_key
+
+        connection.execute("UPDATE analysis SET last_access = ? WHERE content_key = ? AND params = ?",
+                           (time.time(), content_key, params))
+        entry = {"role": row[1], "segments": json.loads(row[2]) if row[2] else None, "output_key": row[3]}
+        return entry, content_key
+
+    def record(self, file_path: str, params: str, input_key: str, segments) -> None:
+        """Registra a análise de um arquivo e o arquivo gerado a partir dela"""
+        connection = self._connection()
+        stat = os.stat(file_path)
+        output_key = partial_content_key(file_path)
+        encoded = json.dumps([[int(start), int(end)] for start, end in segments])
+        now = time.time()
+
+        if input_key != output_key:
+            connection.execute(
+                "INSERT OR REPLACE INTO analysis VALUES (?, ?, 'input', NULL, NULL, NULL, ?, ?, ?)",
+                (input_key, params, encoded, output_key, now))
+        connection.execute(
+            "INSERT OR REPLACE INTO analysis VALUES (?, ?, 'output', ?, ?, ?, ?, ?, ?)",
+            (output_key, params, os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns,
+             encoded, output_key, now))
+
+        with self._lock:
+            self._writes += 1
+            evict = self._writes % 100 == 1
+        if evict:
+            self.evict()
+
+    def evict(self) -> None:
+        """Descarta as entradas menos usadas além de max_entries"""
+        connection = self._connection()
+        count = connection.execute("SELECT COUNT(*) FROM analysis").fetchone()[0]
+        if count > self.max_entries:
+            connection.execute(
+                "DELETE FROM analysis WHERE rowid IN "
+                "(SELECT rowid FROM analysis ORDER BY last_access ASC LIMIT ?)",
+                (count - self.max_entries,))
+
+class ProgressJournal:
+    """
+    Diário de progresso: uma linha JSON por arquivo concluído, só acrescentada
+
+    Cada linha guarda o caminho, os parâmetros da detecção, os trechos
+    mantidos e o tamanho e mtime do arquivo gerado. Com --resume, um arquivo
+    cujo tamanho e mtime ainda batem com o diário é pulado com um stat, sem
+    ler o arquivo. Cada linha vai para o disco (fsync) antes do próximo
+    arquivo; uma linha cortada por uma queda no meio da gravação é ignorada.
+
+    Com writer, o diário é uma pasta compartilhada por vários workers (modo
+    distribuído): cada um acrescenta só ao próprio arquivo (writer.jsonl),
+    já que O_APPEND não é atômico entre máquinas no NFS, e lê os de todos.
+
+    Antes de uma regravação no lugar (--inplace-wav), que não é atômica, vai
+    para o diário uma linha de intenção com o estado do original; até a
+    linha de conclusão, uma queda no meio é detectada pelo interrupted().
+    """
+
+    def __init__(self, path: str, writer: Optional[str] = None):
+        self.path = path
+        self.writer = writer
+        self.entries = {}
+        # Regravações no lugar iniciadas e ainda não concluídas, por caminho absoluto
+        self.started = {}
+        self._file = None
+        self._offsets = {}
+        self._lock = threading.Lock()
+        if writer is not None:
+            os.makedirs(path, exist_ok=True)
+            self.output_path = os.path.join(path, f"{writer}.jsonl")
+        else:
+            self.output_path = path
+        self.refresh()
+
+    @staticmethod
+    def _key(file_path: str, params: Dict) -> Tuple[str, str]:
+        return os.path.abspath(file_path), json.dumps(params, sort_keys=True)
+
+    def refresh(self) -> None:
+        """Lê as linhas acrescentadas desde a última leitura (inclusive por outros workers)"""
+        if self.writer is None:
+            paths = [self.path] if os.path.exists(self.path) else []
+        else:
+            paths = [os.path.join(self.path, name) for name in sorted(os.listdir(self.path))
+                     if name.endswith('.jsonl')]
+        with self._lock:
+            for path in paths:
+                with open(path, 'rb') as f:
+                    f.seek(self._offsets.get(path, 0))
+                    data = f.read()
+                # Uma linha ainda sem o fim de linha pode estar sendo gravada agora
+                complete = data[:data.rfind(b"\n") + 1]
+                self._offsets[path] = self._offsets.get(path, 0) + len(complete)
+                for line in complete.splitlines():
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # Linha incompleta deixada por uma queda
+                    self._add(entry)
+
+    def _add(self, entry: Dict) -> None:
+        if entry.get('state') == 'started':
+            self.started[entry['file']] = entry
+        else:
+            self.started.pop(entry['file'], None)
+            self.entries[self._key(entry['file'], entry['params'])] = entry
+
+    def done(self, file_path: str, params: Dict) -> bool:
+        """True se o arquivo está no diário com estes parâmetros e não mudou desde então"""
+        entry = self.entries.get(self._key(file_path, params))
+        if entry is None:
+            return False
+        stat = os.stat(file_path)
+        return (stat.st_size, stat.st_mtime_ns) == (entry['size'], entry['mtime_ns'])
+
+    def interrupted(self, file_path: str) -> bool:
+        """
+        True se uma regravação no lugar do arquivo começou e não terminou, e
+        o arquivo mudou desde então (pode ter ficado pela metade)
+
+        Um original restaurado com a data preservada (ex.: cp -p) volta a
+        ser processado normalmente.
+        """
+        entry = self.started.get(os.path.abspath(file_path))
+        if entry is None:
+            return False
+        stat = os.stat(file_path)
+        return (stat.st_size, stat.st_mtime_ns) != (entry['size'], entry['mtime_ns'])
+
+    def begin(self, file_path: str, params: Dict, segments) -> None:
+        """Registra o início de uma regravação no lugar, antes do primeiro byte mudar"""
+        self.record(file_path, params, segments, state='started')
+
+    def record(self, file_path: str, params: Dict, segments=None, state: str = 'done') -> None:
+        """Acrescenta um arquivo concluído (ou, com state='started', uma intenção) ao diário"""
+        stat = os.stat(file_path)
+        entry = {
+            'file': os.path.abspath(file_path),
+            'params': params,
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'segments': [[int(start), int(end)] for start, end in segments] if segments is not None else None,
+            'time': round(time.time(), 3),
+        }
+        if state != 'done':
+            entry['state'] = state
+        if self.writer is not None:
+            entry['worker'] = self.writer
+        with self._lock:
+            if self._file is None:
+                os.makedirs(os.path.dirname(self.output_path) or os.curdir, exist_ok=True)
+                self._file = open(self.output_path, 'ab+')
+                # Uma queda pode ter deixado a última linha sem o fim de linha
+                if self._file.seek(0, os.SEEK_END) > 0:
+                    self._file.seek(-1, os.SEEK_END)
+                    if self._file.read(1) != b"\n":
+                        self._file.write(b"\n")
+            self._file.write((json.dumps(entry) + "\n").encode())
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._add(entry)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+class LeaseManager:
+    """
+    Leases de arquivos para vários workers (processos ou máquinas) que
+    compartilham uma pasta
+
+    Um worker só processa um arquivo depois de criar a lease dele com
+    O_CREAT | O_EXCL, que é atômico também no NFS (v3 em diante). Enquanto
+    processa, uma thread renova o mtime das leases que ele tem a cada
+    ttl / 3; uma lease sem renovação há mais de ttl é de um worker morto e
+    pode ser retomada. A retomada renomeia a lease vencida para um nome só
+    do worker (só um rename vence) e confere se ela não foi renovada nesse
+    meio tempo antes de criar a nova.
+
+    O vencimento compara o mtime (relógio do servidor de arquivos) com o
+    relógio local: os relógios das máquinas precisam estar sincronizados
+    com folga bem menor que o ttl.
+    """
+
+    def __init__(self, lease_dir: str, worker_id: str, ttl: float = 60.0):
+        self.lease_dir = lease_dir
+        self.worker_id = worker_id
+        self.ttl = ttl
+        self.held: Dict[str, str] = {}
+        self.reclaimed = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._heartbeat = None
+        os.makedirs(lease_dir, exist_ok=True)
+
+    def lease_path(self, file_path: str) -> str:
+        """Lease de um arquivo: o mesmo caminho gera o mesmo nome em todos os workers"""
+        digest = hashlib.sha1(os.path.abspath(file_path).encode()).hexdigest()[:16]
+        return os.path.join(self.lease_dir, f"{os.path.basename(file_path)[:64]}.{digest}.lease")
+
+    def claim(self, file_path: str) -> bool:
+        """Tenta reivindicar o arquivo; False se ele está com outro worker vivo"""
+        lease_path = self.lease_path(file_path)
+        token = f"{self.worker_id}:{os.urandom(8).hex()}"
+        for _ in range(2):
+            try:
+                fd = os.open(lease_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+            except FileExistsError:
+                try:
+                    stat = os.stat(lease_path)
+                except FileNotFoundError:
+                    continue  # Liberada entre o open e o stat
+                if time.time() - stat.st_mtime <= self.ttl or not self._reclaim(lease_path, stat):
+                    return False
+                continue
+            with os.fdopen(fd, 'w') as f:
+                json.dump({'worker': self.worker_id, 'token': token, 'file': file_path,
+                           'host': platform.node(), 'pid': os.getpid(), 'time': time.time()}, f)
+            with self._lock:
+                self.held[file_path] = token
+            return True
+        return False
+
+    def _reclaim(self, lease_path: str, stale: os.stat_result) -> bool:
+        """Remove uma lease vencida; False se outro worker chegou antes ou ela foi renovada"""
+        moved_path = f"{lease_path}.{self.worker_id}.stale"
+        try:
+            os.rename(lease_path, moved_path)
+        except FileNotFoundError:
+            return False
+        stat = os.stat(moved_path)
+        if (stat.st_ino, stat.st_mtime_ns) != (stale.st_ino, stale.st_mtime_ns):
+            # Renovada (ou já retomada por outro) depois do stat: devolve a lease
+            try:
+                os.link(moved_path, lease_path)
+            except FileExistsError:
+                pass
+            os.remove(moved_path)
+            return False
+        os.remove(moved_path)
+        self.reclaimed += 1
+        print(f"  ♻️  Lease vencida retomada: {os.path.basename(lease_path)}")
+        return True
+
+    def sweep(self, finished) -> int:
+        """
+        Remove as leases vencidas de arquivos já concluídos
+
+        Um worker morto entre registrar o arquivo no diário e liberar a
+        lease deixa a lease para trás, e como o arquivo não volta para a
+        fila de ninguém, ela nunca seria retomada.
+
+        Args:
+            finished: Função que diz se um arquivo já está concluído no diário
+
+        Returns:
+            Quantas leases de arquivos concluídos ainda não venceram (o dono
+            pode estar liberando agora, ou ter morrido há menos de ttl)
+        """
+        waiting = 0
+        for name in os.listdir(self.lease_dir):
+            if not name.endswith('.lease'):
+                continue
+            lease_path = os.path.join(self.lease_dir, name)
+            try:
+                stat = os.stat(lease_path)
+                with open(lease_path) as f:
+                    file_path = json.load(f)['file']
+            except (OSError, ValueError, KeyError):
+                continue  # Liberada agora há pouco, ou ainda sendo criada
+            if not finished(file_path):
+                continue
+            if time.time() - stat.st_mtime <= self.ttl:
+                waiting += 1
+            else:
+                self._reclaim(lease_path, stat)
+        return waiting
+
+    def owns(self, file_path: str) -> bool:
+        """True se a lease do arquivo ainda é deste worker"""
+        with self._lock:
+            token = self.held.get(file_path)
+        if token is None:
+            return False
+        try:
+            with open(self.lease_path(file_path)) as f:
+                return json.load(f).get('token') == token
+        except (OSError, ValueError):
+            return False
+
+    def release(self, file_path: str) -> None:
+        """Libera a lease do arquivo, se ela ainda for deste worker"""
+        if self.owns(file_path):
+            os.remove(self.lease_path(file_path))
+        with self._lock:
+            self.held.pop(file_path, None)
+
+    def _renew(self) -> None:
+        while not self._stop.wait(self.ttl / 3):
+            with self._lock:
+                held = list(self.held)
+            for file_path in held:
+                try:
+                    os.utime(self.lease_path(file_path))
+                except FileNotFoundError:
+                    print(f"  ⚠️  Lease perdida (vencida e retomada por outro worker): "
+                          f"{os.path.basename(file_path)}")
+                    with self._lock:
+                        self.held.pop(file_path, None)
+
+    def start(self) -> None:
+        """Inicia a renovação periódica das leases"""
+        self._stop.clear()
+        self._heartbeat = threading.Thread(target=self._renew, name="lease-heartbeat", daemon=True)
+        self._heartbeat.start()
+
+    def stop(self) -> None:
+        """Para a renovação e libera as leases que restarem"""
+        self._stop.set()
+        if self._heartbeat is not None:
+            self._heartbeat.join()
+        with self._lock:
+            held = list(self.held)
+        for file_path in held:
+            self.release(file_path)
+
+class InputFilter:
+    """
+    Decide quais arquivos de uma pasta de entrada são processados
+
+    A extensão é procurada em um conjunto de sufixos; os globs de inclusão
+    e exclusão valem para o caminho relativo à pasta de entrada, com '/'
+    como separador ('*' também casa com '/', então '2023-*' pega tudo
+    abaixo das pastas de 2023). Nomes ocultos (começando com '.') ficam de
+    fora: é onde moram o diário, as leases e o cache.
+    """
+
+    def __init__(self, include: Iterable[str] = (), exclude: Iterable[str] = (),
+                 suffixes: Iterable[str] = AUDIO_SUFFIXES):
+        self.include = list(include or ())
+        self.exclude = list(exclude or ())
+        self.suffixes = frozenset(suffix.lower() for suffix in suffixes)
+
+    def wants_file(self, relative: str) -> bool:
+        """Se o arquivo (caminho relativo, com '/') entra no processamento"""
+        name = relative.rpartition('/')[2]
+        if name.startswith('.') or os.path.splitext(name)[1].lower() not in self.suffixes:
+            return False
+        if self.include and not any(fnmatch.fnmatch(relative, pattern) for pattern in self.include):
+            return False
+        return not any(fnmatch.fnmatch(relative, pattern) for pattern in self.exclude)
+
+    def wants_dir(self, relative: str) -> bool:
+        """Se vale descer na pasta: ocultas e excluídas ('velhos' ou 'velhos/*') são podadas inteiras"""
+        if relative.rpartition('/')[2].startswith('.'):
+            return False
+        return not any(fnmatch.fnmatch(relative, pattern) or fnmatch.fnmatch(relative + '/', pattern)
+                       for pattern in self.exclude)
+
+    def wants(self, file_path: str, roots: Iterable[str]) -> bool:
+        """Se o arquivo entra, visto da pasta de entrada que o contém (inclusive as pastas no caminho)"""
+        for root in roots:
+            relative = os.path.relpath(file_path, root)
+            if relative.startswith(os.pardir):
+                continue
+            parts = relative.split(os.sep)
+            if not all(self.wants_dir('/'.join(parts[:depth])) for depth in range(1, len(parts))):
+                return False
+            return self.wants_file('/'.join(parts))
+        return False
+
+def discover_audio_files(roots: Iterable[str], recursive: bool = False,
+                         input_filter: Optional[InputFilter] = None) -> Iterator[str]:
+    """
+    Encontra os arquivos de áudio das pastas, entregando cada um assim que aparece
+
+    Percorre as pastas com os.scandir (o tipo de cada entrada vem da própria
+    listagem, sem um stat por arquivo) e uma pilha explícita de pastas a
+    visitar. Só a pasta sendo lida fica na memória, então arquivos com
+    centenas de milhares de arquivos começam a ser processados na hora e com
+    memória constante. Links simbólicos para pastas não são seguidos.
+
+    Args:
+        roots: Pastas de entrada
+        recursive: Desce nas subpastas
+        input_filter: Extensões e globs de inclusão/exclusão (padrão: só a extensão)
+
+    Yields:
+        Caminho de cada arquivo, em ordem alfabética dentro de cada pasta
+    """
+    input_filter = input_filter or InputFilter()
+    for root in roots:
+        # Pilha de (pasta, caminho relativo com '/')
+        pending = [(root, '')]
+        while pending:
+            directory, prefix = pending.pop()
+            try:
+                with os.scandir(directory) as iterator:
+                    entries = sorted(iterator, key=lambda entry: entry.name)
+            except OSError as e:
+                if directory == root:
+                    raise
+                print(f"  ⚠️  Pasta ignorada ({e.strerror}): {directory}")
+                continue
+            subdirectories = []
+            for entry in entries:
+                relative = prefix + entry.name
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if recursive and input_filter.wants_dir(relative):
+                            subdirectories.append((entry.path, relative + '/'))
+                    elif input_filter.wants_file(relative) and entry.is_file():
+                        yield entry.path
+                except OSError:
+                    continue
+            # Ao contrário na pilha: as subpastas saem em ordem alfabética
+            pending.extend(reversed(subdirectories))
+
+def remove_stale_temps(file_paths: Iterable[str]) -> Iterator[str]:
+    """
+    Repassa os caminhos removendo o temporário de gravação interrompida de
+    cada um (o original ao lado está intacto)
+    """
+    for file_path in file_paths:
+        if os.path.exists(file_path + ".tmp"):
+            os.remove(file_path + ".tmp")
+            print(f"🧹 Temporário de uma gravação interrompida removido: {file_path}.tmp")
+        yield file_path
+
+class FolderWatcher:
+    """
+    Vigia pastas de entrada e entrega cada arquivo de áudio novo ou
+    alterado quando ele para de crescer
+
+    Com o pacote watchdog (inotify no Linux), os eventos do sistema de
+    arquivos marcam os candidatos na hora; sem ele, ou com use_events=False,
+    as pastas são varridas a cada poll_interval. Mesmo com eventos, uma
+    varredura mais espaçada cobre o que os eventos não veem (ex.: arquivos
+    gravados por outra máquina no NFS). Um arquivo só é entregue depois de
+    ficar settle segundos com tamanho e mtime inalterados, e de novo só se
+    mudar depois de processado (o próprio corte regrava o arquivo).
+    """
+
+    def __init__(self, directories: List[str], input_filter: Optional[InputFilter] = None,
+                 settle: float = 5.0, poll_interval: float = 2.0, use_events: bool = True,
+                 recursive: bool = False):
+        self.directories = directories
+        self.input_filter = input_filter or InputFilter()
+        self.recursive = recursive
+        self.settle = settle
+        self.poll_interval = poll_interval
+        # Caminho → (tamanho, mtime, desde quando está assim)
+        self.candidates: Dict[str, Tuple[int, int, float]] = {}
+        # Caminho → (tamanho, mtime) do arquivo depois de processado
+        self.handled: Dict[str, Tuple[int, int]] = {}
+        self.in_flight = set()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._observer = self._start_observer() if use_events else None
+
+    def _start_observer(self):
+        try:
+            from watchdog.observers import Observer
+        except ImportError:
+            return None
+
+        watcher = self
+
+        class Handler:
+            # O watchdog só chama dispatch(); não precisa herdar de FileSystemEventHandler
+            def dispatch(self, event):
+                if not event.is_directory:
+                    watcher.notice(getattr(event, 'dest_path', None) or event.src_path)
+
+        observer = Observer()
+        for directory in self.directories:
+            observer.schedule(Handler(), directory, recursive=self.recursive)
+        observer.daemon = True
+        observer.start()
+        return observer
+
+    @property
+    def mode(self) -> str:
+        return "eventos (watchdog)" if self._observer is not None else f"varredura a cada {self.poll_interval:g}s"
+
+    def notice(self, file_path: str) -> None:
+        """Marca um arquivo como candidato (chamado pelos eventos e pela varredura)"""
+        if not self.input_filter.wants(file_path, self.directories):
+            return
+        with self._lock:
+            self.candidates.setdefault(file_path, (-1, -1, 0.0))
+        self._wake.set()
+
+    def scan(self) -> None:
+        """Varre as pastas atrás de arquivos novos"""
+        for file_path in discover_audio_files(self.directories, self.recursive, self.input_filter):
+            self.notice(file_path)
+
+    def _ready(self) -> List[str]:
+        """Candidatos que ficaram settle segundos sem mudar e ainda não foram processados assim"""
+        now = time.monotonic()
+        ready = []
+        with self._lock:
+            for file_path, (size, mtime_ns, since) in list(self.candidates.items()):
+                try:
+                    stat = os.stat(file_path)
+                except FileNotFoundError:
+                    del self.candidates[file_path]
+                    continue
+                current = (stat.st_size, stat.st_mtime_ns)
+                if current != (size, mtime_ns):
+                    self.candidates[file_path] = current + (now,)
+                elif file_path in self.in_flight:
+                    continue
+                elif self.handled.get(file_path) == current:
+                    del self.candidates[file_path]
+                elif now - since >= self.settle:
+                    del self.candidates[file_path]
+                    self.in_flight.add(file_path)
+                    ready.append(file_path)
+        return ready
+
+    def ready_files(self) -> Iterator[str]:
+        """Arquivos prontos para processar, até stop()"""
+        self.scan()
+        # Com eventos, a varredura só cobre o que eles não veem
+        rescan_interval = self.poll_interval if self._observer is None else max(30.0, self.poll_interval)
+        last_scan = time.monotonic()
+        while not self._stop.is_set():
+            yield from self._ready()
+            if time.monotonic() - last_scan >= rescan_interval:
+                self.scan()
+                last_scan = time.monotonic()
+            with self._lock:
+                waiting = bool(self.candidates)
+            # Com candidatos esperando estabilizar, confere de novo em breve
+            self._wake.wait(min(self.settle / 4, self.poll_interval) if waiting else rescan_interval)
+            self._wake.clear()
+
+    def done(self, file_path: str) -> None:
+        """Registra o estado do arquivo depois de processado (eventos do próprio corte são ignorados)"""
+        with self._lock:
+            self.in_flight.discard(file_path)
+            try:
+                stat = os.stat(file_path)
+            except FileNotFoundError:
+                return
+            self.handled[file_path] = (stat.st_size, stat.st_mtime_ns)
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join()
+
+# Formatos comprimidos cortados por cópia de stream (extensão → muxer do ffmpeg)
+STREAM_COPY_FORMATS = {'.mp3': 'mp3', '.m4a': 'ipod', '.aac': 'adts'}
+
+def ffmpeg_concat_list(file_path: str, segments, sr: int) -> str:
+    """Monta a lista do demuxer concat do ffmpeg com um inpoint/outpoint por trecho"""
+    quoted = os.path.abspath(file_path).replace("'", "'\\''")
+    lines = []
+    for start, end in segments:
+        lines.append(f"file '{quoted}'")
+        lines.append(f"inpoint {start / sr:.6f}")
+        lines.append(f"outpoint {end / sr:.6f}")
+    return "\n".join(lines) + "\n"
+
+def stream_copy_segments(file_path: str, output_path: str, segments, sr: int, muxer: str) -> None:
+    """
+    Corta um arquivo comprimido com ffmpeg -c copy, sem recodificar
+
+    Os cortes caem na fronteira de frame mais próxima do codec; os trechos
+    são concatenados em uma única passada pelo demuxer concat.
+    """
+    with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False, encoding='utf-8') as listing:
+        listing.write(ffmpeg_concat_list(file_path, segments, sr))
+    try:
+        command = [
+            'ffmpeg', '-hide_banner', '-loglevel', 'error', '-y',
+            '-f', 'concat', '-safe', '0', '-i', listing.name,
+            '-map', '0:a', '-c', 'copy', '-f', muxer, output_path,
+        ]
+        result = subprocess.run(command, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"ffmpeg falhou: {result.stderr.strip()}")
+    finally:
+        os.remove(listing.name)
+
+# Códigos de formato WAV suportados pelo modo in-place
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+class WavLayout:
+    """Posição e formato do chunk de dados de um WAV PCM/float"""
+
+    def __init__(self, format_tag: int, channels: int, sr: int, block_align: int,
+                 data_offset: int, data_size: int, file_size: int):
+        self.format_tag = format_tag
+        self.channels = channels
+        self.sr = sr
+        self.block_align = block_align
+        self.data_offset = data_offset
+        self.data_size = data_size
+        self.file_size = file_size
+
+    @property
+    def sample_width(self) -> int:
+        """Bytes por amostra (tamanho do contêiner, não os bits válidos)"""
+        return self.block_align // self.channels
+
+    @property
+    def frames(self) -> int:
+        return self.data_size // self.block_align
+
+    @property
+    def data_end(self) -> int:
+        """Fim do chunk de dados, incluindo o byte de alinhamento"""
+        return self.data_offset + self.data_size + (self.data_size & 1)
+
+def read_wav_layout(file_path: str) -> Optional[WavLayout]:
+    """
+    Lê o cabeçalho RIFF de um WAV e localiza o chunk de dados
+
+    Returns:
+        WavLayout, ou None se o arquivo não for um WAV PCM/float suportado
+    """
+    file_size = os.path.getsize(file_path)
+    with open(file_path, 'rb') as f:
+        header = f.read(12)
+        if len(header) < 12 or header[:4] != b'RIFF' or header[8:12] != b'WAVE':
+            return None
+
+        fmt = None
+        while True:
+            chunk_header = f.read(8)
+            if len(chunk_header) < 8:
+                return None
+            chunk_id, chunk_size = struct.unpack('<4sI', chunk_header)
+            chunk_start = f.tell()
+
+            if chunk_id == b'fmt ':
+                fmt = f.read(chunk_size)
+            elif chunk_id == b'data':
+                break
+            f.seek(chunk_start + chunk_size + (chunk_size & 1))
+
+    if fmt is None or len(fmt) < 16:
+        return None
+
+    format_tag, channels, sr, _, block_align, _ = struct.unpack('<HHIIHH', fmt[:16])
+    if format_tag == WAVE_FORMAT_EXTENSIBLE and len(fmt) >= 26:
+        # O código real fica nos dois primeiros bytes do GUID do subformato
+        format_tag = struct.unpack('<H', fmt[24:26])[0]
+
+    if channels == 0 or block_align % channels:
+        return None
+    sample_width = block_align // channels
+    if format_tag == WAVE_FORMAT_PCM and sample_width not in (1, 2, 3, 4):
+        return None
+    if format_tag == WAVE_FORMAT_IEEE_FLOAT and sample_width not in (4, 8):
+        return None
+    if format_tag not in (WAVE_FORMAT_PCM, WAVE_FORMAT_IEEE_FLOAT):
+        return None
+
+    # Gravações interrompidas podem declarar um tamanho maior que o arquivo
+    data_size = min(chunk_size, file_size - chunk_start)
+    data_size -= data_size % block_align
+    return WavLayout(format_tag, channels, sr, block_align, chunk_start, data_size, file_size)
+
+def wav_bytes_to_mono(raw: np.ndarray, layout: WavLayout) -> np.ndarray:
+    """Converte bytes de frames WAV em amostras mono float32 (escala do soundfile)"""
+    width = layout.sample_width
+    if layout.format_tag == WAVE_FORMAT_IEEE_FLOAT:
+        samples = raw.view('<f4' if width == 4 else '<f8').astype(np.float32)
+    elif width == 1:
+        samples = (raw.astype(np.float32) - 128) / 128
+    elif width == 2:
+        samples = raw.view('<i2').astype(np.float32) / 2 ** 15
+    elif width == 3:
+        triplets = raw.reshape(-1, 3).astype(np.int32)
+        values = triplets[:, 0] | (triplets[:, 1] << 8) | (triplets[:, 2] << 16)
+        values = np.where(values >= 1 << 23, values - (1 << 24), values)
+        samples = values.astype(np.float32) / 2 ** 23
+    else:
+        samples = raw.view('<i4').astype(np.float32) / 2 ** 31
+    return samples.reshape(-1, layout.channels).mean(axis=1)
+
+def move_file_bytes(f, source: int, destination: int, length: int, chunk_size: int = 1 << 22) -> None:
+    """Move bytes para uma posição anterior do mesmo arquivo (destination <= source)"""
+    if source == destination or length <= 0:
+        return
+    moved = 0
+    while moved < length:
+        size = min(chunk_size, length - moved)
+        f.seek(source + moved)
+        data = f.read(size)
+        f.seek(destination + moved)
+        f.write(data)
+        moved += size
+
+class _StageTimer:
+    """Context manager que soma a duração de uma etapa de um arquivo"""
+
+    __slots__ = ('metrics', 'file_path', 'name', 'started')
+
+    def __init__(self, metrics: 'Metrics', file_path: str, name: str):
+        self.metrics = metrics
+        self.file_path = file_path
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.metrics.add_stage(self.file_path, self.name, time.perf_counter() - self.started)
+        return False
+
+# Compartilhado por todas as etapas quando as métricas estão desligadas
+_NO_TIMER = contextlib.nullcontext()
+
+class NullMetrics:
+    """Métricas desligadas: todos os ganchos são no-ops de custo desprezível"""
+
+    enabled = False
+
+    def begin_file(self, file_path: str) -> None:
+        pass
+
+    def end_file(self, file_path: str, status: str) -> None:
+        pass
+
+    def stage(self, file_path: str, name: str):
+        return _NO_TIMER
+
+    def add_stage(self, file_path: str, name: str, seconds: float) -> None:
+        pass
+
+    def add(self, file_path: str, **counters: float) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+def peak_rss_bytes() -> Optional[int]:
+    """Pico de memória residente do processo, em bytes"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reporta em KiB, macOS em bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+def torch_peak_bytes() -> Optional[int]:
+    """Pico de memória alocada por tensores na GPU, em bytes"""
+    if device is None or device.type != 'cuda':
+        return None
+    return torch.cuda.max_memory_allocated()
+
+class Metrics(NullMetrics):
+    """
+    Coleta tempos por arquivo e por etapa, contadores e pico de memória
+
+    Cada arquivo concluído vira uma linha em jsonl_path; os totais vão para
+    prometheus_path no formato texto do Prometheus (para o textfile
+    collector do node_exporter), regravado a cada prometheus_interval
+    segundos e no close(). Com profile_path, cada thread que processa
+    arquivos roda sob cProfile e as estatísticas somadas são gravadas no fim.
+    """
+
+    enabled = True
+    COUNTERS = ('bytes_read', 'bytes_written', 'audio_seconds', 'audio_seconds_removed')
+
+    def __init__(self, jsonl_path: Optional[str] = None, prometheus_path: Optional[str] = None,
+                 profile_path: Optional[str] = None, prometheus_interval: float = 10.0):
+        self.jsonl_path = jsonl_path
+        self.prometheus_path = prometheus_path
+        self.profile_path = profile_path
+        self.prometheus_interval = prometheus_interval
+        self._jsonl = open(jsonl_path, 'a') if jsonl_path else None
+        self._lock = threading.Lock()
+        self._files = {}
+        self._profilers = {}
+        self._last_export = time.monotonic()
+
+        self.stage_totals: Dict[str, List[float]] = {}  # etapa → [chamadas, segundos, máximo]
+        self.status_counts = {'ok': 0, 'failed': 0, 'skipped': 0}
+        self.totals = dict.fromkeys(self.COUNTERS, 0)
+        self.slowest: List[Tuple[float, str]] = []
+
+    def _ensure_profiler(self) -> None:
+        """Liga o cProfile na thread atual, uma vez por thread"""
+        thread_id = threading.get_ident()
+        if thread_id in self._profilers:
+            return
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Outro profiler já ativo (Python 3.12+ aceita um por vez)
+            profiler = None
+        with self._lock:
+            self._profilers[thread_id] = profiler
+
+    def begin_file(self, file_path: str) -> None:
+        """Começa o registro de um arquivo (tamanho e mtime de entrada)"""
+        if self.profile_path:
+            self._ensure_profiler()
+        try:
+            stat = os.stat(file_path)
+            size, mtime = stat.st_size, stat.st_mtime_ns
+        except OSError:
+            size, mtime = 0, None
+
+        record = {
+            'file': file_path,
+            'started': time.time(),
+            'stages': {},
+            'bytes_read': size,
+            'bytes_written': 0,
+            'audio_seconds': 0.0,
+            'audio_seconds_removed': 0.0,
+        }
+        with self._lock:
+            self._files[file_path] = (record, time.perf_counter(), mtime)
+
+    def stage(self, file_path: str, name: str) -> _StageTimer:
+        return _StageTimer(self, file_path, name)
+
+    def add_stage(self, file_path: str, name: str, seconds: float) -> None:
+        """Soma a duração de uma etapa ao arquivo e aos totais"""
+        with self._lock:
+            entry = self._files.get(file_path)
+            if entry is not None:
+                stages = entry[0]['stages']
+                stages[name] = stages.get(name, 0.0) + seconds
+            totals = self.stage_totals.setdefault(name, [0, 0.0, 0.0])
+            totals[0] += 1
+            totals[1] += seconds
+            totals[2] = max(totals[2], seconds)
+
+    def add(self, file_path: str, **counters: float) -> None:
+        """Soma contadores (ex.: audio_seconds_removed) ao arquivo"""
+        with self._lock:
+            entry = self._files.get(file_path)
+            if entry is not None:
+                for name, value in counters.items():
+                    entry[0][name] += value
+
+    def end_file(self, file_path: str, status: str) -> None:
+        """
+        Fecha o registro de um arquivo e grava sua linha JSON
+
+        Args:
+            file_path: Caminho do arquivo
+            status: 'ok', 'failed' ou 'skipped'
+        """
+        with self._lock:
+            entry = self._files.pop(file_path, None)
+        if entry is None:
+            return
+        record, started, mtime = entry
+
+        # Só conta como gravado se o arquivo mudou (o original pode ser mantido)
+        if status == 'ok' and mtime is not None:
+            try:
+                stat = os.stat(file_path)
+                if stat.st_mtime_ns != mtime:
+                    record['bytes_written'] = stat.st_size
+            except OSError:
+                pass
+
+        record['status'] = status
+        record['elapsed'] = time.perf_counter() - started
+        record['peak_rss_bytes'] = peak_rss_bytes()
+        record['torch_peak_bytes'] = torch_peak_bytes()
+        line = json.dumps(record, ensure_ascii=False)
+
+        with self._lock:
+            self.status_counts[status] = self.status_counts.get(status, 0) + 1
+            for name in self.COUNTERS:
+                self.totals[name] += record[name]
+            self.slowest = sorted(self.slowest + [(record['elapsed'], file_path)], reverse=True)[:10]
+            if self._jsonl is not None:
+                self._jsonl.write(line + '\n')
+                self._jsonl.flush()
+
+            export = (self.prometheus_path is not None
+                      and time.monotonic() - self._last_export >= self.prometheus_interval)
+            if export:
+                self._last_export = time.monotonic()
+        if export:
+            self.write_prometheus()
+
+    def prometheus_text(self) -> str:
+        """Totais no formato texto de exposição do Prometheus"""
+        with self._lock:
+            status_counts = dict(self.status_counts)
+            stage_totals = {name: list(values) for name, values in self.stage_totals.items()}
+            totals = dict(self.totals)
+
+        lines = [
+            '# HELP silence_files_total Arquivos processados, por status',
+            '# TYPE silence_files_total counter',
+        ]
+        lines += [f'silence_files_total{{status="{status}"}} {count}'
+                  for status, count in sorted(status_counts.items())]
+
+        for suffix, index, kind, description in (
+                ('calls_total', 0, 'counter', 'Execuções de cada etapa'),
+                ('seconds_total', 1, 'counter', 'Tempo total em cada etapa'),
+                ('seconds_max', 2, 'gauge', 'Maior tempo de uma execução de cada etapa')):
+            lines += [f'# HELP silence_stage_{suffix} {description}',
+                      f'# TYPE silence_stage_{suffix} {kind}']
+            lines += [f'silence_stage_{suffix}{{stage="{name}"}} {float(values[index])!r}'
+                      for name, values in sorted(stage_totals.items())]
+
+        for name in self.COUNTERS:
+            lines += [f'# TYPE silence_{name}_total counter', f'silence_{name}_total {float(totals[name])!r}']
+
+        for name, value in (('peak_rss_bytes', peak_rss_bytes()), ('torch_peak_bytes', torch_peak_bytes())):
+            if value is not None:
+                lines += [f'# TYPE silence_{name} gauge', f'silence_{name} {value}']
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self) -> None:
+        """Regrava o arquivo do Prometheus de forma atômica"""
+        temp_path = self.prometheus_path + '.tmp'
+        with open(temp_path, 'w') as f:
+            f.write(self.prometheus_text())
+        os.replace(temp_path, self.prometheus_path)
+
+    def print_summary(self) -> None:
+        """Tempo por etapa e arquivos mais lentos"""
+        if not self.stage_totals:
+            return
+        print(f"\n📈 Métricas por etapa:")
+        print(f"   {'Etapa':<12} {'Execuções':<10} {'Total (s)':<10} {'Máx (s)':<8}")
+        for name, (calls, seconds, longest) in sorted(self.stage_totals.items(),
+                                                     key=lambda item: -item[1][1]):
+            print(f"   {name:<12} {calls:<10} {seconds:<10.2f} {longest:<8.2f}")
+        print(f"   🐢 Mais lentos: " + ", ".join(f"{os.path.basename(path)} ({elapsed:.1f}s)"
+                                                for elapsed, path in self.slowest[:3]))
+
+    def close(self) -> None:
+        """Grava as exportações finais e o perfil"""
+        if self.prometheus_path:
+            self.write_prometheus()
+        if self._jsonl is not None:
+            self._jsonl.close()
+            self._jsonl = None
+
+        profilers = [profiler for profiler in self._profilers.values() if profiler is not None]
+        if self.profile_path and profilers:
+            stats = pstats.Stats(*profilers)
+            stats.dump_stats(self.profile_path)
+            print(f"🔬 Perfil salvo em {self.profile_path} (python -m pstats {self.profile_path})")
+
+        self.print_summary()
+
+def removed_seconds(num_samples: int, segments, sr: int) -> float:
+    """Segundos removidos por um corte (zero se o original for mantido por ficar curto demais)"""
+    kept = sum(end - start for start, end in segments)
+    if kept / sr < 0.1:
+        return 0.0
+    return (num_samples - kept) / sr
+
+# Colunas do relatório CSV do modo só-análise (trechos como "início-fim;...")
+REPORT_FIELDS = ['file', 'sample_rate', 'frames', 'duration', 'start', 'end', 'kept_seconds',
+                 'removed_seconds', 'segments', 'windows', 'sound_ratio', 'peak_db', 'mean_db',
+                 'floor_db', 'size', 'mtime_ns']
+ENVELOPE_FIELDS = ['windows', 'sound_ratio', 'peak_db', 'mean_db', 'floor_db']
+
+class AnalysisReport:
+    """
+    Grava os resultados do modo só-análise
+
+    O formato vem da extensão: .json (um documento com os parâmetros e a
+    lista de arquivos, gravado no fim), .jsonl (uma linha por arquivo,
+    gravada assim que o arquivo termina) ou .csv (uma linha por arquivo).
+    """
+
+    def __init__(self, path: str, params: Dict):
+        self.path = path
+        self.params = params
+        self.format = os.path.splitext(path)[1].lower().lstrip('.')
+        if self.format not in ('json', 'jsonl', 'csv'):
+            raise ValueError(f"formato de relatório desconhecido: {path} (use .json, .jsonl ou .csv)")
+        self.results = []
+        self.lock = threading.Lock()
+        self.temp_path = path + ".tmp"
+        self.file = None
+        if self.format != 'json':
+            self.file = open(self.temp_path, 'w', newline='')
+            if self.format == 'csv':
+                self.writer = csv.DictWriter(self.file, fieldnames=REPORT_FIELDS)
+                self.writer.writeheader()
+
+    def add(self, result: Dict) -> None:
+        with self.lock:
+            if self.format == 'json':
+                self.results.append(result)
+            elif self.format == 'jsonl':
+                self.file.write(json.dumps(result) + "\n")
+                self.file.flush()
+            else:
+                row = {key: value for key, value in result.items() if key in REPORT_FIELDS}
+                row.update(result['envelope'] or {})
+                row['segments'] = ";".join(f"{start}-{end}" for start, end in result['segments'])
+                self.writer.writerow(row)
+                self.file.flush()
+
+    def close(self) -> None:
+        """Finaliza o relatório; o arquivo só aparece com o nome final completo"""
+        if self.format == 'json':
+            with open(self.temp_path, 'w') as f:
+                json.dump({'params': self.params, 'files': self.results}, f, indent=1)
+        else:
+            self.file.close()
+        os.replace(self.temp_path, self.path)
+
+def load_report(path: str) -> List[Dict]:
+    """
+    Lê um relatório do modo só-análise (.json, .jsonl ou .csv)
+
+    Returns:
+        Entradas por arquivo, com os trechos como lista de (início, fim)
+    """
+    extension = os.path.splitext(path)[1].lower()
+    with open(path, newline='') as f:
+        if extension == '.json':
+            entries = json.load(f)['files']
+        elif extension == '.jsonl':
+            entries = [json.loads(line) for line in f if line.strip()]
+        elif extension == '.csv':
+            entries = []
+            for row in csv.DictReader(f):
+                entry = {'file': row['file']}
+                for key in ('sample_rate', 'frames', 'size', 'mtime_ns'):
+                    entry[key] = int(row[key])
+                entry['segments'] = [[int(value) for value in segment.split('-')]
+                                     for segment in row['segments'].split(';') if segment]
+                entries.append(entry)
+        else:
+            raise ValueError(f"formato de relatório desconhecido: {path}")
+
+    for entry in entries:
+        entry['segments'] = [tuple(segment) for segment in entry['segments']]
+    return entries
+
+# Taxa nominal usada para estimar, pelo tamanho do arquivo, a duração dos
+# formatos que o libsndfile não lê (AAC/M4A/WMA)
+NOMINAL_BITRATE = 128000
+
+class AudioJob:
+    """Arquivo a processar, com duração e formato estimados pelo cabeçalho"""
+
+    def __init__(self, path: str, frames: int, sr: int, channels: int, exact: bool):
+        self.path = path
+        self.frames = frames
+        self.sr = sr
+        self.channels = channels
+        self.exact = exact  # False quando estimado pelo tamanho do arquivo
+
+    @property
+    def duration(self) -> float:
+        return self.frames / self.sr
+
+    def memory_bytes(self, scratch_bytes: int = 0, streaming_block: Optional[int] = None) -> int:
+        """
+        Pico de memória estimado do processamento do arquivo
+
+        Em memória: PCM float32 de todos os canais na decodificação, o mono
+        do downmix, a cópia cortada e o espaço de trabalho do envelope no
+        host. Em streaming, alguns blocos.
+
+        Args:
+            scratch_bytes: Bytes por amostra que o backend usa no envelope
+            streaming_block: Tamanho do bloco em frames, se processado em streaming
+        """
+        if streaming_block:
+            return 4 * streaming_block * self.channels * 4
+        return self.frames * (4 * self.channels + 4 + 4 + scratch_bytes)
+
+def estimate_job(file_path: str) -> AudioJob:
+    """
+    Estima duração e formato de um arquivo sem decodificá-lo
+
+    Lê só o cabeçalho pelo libsndfile; nos formatos que ele não lê, deduz
+    a duração do tamanho do arquivo a NOMINAL_BITRATE, em estéreo a 44.1kHz.
+    """
+    try:
+        info = sf.info(file_path)
+        return AudioJob(file_path, info.frames, info.samplerate, info.channels, exact=True)
+    except Exception:
+        try:
+            size = os.path.getsize(file_path)
+        except OSError:
+            size = 0
+        return AudioJob(file_path, int(size * 8 / NOMINAL_BITRATE * 44100), 44100, 2, exact=False)
+
+def parse_size(value: str) -> Optional[int]:
+    """Converte '512M', '4G', '1.5T' ou um número de bytes; '0' ou 'none' = sem limite"""
+    text = value.strip().upper()
+    if text in ('0', 'NONE'):
+        return None
+    if text.endswith('B'):
+        text = text[:-1]
+    units = {'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3, 'T': 1024 ** 4}
+    multiplier = 1
+    if text and text[-1] in units:
+        multiplier = units[text[-1]]
+        text = text[:-1]
+    try:
+        return int(float(text) * multiplier)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"tamanho inválido: {value}")
+
+def default_memory_budget() -> Optional[int]:
+    """Metade da memória física (None se não der para descobrir)"""
+    try:
+        return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES') // 2
+    except (AttributeError, ValueError, OSError):
+        return None
+
+def format_bytes(num_bytes: float) -> str:
+    return f"{num_bytes / 1024 ** 3:.2f} GB"
+
+class MemoryBudget:
+    """
+    Controle de admissão por memória estimada
+
+    Um job só começa quando sua reserva cabe no que sobra do orçamento.
+    Um job maior que o orçamento inteiro ainda roda, mas sozinho. As
+    reservas são por chave (o caminho do arquivo) e liberar uma chave sem
+    reserva não tem efeito, então o fim de um arquivo pode ser sinalizado
+    de mais de um lugar.
+    """
+
+    def __init__(self, limit: Optional[int]):
+        self.limit = limit
+        self.in_use = 0
+        self.peak = 0
+        self.reservations: Dict[str, List[int]] = {}
+        self.condition = threading.Condition()
+
+    def acquire(self, key: str, num_bytes: int) -> None:
+        """Bloqueia até a reserva caber no orçamento"""
+        with self.condition:
+            while self.limit is not None and self.in_use > 0 and self.in_use + num_bytes > self.limit:
+                self.condition.wait()
+            self.reservations.setdefault(key, []).append(num_bytes)
+            self.in_use += num_bytes
+            self.peak = max(self.peak, self.in_use)
+
+    def release(self, key: str) -> None:
+        """Devolve a reserva mais antiga da chave, se houver"""
+        with self.condition:
+            pending = self.reservations.get(key)
+            if not pending:
+                return
+            self.in_use -= pending.pop(0)
+            if not pending:
+                del self.reservations[key]
+            self.condition.notify_all()
 
 class GPUAudioProcessor:
-    def __init__(self, silence_threshold_db: float = -40, min_silence_duration: float = 1.0):
+    def __init__(self, silence_threshold_db: float = -40, min_silence_duration: float = 1.0,
+                 streaming: bool = False, block_size: int = DEFAULT_BLOCK_SIZE,
+                 remove_internal_silence: bool = False, silence_gap: float = 0.5,
+                 edge_scan: bool = False, inplace_wav: bool = False,
+                 stream_copy: bool = False, cache: Optional[AnalysisCache] = None,
+                 metrics: Optional[NullMetrics] = None, backend='auto',
+                 window_duration: float = 0.1, hop_divisor: int = 4,
+                 memory_budget: Optional[int] = None, job_order: str = 'longest',
+                 journal: Optional[ProgressJournal] = None, resume: bool = False,
+                 lookahead: int = DEFAULT_LOOKAHEAD):
+        """
+        Processador de áudio otimizado para GPU
+        
+        Args:
+            silence_threshold_db: Limiar de silêncio em dB
+            min_silence_duration: Duração mínima de silêncio em segundos
+            streaming: Processa arquivos em blocos, com memória limitada
+            block_size: Tamanho do bloco de leitura em frames (modo streaming)
+            remove_internal_silence: Também encurta pausas internas maiores
+                que min_silence_duration
+            silence_gap: Silêncio mantido no lugar de cada pausa encurtada, em segundos
+            edge_scan: Analisa apenas o começo e o fim do arquivo, parando na
+                primeira janela com som (ignorado com remove_internal_silence)
+            inplace_wav: Corta WAVs PCM no próprio arquivo, sem recodificar
+            stream_copy: Corta MP3/AAC/M4A com cópia de stream do ffmpeg, sem
+                recodificar (a decodificação serve só para achar os cortes)
+            cache: Cache de análises; arquivos já processados são pulados
+            metrics: Coletor de métricas (padrão: desligado)
+            backend: Backend do envelope ('auto', 'numpy', 'numba', 'torch' ou
+                uma instância); todos decidem os mesmos cortes
+            window_duration: Duração da janela do envelope em segundos
+            hop_divisor: Saltos por janela (o salto é window_duration / hop_divisor)
+            memory_budget: Memória (bytes) que os arquivos em processamento
+                podem ocupar juntos, pela estimativa do cabeçalho (None = sem limite)
+            job_order: 'longest' processa os arquivos mais longos primeiro;
+                'input' mantém a ordem recebida
+            journal: Diário onde cada arquivo concluído é registrado
+            resume: Pula os arquivos que o diário já dá como concluídos
+            lookahead: Arquivos descobertos mantidos à frente do processamento
+                quando a entrada chega aos poucos (ordenação dos mais longos
+                primeiro dentro dessa janela)
+        """
+        self.silence_threshold_db = silence_threshold_db
+        self.min_silence_duration = min_silence_duration
+        self.remove_internal_silence = remove_internal_silence
+        self.silence_gap = silence_gap
+        self.window_duration = window_duration
+        self.hop_divisor = hop_divisor
+        self.memory_budget = memory_budget
+        self.job_order = job_order
+        self.lookahead = lookahead
+        # Decisões de um relatório do modo só-análise, por caminho (--apply)
+        self.decisions: Dict[str, Dict] = {}
+        self.edge_scan = edge_scan
+        self.inplace_wav = inplace_wav
+        self.stream_copy = stream_copy
+        self.cache = cache
+        self.journal = journal
+        self.resume = resume
+        self.metrics = metrics or NullMetrics()
+        # Estado por arquivo em processamento (chave de entrada e trechos decididos)
+        self._pending = {}
+        self._pending_lock = threading.Lock()
+        self.streaming = streaming
+        self.block_size = block_size
+        # O backend (e o dispositivo) só é criado na primeira detecção
+        self._backend = None if isinstance(backend, str) else backend
+        self._backend_name = backend if isinstance(backend, str) else backend.name
+        self._backend_lock = threading.Lock()
+
+    @property
+    def backend(self):
+        """Backend de detecção, criado no primeiro uso"""
+        if self._backend is None:
+            with self._backend_lock:
+                if self._backend is None:
+                    backend = make_backend(self._backend_name)
+                    print(f"🧮 Backend de detecção: {backend.name}")
+                    self._backend = backend
+        return self._backend
+
+    @property
+    def scratch_bytes(self) -> int:
+        """
+        Bytes por amostra que o backend usa no envelope, para o orçamento de memória
+
+        Antes da primeira detecção, estimado pelo nome, sem criar o backend:
+        um lote que não detecta nada (ex.: --apply) não paga o import.
+        """
+        if self._backend is not None:
+            return self._backend.scratch_bytes
+        name = self._backend_name
+        if gpu_expected(name):
+            return 0
+        if name == 'torch':
+            return 8
+        if name == 'numba' or (name == 'auto' and numba_available()):
+            return NumbaBackend.scratch_bytes
+        return NumpyBackend.scratch_bytes
+
+    @property
+    def device(self):
+        """Dispositivo torch do backend (None nos backends de CPU)"""
+        return getattr(self.backend, 'device', None)
+        
+    def db_to_amplitude(self, db: float) -> float:
+        """Converte dB para amplitude"""
+        return 10 ** (db / 20)
+
+    def window_params(self, sr: int) -> Tuple[int, int]:
+        """Retorna (window_size, hop_length) em amostras para a taxa dada"""
+        window_size = int(self.window_duration * sr)  # Janelas de 100ms por padrão
+        hop_length = window_size // self.hop_divisor
+        return window_size, hop_length
+
+    def mask_from_energy(self, energy: np.ndarray) -> np.ndarray:
+        """Máscara de janelas não-silenciosas a partir da energia média"""
+        threshold = self.db_to_amplitude(self.silence_threshold_db)
+        return np.sqrt(energy) > threshold
+
+    def segments_from_mask(self, mask: np.ndarray, hop_length: int, window_size: int,
+                           num_samples: int, sr: int) -> np.ndarray:
+        """
+        Segmenta o áudio em trechos mantidos via run-length encoding vetorizado
+
+        Pausas de até min_silence_duration permanecem intactas; pausas mais
+        longas são encurtadas para silence_gap (metade de cada lado). O
+        silêncio do início e do fim é removido como em detect_silence_gpu.
+
+        Args:
+            mask: Máscara booleana de janelas não-silenciosas
+            hop_length: Salto entre janelas em amostras
+            window_size: Tamanho da janela em amostras
+            num_samples: Número total de amostras do áudio
+            sr: Taxa de amostragem
+
+        Returns:
+            Array (k, 2) com os intervalos [início, fim) mantidos, em amostras
+        """
+        if not mask.any():
+            return np.array([[0, num_samples]], dtype=np.int64)
+
+        # Bordas das sequências de janelas não-silenciosas
+        edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+        run_starts = np.flatnonzero(edges == 1)
+        run_ends = np.flatnonzero(edges == -1) - 1
+
+        starts = run_starts.astype(np.int64) * hop_length
+        ends = np.minimum((run_ends.astype(np.int64) + 1) * hop_length + window_size, num_samples)
+
+        # Une trechos separados por pausas curtas (ou janelas sobrepostas)
+        min_silence = int(self.min_silence_duration * sr)
+        cut = (starts[1:] - ends[:-1]) > min_silence
+        starts = starts[np.concatenate(([True], cut))]
+        ends = ends[np.concatenate((cut, [True]))]
+
+        # Mantém silence_gap de silêncio em cada pausa longa
+        pad = int(min(self.silence_gap, self.min_silence_duration) * sr) // 2
+        starts[1:] -= pad
+        ends[:-1] += pad
+
+        return np.stack((starts, ends), axis=1)
+
+    def bounds_from_energy(self, energy: np.ndarray, hop_length: int,
+                           window_size: int, num_samples: int) -> Tuple[int, int]:
+        """
+        Converte um envelope de energia média em índices de início e fim
+
+        Args:
+            energy: Média dos quadrados por janela
+            hop_length: Salto entre janelas em amostras
+            window_size: Tamanho da janela em amostras
+            num_samples: Número total de amostras do áudio
+
+        Returns:
+            Tuple com índices de início e fim do áudio não-silencioso
+        """
+        return self.bounds_from_mask(self.mask_from_energy(energy), hop_length,
+                                     window_size, num_samples)
+
+    def bounds_from_mask(self, mask: np.ndarray, hop_length: int,
+                         window_size: int, num_samples: int) -> Tuple[int, int]:
+        """Índices de início e fim a partir da máscara de janelas não-silenciosas"""
+        non_silent_indices = np.flatnonzero(mask)
+
+        if len(non_silent_indices) == 0:
+            return 0, num_samples
+
+        start_sample = int(non_silent_indices[0]) * hop_length
+        end_sample = min((int(non_silent_indices[-1]) + 1) * hop_length + window_size, num_samples)
+        return start_sample, end_sample
+    
+    def compute_rms_gpu(self, audio_tensor: 'torch.Tensor', sr: int) -> 'torch.Tensor':
+        """
+        Calcula o RMS por janela usando GPU
+        
+        Args:
+            audio_tensor: Tensor do áudio no dispositivo GPU, com as amostras
+                na última dimensão (aceita lotes no formato (arquivos, amostras))
+            sr: Taxa de amostragem
+            
+        Returns:
+            Tensor com o RMS de cada janela
+        """
+        window_size, hop_length = self.window_params(sr)
+        load_torch()
+        return torch.sqrt(TorchBackend.prefix_energy(audio_tensor, window_size, hop_length))
+
+    def to_backend(self, audio):
+        """Leva um áudio (numpy ou tensor) para o dispositivo do backend"""
+        if is_tensor(audio):
+            if isinstance(self.backend, TorchBackend):
+                return self.backend.transfer(audio)
+            audio = audio.cpu().numpy()
+        return self.backend.transfer(np.asarray(audio, dtype=np.float32))
+
+    def window_mask(self, audio, sr: int) -> np.ndarray:
+        """
+        Máscara de janelas não-silenciosas de um áudio mono, pelo backend
+
+        Args:
+            audio: Áudio mono (numpy ou tensor)
+            sr: Taxa de amostragem
+
+        Returns:
+            Máscara booleana por janela, no host
+        """
+        threshold = self.db_to_amplitude(self.silence_threshold_db)
+        window_size, hop_length = self.window_params(sr)
+        energy = self.backend.energy(self.to_backend(audio), window_size, hop_length)
+        return self.backend.mask(energy, threshold)
+
+    def detect_silence_gpu(self, audio, sr: int) -> Tuple[int, int]:
+        """
+        Detecta início e fim do áudio não-silencioso
+        
+        Args:
+            audio: Áudio mono (numpy ou tensor); o cálculo roda no backend
+                configurado (torch na GPU, Numba ou NumPy na CPU)
+            sr: Taxa de amostragem
+            
+        Returns:
+            Tuple com índices de início e fim do áudio não-silencioso
+        """
+        window_size, hop_length = self.window_params(sr)
+        mask = self.window_mask(audio, sr)
+        return self.bounds_from_mask(mask, hop_length, window_size, len(audio))
+
+    def detect_silence_batch(self, audios: List[np.ndarray], sample_rates: List[int],
+                             return_masks: bool = False, return_energy: bool = False):
+        """
+        Detecta início e fim do áudio não-silencioso de vários arquivos de uma vez
+
+        Os arquivos de mesma taxa de amostragem são empacotados em um único
+        lote com padding de zeros (uma transferência para o dispositivo) e o
+        envelope e o limiar são calculados para o lote inteiro em uma chamada.
+
+        Args:
+            audios: Lista de áudios mono (numpy)
+            sample_rates: Taxa de amostragem de cada áudio
+            return_masks: Também retorna a máscara de janelas de cada arquivo
+            return_energy: Também retorna a energia por janela de cada arquivo (no host)
+
+        Returns:
+            Lista de (início, fim) por arquivo, na ordem de entrada; com
+            return_masks, uma tupla (limites, máscaras), e com return_energy
+            também as energias no fim da tupla
         """
-        Processador de áudio otimizado para GPU
+        threshold = self.db_to_amplitude(self.silence_threshold_db)
+        bounds = [None] * len(audios)
+        masks = [None] * len(audios)
+        energies = [None] * len(audios)
+
+        groups = {}
+        for i, sr in enumerate(sample_rates):
+            groups.setdefault(sr, []).append(i)
+
+        for sr, indices in groups.items():
+            window_size, hop_length = self.window_params(sr)
+            lengths = [len(audios[i]) for i in indices]
+
+            # Empacota no host e transfere o lote de uma vez
+            packed = np.zeros((len(indices), max(lengths)), dtype=np.float32)
+            for row, i in enumerate(indices):
+                packed[row, :lengths[row]] = audios[i]
+            energy = self.backend.energy(self.backend.transfer(packed), window_size, hop_length)
+            group_masks = self.backend.mask(energy, threshold)
+            if return_energy:
+                energy = energy.cpu().numpy() if is_tensor(energy) else np.asarray(energy)
+
+            # Ignora janelas que começam depois do fim de cada arquivo
+            for row, i in enumerate(indices):
+                masks[i] = group_masks[row, :lengths[row] // hop_length + 1]
+                bounds[i] = self.bounds_from_mask(masks[i], hop_length, window_size, lengths[row])
+                if return_energy:
+                    energies[i] = energy[row, :lengths[row] // hop_length + 1]
+
+        if return_masks and return_energy:
+            return bounds, masks, energies
+        if return_masks:
+            return bounds, masks
+        return bounds
+
+    def detect_segments_gpu(self, audio, sr: int) -> np.ndarray:
+        """
+        Detecta os trechos a manter, removendo também pausas internas longas
         
         Args:
-            silence_threshold_db: Limiar de silêncio em dB
-            min_silence_duration: Duração mínima de silêncio em segundos
+            audio: Áudio mono (numpy ou tensor)
+            sr: Taxa de amostragem
+            
+        Returns:
+            Array (k, 2) com os intervalos [início, fim) mantidos, em amostras
         """
-        self.silence_threshold_db = silence_threshold_db
-        self.min_silence_duration = min_silence_duration
-        self.device = device
-        
-    def db_to_amplitude(self, db: float) -> float:
-        """Converte dB para amplitude"""
-        return 10 ** (db / 20)
+        window_size, hop_length = self.window_params(sr)
+        mask = self.window_mask(audio, sr)
+        return self.segments_from_mask(mask, hop_length, window_size, len(audio), sr)
     
-    def detect_silence_gpu(self, audio_tensor: torch.Tensor, sr: int) -> Tuple[int, int]:
+    def analyze_audio(self, audio_data: np.ndarray, sr: int) -> List[Tuple[int, int]]:
         """
-        Detecta início e fim do áudio não-silencioso usando GPU
-        
+        Decide os trechos a manter de um áudio mono já decodificado
+
         Args:
-            audio_tensor: Tensor do áudio no dispositivo GPU
+            audio_data: Áudio mono (numpy)
             sr: Taxa de amostragem
+
+        Returns:
+            Lista de intervalos [início, fim) a manter, em amostras
+        """
+        return self.segments_from_window_mask(self.window_mask(audio_data, sr), sr, len(audio_data))
+
+    def can_stream(self, file_path: str) -> bool:
+        """Verifica se o arquivo pode ser lido em blocos pelo soundfile"""
+        try:
+            sf.info(file_path)
+            return True
+        except RuntimeError:
+            return False
+
+    @property
+    def detection_params(self) -> Dict:
+        """Parâmetros que mudam o resultado da detecção"""
+        return {
+            "version": 1,
+            "threshold_db": self.silence_threshold_db,
+            "window": f"{self.window_duration * 1000:g}ms/{self.hop_divisor}",
+            "remove_internal_silence": self.remove_internal_silence,
+            "min_silence_duration": self.min_silence_duration if self.remove_internal_silence else None,
+            "silence_gap": self.silence_gap if self.remove_internal_silence else None,
+        }
+
+    @property
+    def cache_params(self) -> str:
+        """Identifica os parâmetros que mudam o resultado da detecção"""
+        params = json.dumps(self.detection_params, sort_keys=True)
+        return hashlib.sha1(params.encode()).hexdigest()[:16]
+
+    def note_segments(self, file_path: str, segments) -> None:
+        """Guarda os trechos decididos para o arquivo (usado pelo cache e pelo diário)"""
+        if self.cache is not None or self.journal is not None:
+            with self._pending_lock:
+                self._pending.setdefault(file_path, {})["segments"] = [tuple(segment) for segment in segments]
+
+    def interrupted_rewrite(self, file_path: str) -> bool:
+        """True (com o aviso) se o arquivo pode ter ficado pela metade em uma regravação no lugar"""
+        if self.journal is None or not self.journal.interrupted(file_path):
+            return False
+        print(f"  ❌ {os.path.basename(file_path)}: a regravação no lugar foi interrompida e o arquivo "
+              f"pode estar corrompido; restaure o original (com a data, ex.: cp -p) para processá-lo de novo")
+        return True
+
+    def skip_if_cached(self, file_path: str) -> bool:
+        """Retorna True se o arquivo já foi processado com os parâmetros atuais (ou não pode ser)"""
+        if self.interrupted_rewrite(file_path):
+            return True
+        if self.resume and self.journal is not None and self.journal.done(file_path, self.detection_params):
+            print(f"  ⏭️  Já processado (diário): {os.path.basename(file_path)}")
+            return True
+        if self.cache is None:
+            return False
+        entry, content_key = self.cache.lookup(file_path, self.cache_params)
+        if entry is not None and entry["role"] == "output":
+            print(f"  ⏭️  Já processado (cache): {os.path.basename(file_path)}")
+            return True
+        with self._pending_lock:
+            self._pending[file_path] = {"input_key": content_key}
+        return False
+
+    def record_cached(self, file_path: str, segments=None) -> None:
+        """
+        Registra no cache e no diário um arquivo processado com sucesso
+
+        O corte já foi gravado: uma falha aqui só é avisada, não vira falha
+        do arquivo (quem repetisse o pedido cortaria o arquivo de novo).
+        """
+        if self.cache is None and self.journal is None:
+            return
+        with self._pending_lock:
+            pending = self._pending.pop(file_path, {})
+        segments = segments if segments is not None else pending.get("segments")
+        try:
+            if self.journal is not None:
+                self.journal.record(file_path, self.detection_params, segments)
+            if self.cache is not None and "input_key" in pending and segments is not None:
+                self.cache.record(file_path, self.cache_params, pending["input_key"], segments)
+        except (OSError, sqlite3.Error) as e:
+            print(f"  ⚠️  {os.path.basename(file_path)} foi cortado, mas não foi registrado: {str(e)}")
+
+    def decided(self, file_path: str, num_samples: Optional[int] = None) -> Optional[Dict]:
+        """
+        Decisão já tomada para o arquivo por um relatório (modo --apply)
+
+        Só vale se o arquivo não mudou desde a análise (tamanho, mtime e
+        número de frames); senão o arquivo é analisado de novo.
+
+        Args:
+            file_path: Caminho do arquivo
+            num_samples: Frames decodificados, quando já conhecidos
+
+        Returns:
+            Entrada do relatório (trechos, taxa, frames), ou None para analisar
+        """
+        entry = self.decisions.get(file_path)
+        if entry is None:
+            return None
+        stat = os.stat(file_path)
+        unchanged = (stat.st_size, stat.st_mtime_ns) == (entry['size'], entry['mtime_ns'])
+        if not unchanged or num_samples not in (None, entry['frames']):
+            print(f"  ⚠️  {os.path.basename(file_path)} mudou desde a análise; analisando de novo")
+            return None
+        return entry
+
+    def envelope_stats(self, energy: np.ndarray, mask: np.ndarray) -> Dict:
+        """Resumo do envelope: janelas, fração com som e níveis RMS em dBFS"""
+        if len(energy) == 0:
+            return {'windows': 0, 'sound_ratio': 0.0, 'peak_db': None, 'mean_db': None, 'floor_db': None}
+        rms_db = 20 * np.log10(np.maximum(np.sqrt(energy), 1e-10))
+        return {
+            'windows': len(energy),
+            'sound_ratio': round(float(mask.mean()), 4),
+            'peak_db': round(float(rms_db.max()), 2),
+            'mean_db': round(float(10 * np.log10(max(float(energy.mean()), 1e-20))), 2),
+            # Piso de ruído: 10% das janelas são mais baixas que isso
+            'floor_db': round(float(np.percentile(rms_db, 10)), 2),
+        }
+
+    def analyze_file(self, file_path: str) -> Dict:
+        """
+        Decide os cortes de um arquivo sem regravá-lo
+
+        Formatos que o libsndfile lê são analisados em blocos (memória
+        limitada); os demais são decodificados inteiros e passam pelo backend.
+
+        Args:
+            file_path: Caminho do arquivo de áudio
+
+        Returns:
+            Resultado compacto: taxa, frames, trechos mantidos, início e fim,
+            segundos mantidos e removidos, estatísticas do envelope (None com
+            edge_scan, que não lê o arquivo inteiro) e tamanho/mtime do
+            arquivo, que --apply usa para saber se a decisão ainda vale
+        """
+        stat = os.stat(file_path)
+        envelope = None
+        if self.edge_scan and not self.remove_internal_silence and self.can_stream(file_path):
+            with self.metrics.stage(file_path, 'analyze'):
+                segments, sr, num_samples = self.analyze_segments_streaming(file_path)
+        else:
+            if self.can_stream(file_path):
+                # Decodificação e envelope se intercalam bloco a bloco: uma etapa só
+                with self.metrics.stage(file_path, 'analyze'):
+                    energy, sr, num_samples = self.scan_energy_streaming(file_path)
+            else:
+                with self.metrics.stage(file_path, 'decode'):
+                    import librosa
+                    audio_data, sr = librosa.load(file_path, sr=None, mono=True)
+                num_samples = len(audio_data)
+                with self.metrics.stage(file_path, 'analyze'):
+                    window_size, hop_length = self.window_params(sr)
+                    energy = self.backend.energy(self.to_backend(audio_data), window_size, hop_length)
+                    energy = energy.cpu().numpy() if is_tensor(energy) else np.asarray(energy)
+                del audio_data
+            mask = self.mask_from_energy(energy)
+            segments = self.segments_from_window_mask(mask, sr, num_samples)
+            envelope = self.envelope_stats(energy, mask)
+
+        return self.analysis_result(file_path, stat, sr, num_samples, segments, envelope)
+
+    def analysis_result(self, file_path: str, stat: os.stat_result, sr: int, num_samples: int,
+                        segments, envelope: Optional[Dict]) -> Dict:
+        """Monta o resultado compacto de uma análise (ver analyze_file)"""
+        kept = sum(end - start for start, end in segments)
+        removed = removed_seconds(num_samples, segments, sr)
+        self.metrics.add(file_path, audio_seconds=num_samples / sr, audio_seconds_removed=removed)
+        return {
+            'file': file_path,
+            'sample_rate': sr,
+            'frames': num_samples,
+            'duration': round(num_samples / sr, 4),
+            'start': segments[0][0],
+            'end': segments[-1][1],
+            'kept_seconds': round(kept / sr, 4),
+            'removed_seconds': round(removed, 4),
+            'segments': [[int(start), int(end)] for start, end in segments],
+            'envelope': envelope,
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+        }
+
+    def analyze_decoded(self, file_paths: List[str], decoded: List[Tuple[os.stat_result, np.ndarray, int]]) -> List[Dict]:
+        """
+        Analisa vários áudios já decodificados com uma única detecção em lote
+
+        Mesmos resultados de analyze_file, mas o envelope de todos os
+        arquivos sai de uma chamada a detect_silence_batch (uma transferência
+        e um conjunto de kernels para o lote inteiro).
+
+        Args:
+            file_paths: Caminhos dos arquivos
+            decoded: (stat antes da decodificação, áudio mono, taxa) de cada arquivo
+
+        Returns:
+            Resultado de cada arquivo, na ordem de entrada
+        """
+        audios = [audio for _, audio, _ in decoded]
+        rates = [sr for _, _, sr in decoded]
+        _, masks, energies = self.detect_silence_batch(audios, rates, return_masks=True, return_energy=True)
+        results = []
+        for file_path, (stat, audio, sr), mask, energy in zip(file_paths, decoded, masks, energies):
+            segments = self.segments_from_window_mask(mask, sr, len(audio))
+            results.append(self.analysis_result(file_path, stat, sr, len(audio), segments,
+                                                self.envelope_stats(energy, mask)))
+        return results
+
+    def process_audio_file(self, file_path: str) -> bool:
+        """
+        Processa um arquivo de áudio individual
+        
+        Args:
+            file_path: Caminho para o arquivo de áudio
+            
+        Returns:
+            True se processado com sucesso, False caso contrário
+        """
+        self.metrics.begin_file(file_path)
+        if self.interrupted_rewrite(file_path):
+            self.metrics.end_file(file_path, 'failed')
+            return False
+        if self.skip_if_cached(file_path):
+            self.metrics.end_file(file_path, 'skipped')
+            return True
+
+        ok = self.trim_audio_file(file_path)
+        if ok:
+            self.record_cached(file_path)
+        self.metrics.end_file(file_path, 'ok' if ok else 'failed')
+        return ok
+
+    def trim_audio_file(self, file_path: str) -> bool:
+        """
+        Remove o silêncio de um arquivo, escolhendo o caminho conforme a configuração
+
+        Args:
+            file_path: Caminho para o arquivo de áudio
+
+        Returns:
+            True se processado com sucesso, False caso contrário
+        """
+        if self.inplace_wav and file_path.lower().endswith('.wav'):
+            layout = read_wav_layout(file_path)
+            if layout is not None:
+                return self.process_wav_inplace(file_path, layout)
+
+        if self.stream_copy and os.path.splitext(file_path)[1].lower() in STREAM_COPY_FORMATS:
+            if shutil.which('ffmpeg'):
+                return self.process_audio_file_stream_copy(file_path)
+            print(f"  ⚠️  ffmpeg não encontrado, recodificando {os.path.basename(file_path)}")
+
+        if (self.streaming or self.edge_scan) and self.can_stream(file_path):
+            return self.process_audio_file_streaming(file_path)
+
+        try:
+            filename = os.path.basename(file_path)
+            print(f"  📁 Carregando: {filename}")
+            
+            # Carrega áudio usando librosa (mais rápido que pydub)
+            with self.metrics.stage(file_path, 'decode'):
+                import librosa
+                audio_data, sr = librosa.load(file_path, sr=None, mono=True)
+            original_duration = len(audio_data) / sr
+            self.metrics.add(file_path, audio_seconds=original_duration)
+            
+            entry = self.decided(file_path, len(audio_data))
+            if entry is not None:
+                segments = entry['segments']
+            else:
+                print(f"  🔍 Analisando silêncio...")
+                with self.metrics.stage(file_path, 'analyze'):
+                    segments = self.analyze_audio(audio_data, sr)
+            self.note_segments(file_path, segments)
+            if len(segments) > 1:
+                print(f"  ✂️  {len(segments) - 1} pausa(s) interna(s) encurtada(s)")
+
+            # Concatena todos os trechos mantidos de uma só vez
+            trimmed_audio = np.concatenate([audio_data[start:end] for start, end in segments])
+            trimmed_duration = len(trimmed_audio) / sr
+            
+            if trimmed_duration < 0.1:  # Se muito curto, mantém original
+                print(f"  ⚠️  Áudio muito curto após remoção, mantendo original")
+                return True
+            
+            print(f"  ⏱️  Duração: {original_duration:.1f}s → {trimmed_duration:.1f}s "
+                  f"({((original_duration - trimmed_duration) / original_duration * 100):.1f}% removido)")
+            self.metrics.add(file_path, audio_seconds_removed=original_duration - trimmed_duration)
+            
+            # Salva o arquivo processado
+            print(f"  💾 Salvando: {filename}")
+            with self.metrics.stage(file_path, 'encode'):
+                write_audio(file_path, trimmed_audio, sr, self.block_size)
+            
+            print(f"  ✅ Concluído: {filename}")
+            return True
             
+        except Exception as e:
+            print(f"  ❌ Erro ao processar {filename}: {str(e)}")
+            return False
+
+    def scan_energy_streaming(self, file_path: str) -> Tuple[np.ndarray, int, int]:
+        """
+        Calcula o envelope de energia lendo o arquivo em blocos
+
+        Args:
+            file_path: Caminho para o arquivo de áudio
+
+        Returns:
+            Tuple com (energia por janela, taxa de amostragem, número de frames)
+        """
+        with sf.SoundFile(file_path) as src:
+            sr = src.samplerate
+            window_size, hop_length = self.window_params(sr)
+            envelope = StreamingRMSEnvelope(window_size, hop_length)
+
+            # Downmix para mono apenas na análise, como o librosa faria
+            for block in src.blocks(blocksize=self.block_size, dtype='float32', always_2d=True):
+                envelope.update(block.mean(axis=1))
+
+        return envelope.finish(), sr, envelope.total_samples
+
+    def scan_bounds_edges(self, file_path: str) -> Tuple[int, int, int, int]:
+        """
+        Encontra início e fim do áudio lendo só as bordas do arquivo
+
+        Avança janela a janela a partir do começo e recua a partir do fim,
+        parando na primeira janela acima do limiar em cada direção. Em
+        arquivos com seek, apenas os blocos necessários são decodificados.
+
+        Args:
+            file_path: Caminho para o arquivo de áudio
+
+        Returns:
+            Tuple com (início, fim, taxa de amostragem, número de frames)
+        """
+        with sf.SoundFile(file_path) as src:
+            sr, num_samples = src.samplerate, src.frames
+
+            def read_mono(start: int, stop: int) -> np.ndarray:
+                src.seek(start)
+                return src.read(stop - start, dtype='float32', always_2d=True).mean(axis=1)
+
+            start_sample, end_sample = self.edge_bounds(read_mono, num_samples, sr)
+
+        return start_sample, end_sample, sr, num_samples
+
+    def edge_bounds(self, read_mono, num_samples: int, sr: int) -> Tuple[int, int]:
+        """
+        Varre as bordas de uma fonte com acesso aleatório (núcleo de scan_bounds_edges)
+
+        Args:
+            read_mono: Função (início, fim) → amostras mono desse intervalo
+            num_samples: Número total de amostras
+            sr: Taxa de amostragem
+
         Returns:
             Tuple com índices de início e fim do áudio não-silencioso
         """
-        # Converte threshold de dB para amplitude
-        threshold = self.db_to_amplitude(self.silence_threshold_db)
-        
-        # Calcula RMS em janelas para detecção mais robusta
-        window_size = int(0.1 * sr)  # Janelas de 100ms
-        hop_length = window_size // 4
-        
-        # Padding para garantir que temos janelas completas
-        audio_padded = F.pad(audio_tensor, (0, window_size))
-        
-        # Calcula RMS usando convolução (mais eficiente na GPU)
-        windows = audio_padded.unfold(0, window_size, hop_length)
-        rms = torch.sqrt(torch.mean(windows ** 2, dim=1))
-        
-        # Encontra regiões não-silenciosas
-        non_silent_mask = rms > threshold
-        
-        if not non_silent_mask.any():
-            return 0, len(audio_tensor)
-        
-        # Encontra primeiro e último índice não-silencioso
-        non_silent_indices = torch.where(non_silent_mask)[0]
-        start_window = non_silent_indices[0].item()
-        end_window = non_silent_indices[-1].item()
-        
-        # Converte índices de janela para índices de amostra
+        window_size, hop_length = self.window_params(sr)
+        total_windows = num_samples // hop_length + 1
+        windows_per_block = max(1, self.block_size // hop_length)
+
+        def block_mask(first: int, count: int) -> np.ndarray:
+            # Lê só as amostras cobertas pelas janelas [first, first + count)
+            start = first * hop_length
+            stop = min((first + count - 1) * hop_length + window_size, num_samples)
+            block = read_mono(start, max(stop, start))
+            return self.mask_from_energy(window_energy(block, count, window_size, hop_length))
+
+        # Varredura para frente: primeira janela com som
+        start_window = None
+        first = 0
+        while first < total_windows:
+            count = min(windows_per_block, total_windows - first)
+            indices = np.flatnonzero(block_mask(first, count))
+            if len(indices):
+                start_window = first + int(indices[0])
+                break
+            first += count
+
+        if start_window is None:
+            return 0, num_samples
+
+        # Varredura para trás: última janela com som
+        end_window = start_window
+        last = total_windows
+        while last > start_window:
+            first = max(start_window, last - windows_per_block)
+            indices = np.flatnonzero(block_mask(first, last - first))
+            if len(indices):
+                end_window = first + int(indices[-1])
+                break
+            last = first
+
         start_sample = start_window * hop_length
-        end_sample = min((end_window + 1) * hop_length + window_size, len(audio_tensor))
-        
+        end_sample = min((end_window + 1) * hop_length + window_size, num_samples)
         return start_sample, end_sample
-    
-    def process_audio_file(self, file_path: str) -> bool:
+
+    def segments_from_energy(self, energy: np.ndarray, sr: int, num_samples: int) -> List[Tuple[int, int]]:
+        """Trechos a manter a partir do envelope, conforme o modo configurado"""
+        return self.segments_from_window_mask(self.mask_from_energy(energy), sr, num_samples)
+
+    def segments_from_window_mask(self, mask: np.ndarray, sr: int,
+                                  num_samples: int) -> List[Tuple[int, int]]:
+        """Trechos a manter a partir da máscara de janelas, conforme o modo configurado"""
+        window_size, hop_length = self.window_params(sr)
+        if self.remove_internal_silence:
+            segments = self.segments_from_mask(mask, hop_length, window_size, num_samples, sr)
+            return [tuple(segment) for segment in segments.tolist()]
+
+        return [self.bounds_from_mask(mask, hop_length, window_size, num_samples)]
+
+    def analyze_segments_streaming(self, file_path: str) -> Tuple[List[Tuple[int, int]], int, int]:
+        """
+        Decide os trechos a manter sem carregar o arquivo inteiro
+
+        Returns:
+            Tuple com (trechos [início, fim), taxa de amostragem, número de frames)
+        """
+        if self.edge_scan and not self.remove_internal_silence:
+            with sf.SoundFile(file_path) as src:
+                seekable = src.seekable()
+            if seekable:
+                start_idx, end_idx, sr, num_samples = self.scan_bounds_edges(file_path)
+                return [(start_idx, end_idx)], sr, num_samples
+
+        energy, sr, num_samples = self.scan_energy_streaming(file_path)
+        return self.segments_from_energy(energy, sr, num_samples), sr, num_samples
+
+    def analyze_wav_mapped(self, file_path: str, layout: WavLayout) -> List[Tuple[int, int]]:
+        """
+        Decide os trechos a manter lendo as amostras do WAV via memory-map
+
+        Args:
+            file_path: Caminho do WAV
+            layout: Cabeçalho lido por read_wav_layout
+
+        Returns:
+            Lista de intervalos [início, fim) a manter, em frames
+        """
+        num_samples = layout.frames
+        if num_samples == 0:
+            return [(0, 0)]
+
+        mapped = np.memmap(file_path, dtype=np.uint8, mode='r',
+                           offset=layout.data_offset, shape=(num_samples * layout.block_align,))
+        try:
+            def read_mono(start: int, stop: int) -> np.ndarray:
+                return wav_bytes_to_mono(mapped[start * layout.block_align:stop * layout.block_align], layout)
+
+            if self.edge_scan and not self.remove_internal_silence:
+                return [self.edge_bounds(read_mono, num_samples, layout.sr)]
+
+            window_size, hop_length = self.window_params(layout.sr)
+            envelope = StreamingRMSEnvelope(window_size, hop_length)
+            for start in range(0, num_samples, self.block_size):
+                envelope.update(read_mono(start, min(start + self.block_size, num_samples)))
+            return self.segments_from_energy(envelope.finish(), layout.sr, num_samples)
+        finally:
+            # O mapeamento precisa ser liberado antes de reescrever o arquivo
+            del mapped
+
+    def truncate_wav_inplace(self, file_path: str, layout: WavLayout, segments) -> int:
+        """
+        Compacta os trechos mantidos no início do chunk de dados e trunca o arquivo
+
+        Cada trecho só anda para trás no arquivo, então a cópia em ordem é
+        segura; chunks posteriores aos dados (ex.: LIST) são preservados. O
+        cabeçalho RIFF e o tamanho do chunk de dados são reescritos no lugar.
+
+        Returns:
+            Número de bytes de áudio movidos
+        """
+        frame_bytes = layout.block_align
+        moved = 0
+
+        with open(file_path, 'r+b') as f:
+            write_pos = layout.data_offset
+            for start, end in segments:
+                length = (end - start) * frame_bytes
+                source = layout.data_offset + start * frame_bytes
+                move_file_bytes(f, source, write_pos, length)
+                moved += length if source != write_pos else 0
+                write_pos += length
+
+            new_data_size = write_pos - layout.data_offset
+            if new_data_size & 1:
+                f.seek(write_pos)
+                f.write(b'\x00')
+                write_pos += 1
+
+            # Chunks depois dos dados acompanham o novo fim
+            trailing = layout.file_size - layout.data_end
+            if trailing > 0:
+                move_file_bytes(f, layout.data_end, write_pos, trailing)
+                write_pos += trailing
+
+            f.seek(layout.data_offset - 4)
+            f.write(struct.pack('<I', new_data_size))
+            f.seek(4)
+            f.write(struct.pack('<I', write_pos - 8))
+            f.truncate(write_pos)
+
+        return moved
+
+    def process_wav_inplace(self, file_path: str, layout: Optional[WavLayout] = None) -> bool:
+        """
+        Remove silêncio de um WAV PCM sem decodificar e regravar o arquivo
+
+        A análise lê as amostras por memory-map e o corte move apenas os
+        bytes que mudam de lugar; profundidade de bits e canais do original
+        são mantidos.
+
+        Args:
+            file_path: Caminho do WAV
+            layout: Cabeçalho já lido (opcional)
+
+        Returns:
+            True se processado com sucesso, False caso contrário
+        """
+        filename = os.path.basename(file_path)
+        try:
+            layout = layout or read_wav_layout(file_path)
+            if layout is None:
+                print(f"  ❌ {filename} não é um WAV PCM suportado")
+                return False
+
+            entry = self.decided(file_path, layout.frames)
+            if entry is not None:
+                segments = entry['segments']
+            else:
+                print(f"  📁 Mapeando: {filename}")
+                print(f"  🔍 Analisando silêncio...")
+                with self.metrics.stage(file_path, 'analyze'):
+                    segments = self.analyze_wav_mapped(file_path, layout)
+            self.note_segments(file_path, segments)
+            if len(segments) > 1:
+                print(f"  ✂️  {len(segments) - 1} pausa(s) interna(s) encurtada(s)")
+
+            original_duration = layout.frames / layout.sr
+            trimmed_duration = sum(end - start for start, end in segments) / layout.sr
+            self.metrics.add(file_path, audio_seconds=original_duration)
+
+            if trimmed_duration < 0.1:  # Se muito curto, mantém original
+                print(f"  ⚠️  Áudio muito curto após remoção, mantendo original")
+                return True
+
+            if segments == [(0, layout.frames)]:
+                print(f"  ✅ Nada a remover: {filename}")
+                return True
+
+            print(f"  ⏱️  Duração: {original_duration:.1f}s → {trimmed_duration:.1f}s "
+                  f"({((original_duration - trimmed_duration) / original_duration * 100):.1f}% removido)")
+
+            self.metrics.add(file_path, audio_seconds_removed=original_duration - trimmed_duration)
+
+            if self.journal is not None:
+                # A regravação não é atômica: uma queda no meio fica visível no diário
+                self.journal.begin(file_path, self.detection_params, segments)
+            with self.metrics.stage(file_path, 'encode'):
+                moved = self.truncate_wav_inplace(file_path, layout, segments)
+            print(f"  ✅ Concluído no lugar: {filename} ({moved / 1e6:.1f} MB movidos)")
+            return True
+
+        except Exception as e:
+            print(f"  ❌ Erro ao processar {filename}: {str(e)}")
+            return False
+
+    def process_audio_file_stream_copy(self, file_path: str) -> bool:
+        """
+        Remove silêncio de um MP3/AAC/M4A sem recodificar
+
+        O áudio é decodificado só para decidir os cortes; o arquivo final é
+        montado por cópia de stream (ffmpeg -c copy), com cortes alinhados
+        aos frames do codec. Não há perda de qualidade entre gerações.
+
+        Args:
+            file_path: Caminho para o arquivo de áudio
+
+        Returns:
+            True se processado com sucesso, False caso contrário
+        """
+        filename = os.path.basename(file_path)
+        muxer = STREAM_COPY_FORMATS[os.path.splitext(file_path)[1].lower()]
+        temp_path = file_path + ".tmp"
+
+        try:
+            # Com a decisão de um relatório, nem a decodificação é necessária
+            entry = self.decided(file_path)
+            if entry is not None:
+                segments, sr, num_samples = entry['segments'], entry['sample_rate'], entry['frames']
+            else:
+                print(f"  📁 Decodificando para análise: {filename}")
+                with self.metrics.stage(file_path, 'decode'):
+                    import librosa
+                    audio_data, sr = librosa.load(file_path, sr=None, mono=True)
+
+                print(f"  🔍 Analisando silêncio...")
+                with self.metrics.stage(file_path, 'analyze'):
+                    segments = self.analyze_audio(audio_data, sr)
+                num_samples = len(audio_data)
+                del audio_data
+            self.note_segments(file_path, segments)
+            if len(segments) > 1:
+                print(f"  ✂️  {len(segments) - 1} pausa(s) interna(s) encurtada(s)")
+
+            original_duration = num_samples / sr
+            trimmed_duration = sum(end - start for start, end in segments) / sr
+            self.metrics.add(file_path, audio_seconds=original_duration)
+
+            if trimmed_duration < 0.1:  # Se muito curto, mantém original
+                print(f"  ⚠️  Áudio muito curto após remoção, mantendo original")
+                return True
+
+            print(f"  ⏱️  Duração: {original_duration:.1f}s → {trimmed_duration:.1f}s "
+                  f"({((original_duration - trimmed_duration) / original_duration * 100):.1f}% removido)")
+
+            self.metrics.add(file_path, audio_seconds_removed=original_duration - trimmed_duration)
+
+            print(f"  💾 Copiando stream: {filename}")
+            with self.metrics.stage(file_path, 'encode'):
+                stream_copy_segments(file_path, temp_path, segments, sr, muxer)
+                replace_file(temp_path, file_path)
+
+            print(f"  ✅ Concluído: {filename}")
+            return True
+
+        except Exception as e:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            print(f"  ❌ Erro ao processar {filename}: {str(e)}")
+            return False
+
+    def copy_segments_streaming(self, file_path: str, output_path: str, segments) -> None:
         """
-        Processa um arquivo de áudio individual
-        
+        Copia os intervalos [início, fim) de frames para um novo arquivo, em blocos
+
+        O formato, subtipo e número de canais do original são preservados.
+        """
+        with sf.SoundFile(file_path) as src:
+            with sf.SoundFile(output_path, 'w', samplerate=src.samplerate, channels=src.channels,
+                              format=src.format, subtype=src.subtype) as dst:
+                for start, end in segments:
+                    src.seek(start)
+                    remaining = end - start
+                    while remaining > 0:
+                        # float64 representa sem perdas qualquer PCM de até 32 bits
+                        block = src.read(min(self.block_size, remaining), dtype='float64', always_2d=True)
+                        if len(block) == 0:
+                            break
+                        dst.write(block)
+                        remaining -= len(block)
+
+    def process_audio_file_streaming(self, file_path: str, output_path: Optional[str] = None) -> bool:
+        """
+        Processa um arquivo em modo streaming, com memória limitada
+
+        A primeira passada calcula o envelope RMS bloco a bloco; a segunda
+        copia apenas o trecho mantido para um arquivo temporário, que então
+        substitui o destino. O pico de memória fica em poucos blocos,
+        independente da duração do arquivo.
+
         Args:
             file_path: Caminho para o arquivo de áudio
-            
+            output_path: Destino do áudio processado (padrão: sobrescreve o original)
+
         Returns:
             True se processado com sucesso, False caso contrário
         """
+        filename = os.path.basename(file_path)
+        output_path = output_path or file_path
+        temp_path = output_path + ".tmp"
+
         try:
-            filename = os.path.basename(file_path)
-            print(f"  📁 Carregando: {filename}")
-            
-            # Carrega áudio usando librosa (mais rápido que pydub)
-            audio_data, sr = librosa.load(file_path, sr=None, mono=True)
-            original_duration = len(audio_data) / sr
-            
-            # Move para GPU
-            audio_tensor = torch.from_numpy(audio_data).float().to(self.device)
-            
-            print(f"  🔍 Analisando silêncio...")
-            start_idx, end_idx = self.detect_silence_gpu(audio_tensor, sr)
-            
-            # Extrai áudio não-silencioso
-            trimmed_tensor = audio_tensor[start_idx:end_idx]
-            trimmed_duration = len(trimmed_tensor) / sr
-            
+            print(f"  📁 Lendo em blocos: {filename}")
+            entry = self.decided(file_path)
+            if entry is not None:
+                segments, sr, num_samples = entry['segments'], entry['sample_rate'], entry['frames']
+            else:
+                print(f"  🔍 Analisando silêncio...")
+                # Decodificação e envelope se intercalam bloco a bloco: uma etapa só
+                with self.metrics.stage(file_path, 'analyze'):
+                    segments, sr, num_samples = self.analyze_segments_streaming(file_path)
+            self.note_segments(file_path, segments)
+            if len(segments) > 1:
+                print(f"  ✂️  {len(segments) - 1} pausa(s) interna(s) encurtada(s)")
+
+            original_duration = num_samples / sr
+            trimmed_duration = sum(end - start for start, end in segments) / sr
+            self.metrics.add(file_path, audio_seconds=original_duration)
+
             if trimmed_duration < 0.1:  # Se muito curto, mantém original
                 print(f"  ⚠️  Áudio muito curto após remoção, mantendo original")
                 return True
-            
-            # Move de volta para CPU para salvar
-            trimmed_audio = trimmed_tensor.cpu().numpy()
-            
+
             print(f"  ⏱️  Duração: {original_duration:.1f}s → {trimmed_duration:.1f}s "
                   f"({((original_duration - trimmed_duration) / original_duration * 100):.1f}% removido)")
-            
-            # Salva o arquivo processado
-            print(f"  💾 Salvando: {filename}")
-            sf.write(file_path, trimmed_audio, sr)
-            
+
+            self.metrics.add(file_path, audio_seconds_removed=original_duration - trimmed_duration)
+
+            print(f"  💾 Salvando: {os.path.basename(output_path)}")
+            with self.metrics.stage(file_path, 'encode'):
+                self.copy_segments_streaming(file_path, temp_path, segments)
+                replace_file(temp_path, output_path)
+
             print(f"  ✅ Concluído: {filename}")
             return True
-            
+
         except Exception as e:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
             print(f"  ❌ Erro ao processar {filename}: {str(e)}")
             return False
     
-    def process_batch_parallel(self, file_paths: List[str], max_workers: int = 4) -> None:
+    def load_mono_timed(self, file_path: str) -> Optional[Tuple[np.ndarray, int]]:
+        """load_mono medido como etapa de decodificação"""
+        with self.metrics.stage(file_path, 'decode'):
+            return load_mono(file_path)
+
+    def write_segments_timed(self, file_path: str, audio_data: np.ndarray, sr: int, segments) -> bool:
+        """write_segments medido como etapa de codificação"""
+        with self.metrics.stage(file_path, 'encode'):
+            return write_segments(file_path, audio_data, sr, segments)
+
+    def plan_jobs(self, file_paths: List[str]) -> List[AudioJob]:
+        """
+        Estima cada arquivo pelo cabeçalho e ordena o trabalho
+
+        Com job_order='longest', os arquivos mais longos vão primeiro
+        (escalonamento LPT): um arquivo de horas no fim da fila deixaria
+        os outros workers ociosos esperando por ele.
+        """
+        jobs = [estimate_job(file_path) for file_path in file_paths]
+        if self.job_order == 'longest':
+            jobs.sort(key=lambda job: job.duration, reverse=True)
+        return jobs
+
+    def stream_jobs(self, file_paths: Iterable[str]) -> Iterator[AudioJob]:
+        """
+        Estima os arquivos à medida que chegam e entrega um job a cada pedido
+
+        Uma thread consome os caminhos (ex.: a descoberta das pastas) e lê
+        os cabeçalhos à frente do processamento, até lookahead arquivos. Cada
+        pedido recebe o mais longo entre os já estimados (com
+        job_order='longest'), então o primeiro arquivo encontrado já começa a
+        ser processado, sem esperar a lista inteira, e a memória fica
+        limitada pela janela.
+        """
+        arrivals = queue.Queue(maxsize=self.lookahead)
+
+        def produce():
+            try:
+                for file_path in file_paths:
+                    arrivals.put(('job', estimate_job(file_path)))
+                arrivals.put(('end', None))
+            except Exception as e:
+                arrivals.put(('error', e))
+
+        threading.Thread(target=produce, daemon=True).start()
+        window = []
+        sequence = itertools.count()
+        finished = False
+        while True:
+            # Junta o que já chegou; só espera quando não há nada para entregar
+            while not finished and len(window) < self.lookahead:
+                try:
+                    kind, item = arrivals.get(block=not window)
+                except queue.Empty:
+                    break
+                if kind == 'end':
+                    finished = True
+                elif kind == 'error':
+                    raise item
+                else:
+                    key = -item.duration if self.job_order == 'longest' else 0
+                    heapq.heappush(window, (key, next(sequence), item))
+            if not window:
+                return
+            yield heapq.heappop(window)[2]
+
+    def job_memory(self, job: AudioJob) -> int:
+        """Memória a reservar para um arquivo, conforme o modo de processamento"""
+        streaming = (self.streaming or self.edge_scan) and job.exact
+        return job.memory_bytes(self.scratch_bytes, self.block_size if streaming else None)
+
+    def plan_batches(self, file_paths: List[str], batch_size: int) -> List[List[str]]:
+        """
+        Agrupa os arquivos em lotes de até batch_size que caibam no orçamento
+
+        Um lote é decodificado inteiro e empacotado em uma matriz (arquivos ×
+        maior duração), então sua reserva é a soma das estimativas mais a
+        matriz. Com os mais longos primeiro, cada lote também junta arquivos
+        de durações parecidas, com menos padding.
+        """
+        batches = []
+        chunk, chunk_bytes = [], 0
+        for job in self.plan_jobs(file_paths):
+            frames = max([other.frames for other in chunk] + [job.frames])
+            needed = chunk_bytes + self.job_memory(job) + 4 * (len(chunk) + 1) * frames
+            over_budget = self.memory_budget is not None and needed > self.memory_budget
+            if chunk and (len(chunk) == batch_size or over_budget):
+                batches.append(chunk)
+                chunk, chunk_bytes = [], 0
+            chunk.append(job)
+            chunk_bytes += self.job_memory(job)
+        if chunk:
+            batches.append(chunk)
+        return [[job.path for job in batch] for batch in batches]
+
+    def process_batch_vectorized(self, file_paths: List[str], batch_size: int = 32,
+                                 max_workers: int = 4) -> None:
+        """
+        Processa arquivos em lotes, com uma única detecção vetorizada por lote
+
+        Decodificação e gravação usam o pool de threads; a detecção de cada
+        lote é feita em uma chamada (detect_silence_batch), evitando uma
+        transferência e um conjunto de kernels por arquivo.
+
+        Args:
+            file_paths: Lista de caminhos dos arquivos
+            batch_size: Número de arquivos por lote
+            max_workers: Número de threads para decodificar e gravar
+        """
+        print(f"🔄 Processando {len(file_paths)} arquivos em lotes de {batch_size} "
+              f"({max_workers} workers de E/S)...")
+
+        start_time = time.time()
+        successful = 0
+        failed = 0
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for number, chunk in enumerate(self.plan_batches(file_paths, batch_size), 1):
+                print(f"\n📦 Lote {number}: {len(chunk)} arquivo(s)")
+                for path in chunk:
+                    self.metrics.begin_file(path)
+                cached = [path for path in chunk if self.skip_if_cached(path)]
+                for path in cached:
+                    self.metrics.end_file(path, 'skipped')
+                successful += len(cached)
+                chunk = [path for path in chunk if path not in cached]
+
+                decoded = list(executor.map(self.load_mono_timed, chunk))
+                loaded = []
+                for path, item in zip(chunk, decoded):
+                    if item is None:
+                        self.metrics.end_file(path, 'failed')
+                    else:
+                        loaded.append((path, item))
+                failed += len(chunk) - len(loaded)
+                if not loaded:
+                    continue
+
+                # Só os arquivos sem decisão de um relatório passam pela detecção
+                decisions = {}
+                for path, (audio, _) in loaded:
+                    entry = self.decided(path, len(audio))
+                    if entry is not None:
+                        decisions[path] = entry['segments']
+                pending = [(path, item) for path, item in loaded if path not in decisions]
+
+                if pending:
+                    audios = [audio for _, (audio, _) in pending]
+                    rates = [sr for _, (_, sr) in pending]
+                    started = time.perf_counter()
+                    bounds, masks = self.detect_silence_batch(audios, rates, return_masks=True)
+                    # Uma detecção para o lote inteiro: o tempo é dividido entre os arquivos
+                    share = (time.perf_counter() - started) / len(pending)
+                    for (path, (audio, sr)), (start, end), mask in zip(pending, bounds, masks):
+                        self.metrics.add_stage(path, 'analyze', share)
+                        if self.remove_internal_silence:
+                            window_size, hop_length = self.window_params(sr)
+                            decisions[path] = self.segments_from_mask(mask, hop_length, window_size,
+                                                                      len(audio), sr)
+                        else:
+                            decisions[path] = [(start, end)]
+
+                futures = []
+                for path, (audio, sr) in loaded:
+                    segments = decisions[path]
+                    self.metrics.add(path, audio_seconds=len(audio) / sr,
+                                     audio_seconds_removed=removed_seconds(len(audio), segments, sr))
+                    futures.append((path, segments,
+                                    executor.submit(self.write_segments_timed, path, audio, sr, segments)))
+
+                for path, segments, future in futures:
+                    if future.result():
+                        self.record_cached(path, segments)
+                        self.metrics.end_file(path, 'ok')
+                        successful += 1
+                    else:
+                        self.metrics.end_file(path, 'failed')
+                        failed += 1
+
+        elapsed_time = time.time() - start_time
+        print(f"\n🎉 Processamento concluído!")
+        print(f"   ⏱️  Tempo total: {elapsed_time:.1f}s")
+        print(f"   ✅ Sucessos: {successful}")
+        print(f"   ❌ Falhas: {failed}")
+        print(f"   🚀 Velocidade média: {len(file_paths)/elapsed_time:.1f} arquivos/s")
+
+    def run_scheduled(self, file_paths: Iterable[str], max_workers: int, handler,
+                      job_memory=None, planned: bool = True) -> Iterator[Tuple[str, Future]]:
+        """
+        Executa handler(caminho) para cada arquivo em um pool de threads,
+        mais longos primeiro e dentro do orçamento de memória
+
+        Um arquivo só é submetido quando há worker livre e memória no
+        orçamento; assim nenhum job fica reservando memória na fila.
+
+        Args:
+            file_paths: Caminhos dos arquivos
+            max_workers: Número máximo de workers paralelos
+            handler: Função chamada com o caminho de cada arquivo
+            job_memory: Estimativa de memória por AudioJob (padrão: job_memory)
+            planned: Ordena os arquivos: uma lista inteira com plan_jobs, um
+                iterador (ex.: a descoberta das pastas) dentro da janela de
+                stream_jobs; com False, os caminhos são consumidos na ordem em
+                que chegam (podem vir de um gerador sem fim, como no modo --watch)
+
+        Yields:
+            (caminho, future) na ordem em que terminam
+        """
+        if not planned:
+            jobs = (estimate_job(path) for path in file_paths)
+        elif isinstance(file_paths, (list, tuple)):
+            jobs = iter(self.plan_jobs(file_paths))
+        else:
+            jobs = self.stream_jobs(file_paths)
+        job_memory = job_memory or self.job_memory
+        budget = MemoryBudget(self.memory_budget)
+        if self.memory_budget is not None:
+            print(f"🧠 Orçamento de memória: {format_bytes(self.memory_budget)}")
+
+        slots = threading.Semaphore(max_workers)
+        finished = queue.Queue()
+
+        def dispatch(executor):
+            submitted = 0
+            try:
+                while True:
+                    # O próximo job só é escolhido quando há worker livre
+                    slots.acquire()
+                    job = next(jobs, None)
+                    if job is None:
+                        slots.release()
+                        break
+                    budget.acquire(job.path, job_memory(job))
+                    future = executor.submit(handler, job.path)
+                    future.add_done_callback(lambda future, path=job.path: done(path, future))
+                    submitted += 1
+            finally:
+                # Fim da entrada: avisa quantos resultados ainda devem chegar
+                finished.put((None, submitted))
+
+        def done(file_path, future):
+            budget.release(file_path)
+            slots.release()
+            finished.put((file_path, future))
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            dispatcher = threading.Thread(target=dispatch, args=(executor,), daemon=True)
+            dispatcher.start()
+            received, total = 0, None
+            while total is None or received < total:
+                file_path, item = finished.get()
+                if file_path is None:
+                    total = item
+                    continue
+                received += 1
+                yield file_path, item
+
+        if self.memory_budget is not None:
+            print(f"\n🧠 Pico de memória estimado: {format_bytes(budget.peak)}")
+
+    def analyze_batch(self, file_paths: Iterable[str], report: AnalysisReport, max_workers: int = 4) -> None:
+        """
+        Só analisa os arquivos, sem regravar nada, e grava as decisões no relatório
+
+        O custo fica em decodificação e detecção; nenhum arquivo é aberto para escrita.
+
+        Args:
+            file_paths: Caminhos dos arquivos (lista, ou iterador da descoberta)
+            report: Relatório onde cada resultado é gravado
+            max_workers: Número máximo de workers paralelos
+        """
+        total = f"/{len(file_paths)}" if isinstance(file_paths, list) else ""
+        print(f"🔍 Analisando {len(file_paths) if total else 'os'} arquivos com {max_workers} workers "
+              f"(sem regravar)...")
+
+        def analyze(file_path):
+            self.metrics.begin_file(file_path)
+            try:
+                result = self.analyze_file(file_path)
+            except Exception:
+                self.metrics.end_file(file_path, 'failed')
+                raise
+            self.metrics.end_file(file_path, 'ok')
+            return result
+
+        # Em blocos quando o libsndfile lê o formato; senão o arquivo inteiro
+        def job_memory(job):
+            return job.memory_bytes(self.scratch_bytes, self.block_size if job.exact else None)
+
+        start_time = time.time()
+        analyzed = 0
+        failed = 0
+        removed = 0.0
+        for file_path, future in self.run_scheduled(file_paths, max_workers, analyze, job_memory):
+            filename = os.path.basename(file_path)
+            try:
+                result = future.result()
+            except Exception as e:
+                print(f"  ❌ Erro ao analisar {filename}: {str(e)}")
+                failed += 1
+                continue
+            report.add(result)
+            analyzed += 1
+            removed += result['removed_seconds']
+            print(f"  [{analyzed + failed}{total}] {filename}: "
+                  f"{result['duration']:.1f}s → {result['kept_seconds']:.1f}s "
+                  f"({len(result['segments'])} trecho(s))")
+
+        elapsed_time = time.time() - start_time
+        print(f"\n🎉 Análise concluída!")
+        print(f"   ⏱️  Tempo total: {elapsed_time:.1f}s")
+        print(f"   ✅ Analisados: {analyzed}")
+        print(f"   ❌ Falhas: {failed}")
+        print(f"   ✂️  Silêncio a remover: {removed:.1f}s")
+
+    def process_batch_parallel(self, file_paths: Iterable[str], max_workers: int = 4) -> None:
         """
         Processa múltiplos arquivos em paralelo
         
         Args:
-            file_paths: Lista de caminhos dos arquivos
+            file_paths: Caminhos dos arquivos (lista, ou iterador da descoberta:
+                o processamento começa enquanto as pastas ainda são percorridas)
             max_workers: Número máximo de workers paralelos
         """
-        print(f"🔄 Processando {len(file_paths)} arquivos com {max_workers} workers paralelos...")
+        total = f"/{len(file_paths)}" if isinstance(file_paths, list) else ""
+        print(f"🔄 Processando {len(file_paths) if total else 'os'} arquivos com {max_workers} "
+              f"workers paralelos...")
         
         start_time = time.time()
         successful = 0
         failed = 0
         
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            # Submete todas as tarefas
-            future_to_file = {
-                executor.submit(self.process_audio_file, file_path): file_path 
-                for file_path in file_paths
-            }
+        # Processa resultados conforme completam
+        scheduled = self.run_scheduled(file_paths, max_workers, self.process_audio_file)
+        for i, (file_path, future) in enumerate(scheduled, 1):
+            filename = os.path.basename(file_path)
             
-            # Processa resultados conforme completam
-            for i, future in enumerate(as_completed(future_to_file), 1):
-                file_path = future_to_file[future]
-                filename = os.path.basename(file_path)
-                
-                print(f"\n[{i}/{len(file_paths)}] Processando: {filename}")
-                
-                try:
-                    success = future.result()
-                    if success:
-                        successful += 1
-                    else:
-                        failed += 1
-                except Exception as e:
-                    print(f"  ❌ Erro inesperado: {str(e)}")
+            print(f"\n[{i}{total}] Processando: {filename}")
+            
+            try:
+                success = future.result()
+                if success:
+                    successful += 1
+                else:
                     failed += 1
+            except Exception as e:
+                print(f"  ❌ Erro inesperado: {str(e)}")
+                failed += 1
         
         elapsed_time = time.time() - start_time
         print(f"\n🎉 Processamento concluído!")
         print(f"   ⏱️  Tempo total: {elapsed_time:.1f}s")
         print(f"   ✅ Sucessos: {successful}")
         print(f"   ❌ Falhas: {failed}")
-        print(f"   🚀 Velocidade média: {len(file_paths)/elapsed_time:.1f} arquivos/s")
+        print(f"   🚀 Velocidade média: {(successful + failed)/elapsed_time:.1f} arquivos/s")
+
+    def warm_up(self) -> None:
+        """
+        Prepara o que a primeira detecção carregaria: o librosa, o backend e
+        seus kernels (import do torch, contexto CUDA, compilação do Numba)
+        """
+        import librosa  # noqa: F401 (só para deixar o import pago)
+        self.detect_silence_gpu(np.zeros(16000, dtype=np.float32), 16000)
 
-def trim_silence_from_audio():
+    def process_watch(self, watcher: FolderWatcher, max_workers: int = 4) -> None:
+        """
+        Processa os arquivos que o watcher entrega, até ele parar
+
+        O processador fica carregado entre os arquivos (backend, kernels e
+        imports são pagos uma vez só); cada arquivo é processado uma vez, e
+        de novo só se mudar depois do corte.
+
+        Args:
+            watcher: Vigia das pastas de entrada
+            max_workers: Número máximo de arquivos processados ao mesmo tempo
+        """
+        print(f"👀 Vigiando {', '.join(watcher.directories)}: {watcher.mode}, "
+              f"arquivos estáveis por {watcher.settle:g}s, {max_workers} workers")
+        self.warm_up()
+        print("✅ Pronto; Ctrl+C para encerrar")
+
+        def handle(file_path):
+            try:
+                return self.process_audio_file(file_path)
+            finally:
+                watcher.done(file_path)
+
+        successful = 0
+        failed = 0
+        for file_path, future in self.run_scheduled(watcher.ready_files(), max_workers, handle, planned=False):
+            try:
+                ok = future.result()
+            except Exception as e:
+                print(f"  ❌ Erro inesperado em {os.path.basename(file_path)}: {str(e)}")
+                ok = False
+            successful += ok
+            failed += not ok
+            print(f"📥 {os.path.basename(file_path)}: {'✅' if ok else '❌'} "
+                  f"({successful} processado(s), {failed} falha(s) desde o início)")
+
+        print(f"\n👋 Vigia encerrado: {successful} processado(s), {failed} falha(s)")
+
+    def process_batch_distributed(self, file_paths: List[str], leases: LeaseManager,
+                                  max_workers: int = 4) -> None:
+        """
+        Processa os arquivos junto com outros workers que compartilham a pasta
+
+        Cada arquivo só é processado depois que este worker obtém a lease
+        dele, e quem termina registra o arquivo no diário compartilhado
+        (self.journal); os demais pulam o que já está no diário. Arquivos com
+        lease de outro worker ficam para a próxima passada: se o worker
+        morrer, a lease vence e o arquivo é retomado aqui.
+
+        Args:
+            file_paths: Lista de caminhos dos arquivos
+            leases: Leases deste worker
+            max_workers: Número máximo de workers paralelos neste processo
+        """
+        print(f"🌐 Modo distribuído: worker {leases.worker_id}, {len(file_paths)} arquivo(s), "
+              f"{max_workers} workers locais, leases de {leases.ttl:g}s")
+        params = self.detection_params
+
+        def attempt(file_path):
+            if self.journal.done(file_path, params) or not leases.claim(file_path):
+                return 'busy'
+            try:
+                # Outro worker pode ter terminado o arquivo e liberado a lease agora há pouco
+                self.journal.refresh()
+                if self.journal.done(file_path, params):
+                    return 'done'
+                ok = self.process_audio_file(file_path)
+                if not leases.owns(file_path):
+                    print(f"  ⚠️  {os.path.basename(file_path)} foi processado sem lease válida "
+                          f"(renovação atrasou mais que o ttl)")
+                return 'ok' if ok else 'failed'
+            finally:
+                leases.release(file_path)
+
+        start_time = time.time()
+        successful = 0
+        failed = 0
+        pending = list(file_paths)
+        leases.start()
+        try:
+            while True:
+                self.journal.refresh()
+                pending = [path for path in pending
+                           if os.path.exists(path) and not self.journal.done(path, params)]
+                if not pending:
+                    break
+                busy = []
+                for file_path, future in self.run_scheduled(pending, max_workers, attempt):
+                    try:
+                        status = future.result()
+                    except Exception as e:
+                        print(f"  ❌ Erro inesperado em {os.path.basename(file_path)}: {str(e)}")
+                        status = 'failed'
+                    if status == 'ok':
+                        successful += 1
+                    elif status == 'failed':
+                        failed += 1
+                    elif status == 'busy':
+                        busy.append(file_path)
+                if not busy:
+                    break
+                # O que resta está com outros workers: espera terminarem ou as leases vencerem
+                print(f"\n⏳ {len(busy)} arquivo(s) com outros workers; aguardando...")
+                pending = busy
+                time.sleep(min(leases.ttl / 4, 5.0))
+
+            # Leases de workers mortos em arquivos que já estão no diário
+            def finished(file_path):
+                return os.path.exists(file_path) and self.journal.done(file_path, params)
+
+            while leases.sweep(finished):
+                time.sleep(min(leases.ttl / 4, 5.0))
+                self.journal.refresh()
+        finally:
+            leases.stop()
+
+        elapsed_time = time.time() - start_time
+        print(f"\n🎉 Processamento concluído (worker {leases.worker_id})!")
+        print(f"   ⏱️  Tempo total: {elapsed_time:.1f}s")
+        print(f"   ✅ Processados aqui: {successful}")
+        print(f"   🤝 Processados por outros workers: {len(file_paths) - successful - failed}")
+        print(f"   ❌ Falhas: {failed}")
+        if leases.reclaimed:
+            print(f"   ♻️  Leases vencidas retomadas: {leases.reclaimed}")
+
+class StageStats:
+    """Contadores de uma etapa do pipeline (itens, tempo ocupado, áudio processado)"""
+
+    def __init__(self, name: str, workers: int):
+        self.name = name
+        self.workers = workers
+        self.items = 0
+        self.failed = 0
+        self.busy_time = 0.0
+        self.audio_seconds = 0.0
+        self.first_start = None
+        self.last_end = None
+        self.active_workers = workers
+        self.lock = threading.Lock()
+
+    def record(self, started: float, finished: float, audio_seconds: float, ok: bool) -> None:
+        """Registra um item processado pela etapa"""
+        with self.lock:
+            self.items += 1
+            self.failed += 0 if ok else 1
+            self.busy_time += finished - started
+            self.audio_seconds += audio_seconds
+            self.first_start = started if self.first_start is None else min(self.first_start, started)
+            self.last_end = finished if self.last_end is None else max(self.last_end, finished)
+
+    @property
+    def wall_time(self) -> float:
+        if self.first_start is None:
+            return 0.0
+        return self.last_end - self.first_start
+
+    @property
+    def utilization(self) -> float:
+        """Fração do tempo em que os workers da etapa estiveram ocupados"""
+        if self.wall_time <= 0:
+            return 0.0
+        return self.busy_time / (self.wall_time * self.workers)
+
+    def as_dict(self) -> Dict[str, float]:
+        wall = self.wall_time
+        return {
+            "stage": self.name,
+            "workers": self.workers,
+            "items": self.items,
+            "failed": self.failed,
+            "busy_seconds": self.busy_time,
+            "wall_seconds": wall,
+            "files_per_second": self.items / wall if wall > 0 else 0.0,
+            "audio_seconds_per_second": self.audio_seconds / wall if wall > 0 else 0.0,
+            "utilization": self.utilization,
+        }
+
+# Marcador de fim de fila entre etapas
+_STOP = object()
+
+class StagedPipeline:
+    """
+    Pipeline decodificação → análise → codificação com filas limitadas
+
+    Cada etapa tem seu próprio conjunto de workers, dimensionado de forma
+    independente, e as etapas se comunicam por filas de tamanho fixo: uma
+    etapa rápida bloqueia quando a seguinte está atrasada (backpressure),
+    mantendo a memória limitada a poucos arquivos em trânsito. Com
+    use_processes, decodificação e codificação rodam em processos separados,
+    fora do GIL, e o PCM decodificado trafega entre processos por memória
+    compartilhada (SharedAudio) em vez de ser serializado.
+    """
+
+    # Nome de cada etapa nas métricas exportadas
+    METRIC_NAMES = {"decodificação": "decode", "análise": "analyze", "codificação": "encode"}
+
+    def __init__(self, processor: 'GPUAudioProcessor', decode_workers: int = 2,
+                 analyze_workers: int = 1, encode_workers: int = 2,
+                 queue_size: int = 4, use_processes: bool = False):
+        self.processor = processor
+        self.decode_workers = decode_workers
+        self.analyze_workers = analyze_workers
+        self.encode_workers = encode_workers
+        self.queue_size = queue_size
+        self.use_processes = use_processes
+        self.stats: Dict[str, StageStats] = {}
+        self.skipped = 0
+        self.budget = MemoryBudget(None)
+
+    def _stage_worker(self, stats: StageStats, inbox: queue.Queue, outbox: Optional[queue.Queue],
+                      next_workers: int, handler) -> None:
+        while True:
+            item = inbox.get()
+            if item is _STOP:
+                break
+
+            file_path = item if isinstance(item, str) else item[0]
+            started = time.perf_counter()
+            try:
+                result, audio_seconds, ok = handler(item)
+            except Exception as e:
+                print(f"  ❌ Erro na etapa {stats.name}: {str(e)}")
+                result, audio_seconds, ok = None, 0.0, False
+            finished = time.perf_counter()
+            stats.record(started, finished, audio_seconds, ok)
+
+            metrics = self.processor.metrics
+            metrics.add_stage(file_path, self.METRIC_NAMES[stats.name], finished - started)
+            if not ok or result is None:
+                # O arquivo saiu do pipeline: devolve sua reserva de memória
+                self.budget.release(file_path)
+            if not ok:
+                metrics.end_file(file_path, 'failed')
+            elif result is None:
+                # Sem resultado: fim da última etapa, ou arquivo pulado no caminho
+                metrics.end_file(file_path, 'ok' if outbox is None else 'skipped')
+
+            if result is not None and outbox is not None:
+                outbox.put(result)
+
+        # O último worker da etapa avisa a etapa seguinte
+        with stats.lock:
+            stats.active_workers -= 1
+            last = stats.active_workers == 0
+        if last and outbox is not None:
+            for _ in range(next_workers):
+                outbox.put(_STOP)
+
+    def run(self, file_paths: List[str]) -> Dict[str, StageStats]:
+        """
+        Processa os arquivos pelo pipeline e retorna as estatísticas por etapa
+
+        Args:
+            file_paths: Lista de caminhos dos arquivos
+
+        Returns:
+            Dicionário etapa → StageStats
+        """
+        print(f"🔄 Pipeline: {len(file_paths)} arquivos | decodificação {self.decode_workers}, "
+              f"análise {self.analyze_workers}, codificação {self.encode_workers} workers"
+              f"{' (processos)' if self.use_processes else ''}")
+
+        decode_pool = encode_pool = None
+        if self.use_processes:
+            # Um único rastreador de recursos para pai e workers, assim os
+            # blocos de memória compartilhada não são tratados como vazados
+            resource_tracker.ensure_running()
+            decode_pool = ProcessPoolExecutor(self.decode_workers)
+            encode_pool = ProcessPoolExecutor(self.encode_workers)
+            # Inicia os processos agora, a partir da thread principal: criar
+            # processos (fork) com as threads das etapas já rodando pode travar
+            for pool in (decode_pool, encode_pool):
+                pool.submit(os.getpid).result()
+
+        def decode(file_path):
+            self.processor.metrics.begin_file(file_path)
+            if self.processor.skip_if_cached(file_path):
+                with self.stats["decodificação"].lock:
+                    self.skipped += 1
+                return None, 0.0, True
+            # Só decodifica quando o arquivo cabe no orçamento de memória
+            self.budget.acquire(file_path, memory[file_path])
+            if decode_pool is not None:
+                shared = decode_pool.submit(load_mono_shared, file_path).result()
+                if shared is None:
+                    return None, 0.0, False
+                return (file_path, shared), shared.duration, True
+
+            loaded = load_mono(file_path)
+            if loaded is None:
+                return None, 0.0, False
+            audio_data, sr = loaded
+            return (file_path, (audio_data, sr)), len(audio_data) / sr, True
+
+        def analyze(item):
+            file_path, audio = item
+            length = audio.length if isinstance(audio, SharedAudio) else len(audio[0])
+            entry = self.processor.decided(file_path, length)
+            if entry is not None:
+                return (file_path, audio, entry['segments']), length / entry['sample_rate'], True
+
+            if isinstance(audio, SharedAudio):
+                try:
+                    segments = audio.apply(self.processor.analyze_audio, audio.sr)
+                except Exception:
+                    audio.unlink()
+                    raise
+                return (file_path, audio, segments), audio.duration, True
+
+            audio_data, sr = audio
+            segments = self.processor.analyze_audio(audio_data, sr)
+            return (file_path, audio, segments), len(audio_data) / sr, True
+
+        def encode(item):
+            file_path, audio, segments = item
+            if isinstance(audio, SharedAudio):
+                try:
+                    ok = encode_pool.submit(write_segments_shared, file_path, audio, segments).result()
+                finally:
+                    audio.unlink()
+                if ok:
+                    self.processor.record_cached(file_path, segments)
+                    self.processor.metrics.add(file_path, audio_seconds=audio.duration,
+                                               audio_seconds_removed=removed_seconds(audio.length, segments, audio.sr))
+                return None, audio.duration, ok
+
+            audio_data, sr = audio
+            ok = write_segments(file_path, audio_data, sr, segments)
+            if ok:
+                self.processor.record_cached(file_path, segments)
+                self.processor.metrics.add(file_path, audio_seconds=len(audio_data) / sr,
+                                           audio_seconds_removed=removed_seconds(len(audio_data), segments, sr))
+            return None, len(audio_data) / sr, ok
+
+        stages = [
+            ("decodificação", self.decode_workers, decode),
+            ("análise", self.analyze_workers, analyze),
+            ("codificação", self.encode_workers, encode),
+        ]
+        # A entrada é ilimitada (só caminhos); entre etapas as filas são limitadas
+        queues = [queue.Queue()] + [queue.Queue(maxsize=self.queue_size) for _ in stages[1:]] + [None]
+        self.stats = {name: StageStats(name, workers) for name, workers, _ in stages}
+        self.skipped = 0
+        jobs = self.processor.plan_jobs(file_paths)
+        memory = {job.path: self.processor.job_memory(job) for job in jobs}
+        self.budget = MemoryBudget(self.processor.memory_budget)
+
+        start_time = time.time()
+        threads = []
+        for index, (name, workers, handler) in enumerate(stages):
+            next_workers = stages[index + 1][1] if index + 1 < len(stages) else 0
+            for _ in range(workers):
+                thread = threading.Thread(
+                    target=self._stage_worker,
+                    args=(self.stats[name], queues[index], queues[index + 1], next_workers, handler),
+                    daemon=True,
+                )
+                thread.start()
+                threads.append(thread)
+
+        for job in jobs:
+            queues[0].put(job.path)
+        for _ in range(self.decode_workers):
+            queues[0].put(_STOP)
+
+        try:
+            for thread in threads:
+                thread.join()
+        finally:
+            for pool in (decode_pool, encode_pool):
+                if pool is not None:
+                    pool.shutdown()
+
+        elapsed_time = time.time() - start_time
+        self.print_report(elapsed_time)
+        return self.stats
+
+    def print_report(self, elapsed_time: float) -> None:
+        """Mostra a vazão de cada etapa e aponta o gargalo"""
+        encode_stats = self.stats["codificação"]
+        successful = encode_stats.items - encode_stats.failed
+        failed = sum(stats.failed for stats in self.stats.values())
+
+        print(f"\n🎉 Processamento concluído!")
+        print(f"   ⏱️  Tempo total: {elapsed_time:.1f}s")
+        print(f"   ✅ Sucessos: {successful}")
+        print(f"   ❌ Falhas: {failed}")
+        if self.skipped:
+            print(f"   ⏭️  Pulados (cache): {self.skipped}")
+        if self.budget.limit is not None:
+            print(f"   🧠 Pico de memória estimado: {format_bytes(self.budget.peak)} "
+                  f"(orçamento {format_bytes(self.budget.limit)})")
+        print(f"\n📊 Vazão por etapa:")
+        print(f"   {'Etapa':<15} {'Workers':<8} {'Arquivos/s':<11} {'Áudio (x)':<10} {'Ocupação':<9}")
+        for stats in self.stats.values():
+            summary = stats.as_dict()
+            print(f"   {stats.name:<15} {stats.workers:<8} {summary['files_per_second']:<11.2f} "
+                  f"{summary['audio_seconds_per_second']:<10.1f} {summary['utilization'] * 100:.0f}%")
+
+        busiest = max(self.stats.values(), key=lambda stats: stats.utilization)
+        if busiest.items:
+            print(f"   🐢 Gargalo provável: {busiest.name}")
+
+def parse_serve_address(address: str) -> Tuple[str, object]:
+    """
+    Endereço do servidor: 'PORTA' ou 'HOST:PORTA' em localhost (TCP), ou o
+    caminho de um socket Unix
+
+    Returns:
+        ('tcp', (host, porta)) ou ('unix', caminho)
+    """
+    host, _, port = address.rpartition(':')
+    if port.isdigit() and '/' not in address:
+        host = host.strip('[]') or '127.0.0.1'
+        if host not in ('127.0.0.1', 'localhost', '::1'):
+            raise ValueError(f"o servidor só escuta em localhost, não em {host}")
+        return 'tcp', (host, int(port))
+    return 'unix', address
+
+class ServerJob:
+    """Um pedido de um cliente: arquivos, progresso e a conexão para responder"""
+
+    def __init__(self, job_id, op: str, files: List[str], priority: int, writer):
+        self.id = job_id
+        self.op = op
+        self.files = files
+        self.priority = priority
+        self.writer = writer
+        self.pending = len(files)
+        self.ok = 0
+        self.failed = 0
+        self.started = time.perf_counter()
+
+    def send(self, message: Dict) -> None:
+        """Envia uma mensagem ao cliente (ignorada se ele já desconectou)"""
+        if self.writer.is_closing():
+            return
+        self.writer.write((json.dumps(dict(message, id=self.id)) + "\n").encode())
+
+    @property
+    def cancelled(self) -> bool:
+        return self.writer.is_closing()
+
+class TrimServer:
+    """
+    Servidor local de jobs de corte e análise (asyncio) sobre um
+    GPUAudioProcessor já carregado
+
+    Protocolo: uma mensagem JSON por linha, por socket Unix ou TCP em
+    localhost. O cliente envia {"id": ..., "op": "trim" | "analyze",
+    "files": [...], "priority": N} (menor sai primeiro; padrão 10) e recebe,
+    com o mesmo id, "queued", um "file" por arquivo concluído (com o
+    resultado) e "done" no fim; {"op": "status"} e {"op": "ping"} respondem
+    na hora. Vários jobs podem seguir pela mesma conexão.
+
+    Os arquivos de todos os jobs entram em uma fila de prioridade, e no
+    máximo max_workers unidades de trabalho rodam ao mesmo tempo. As
+    análises que estão na fila juntas, de qualquer cliente, viram um lote
+    só: decodificadas em paralelo e detectadas em uma chamada (analyze_decoded).
+    """
+
+    def __init__(self, processor: 'GPUAudioProcessor', max_workers: int = 4, batch_size: int = 16,
+                 batch_window: float = 0.02, max_queue: int = 10000):
+        self.processor = processor
+        self.max_workers = max_workers
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self.max_queue = max_queue
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.queue = None
+        self.slots = None
+        self.sequence = 0
+        self.running = set()
+
+    def enqueue(self, job: ServerJob) -> None:
+        for file_path in job.files:
+            self.sequence += 1
+            self.queue.put_nowait((job.priority, self.sequence, job, file_path))
+
+    async def handle_client(self, reader: 'asyncio.StreamReader', writer: 'asyncio.StreamWriter') -> None:
+        """Lê os pedidos de uma conexão até ela fechar"""
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                    op, priority = request.get('op'), int(request.get('priority', 10))
+                except (ValueError, TypeError, AttributeError):
+                    request, op, priority = {}, None, 10
+                job = ServerJob(request.get('id'), op, list(request.get('files') or []), priority, writer)
+                if op == 'ping':
+                    job.send({'event': 'pong'})
+                elif op == 'status':
+                    job.send({'event': 'status', 'queued': self.queue.qsize(),
+                              'running': len(self.running), 'workers': self.max_workers})
+                elif op in ('trim', 'analyze'):
+                    self.submit(job)
+                else:
+                    job.send({'event': 'error', 'message': f"pedido inválido (op: {op})"})
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    def submit(self, job: ServerJob) -> None:
+        """Valida e enfileira um job"""
+        missing = [file_path for file_path in job.files if not os.path.isfile(file_path)]
+        if not job.files or missing:
+            job.send({'event': 'error', 'message': f"arquivo(s) não encontrado(s): {', '.join(missing)}"
+                      if missing else "nenhum arquivo no job"})
+        elif self.queue.qsize() + len(job.files) > self.max_queue:
+            job.send({'event': 'error', 'message': f"fila cheia ({self.queue.qsize()} arquivo(s))"})
+        else:
+            job.send({'event': 'queued', 'files': len(job.files), 'position': self.queue.qsize()})
+            self.enqueue(job)
+
+    def finish(self, job: ServerJob, file_path: str, ok: bool, result: Optional[Dict] = None,
+               error: Optional[str] = None) -> None:
+        """Responde um arquivo concluído e, no último, o fim do job"""
+        job.pending -= 1
+        job.ok += ok
+        job.failed += not ok
+        message = {'event': 'file', 'file': file_path, 'ok': ok,
+                   'done': len(job.files) - job.pending, 'total': len(job.files)}
+        if result is not None:
+            message['result'] = result
+        if error is not None:
+            message['error'] = error
+        job.send(message)
+        if job.pending == 0:
+            job.send({'event': 'done', 'ok': job.ok, 'failed': job.failed,
+                      'seconds': round(time.perf_counter() - job.started, 4)})
+
+    def collect_analyses(self, first) -> List:
+        """
+        Junta à primeira as análises seguintes da fila, sem passar na frente de nada mais urgente
+
+        A fila sai em ordem de prioridade, então a coleta para no primeiro
+        corte: o que vem depois dele é menos urgente e fica para depois.
+        """
+        batch = [first]
+        while len(batch) < self.batch_size and not self.queue.empty():
+            entry = self.queue.get_nowait()
+            if entry[2].cancelled:
+                continue
+            if entry[2].op != 'analyze':
+                self.queue.put_nowait(entry)
+                break
+            batch.append(entry)
+        return batch
+
+    def decode(self, file_path: str) -> Tuple[os.stat_result, np.ndarray, int]:
+        stat = os.stat(file_path)
+        import librosa
+        audio_data, sr = librosa.load(file_path, sr=None, mono=True)
+        return stat, audio_data, sr
+
+    async def run_analyses(self, batch: List) -> None:
+        """Decodifica um lote de análises em paralelo e detecta tudo em uma chamada"""
+        import asyncio
+        loop = asyncio.get_running_loop()
+        decoded = await asyncio.gather(*(loop.run_in_executor(self.executor, self.decode, file_path)
+                                         for _, _, _, file_path in batch), return_exceptions=True)
+        ready = []
+        for entry, item in zip(batch, decoded):
+            if isinstance(item, Exception):
+                self.finish(entry[2], entry[3], False, error=str(item))
+            else:
+                ready.append((entry, item))
+        if not ready:
+            return
+        paths = [entry[3] for entry, _ in ready]
+        if len(ready) > 1:
+            clients = len({id(entry[2]) for entry, _ in ready})
+            print(f"📦 Lote de análise: {len(ready)} arquivo(s) de {clients} job(s)")
+        try:
+            results = await loop.run_in_executor(self.executor, self.processor.analyze_decoded,
+                                                 paths, [item for _, item in ready])
+        except Exception as e:
+            for entry, _ in ready:
+                self.finish(entry[2], entry[3], False, error=str(e))
+            return
+        for (entry, _), result in zip(ready, results):
+            self.finish(entry[2], entry[3], True, result=result)
+
+    async def run_trim(self, job: ServerJob, file_path: str) -> None:
+        import asyncio
+        loop = asyncio.get_running_loop()
+        try:
+            ok = await loop.run_in_executor(self.executor, self.processor.process_audio_file, file_path)
+        except Exception as e:
+            self.finish(job, file_path, False, error=str(e))
+        else:
+            self.finish(job, file_path, ok)
+
+    async def dispatch(self) -> None:
+        """Tira trabalho da fila enquanto houver worker livre"""
+        import asyncio
+        while True:
+            entry = await self.queue.get()
+            job, file_path = entry[2], entry[3]
+            if job.cancelled:
+                continue
+            await self.slots.acquire()
+            if job.op == 'analyze' and self.batch_size > 1:
+                if self.queue.empty():
+                    # Dá tempo de análises de outros clientes entrarem no mesmo lote
+                    await asyncio.sleep(self.batch_window)
+                batch = [entry for entry in self.collect_analyses(entry) if not entry[2].cancelled]
+                work = self.run_analyses(batch)
+            elif job.op == 'analyze':
+                work = self.run_analyses([entry])
+            else:
+                work = self.run_trim(job, file_path)
+            task = asyncio.create_task(work)
+            self.running.add(task)
+            task.add_done_callback(self.work_done)
+
+    def work_done(self, task: 'asyncio.Task') -> None:
+        self.running.discard(task)
+        self.slots.release()
+
+    async def serve(self, address: str) -> None:
+        """Atende até receber SIGINT/SIGTERM; o trabalho em andamento termina antes de sair"""
+        import asyncio
+        kind, target = parse_serve_address(address)
+        self.queue = asyncio.PriorityQueue()
+        self.slots = asyncio.Semaphore(self.max_workers)
+        # Linhas longas: um job pode listar milhares de arquivos
+        limit = 16 * 1024 * 1024
+        if kind == 'unix':
+            if os.path.exists(target) and stat_module.S_ISSOCK(os.stat(target).st_mode):
+                os.remove(target)  # Socket de uma execução anterior
+            server = await asyncio.start_unix_server(self.handle_client, path=target, limit=limit)
+        else:
+            server = await asyncio.start_server(self.handle_client, *target, limit=limit)
+
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, stop.set)
+        dispatcher = asyncio.create_task(self.dispatch())
+        print(f"🛰️  Servidor em {address if kind == 'unix' else '%s:%d' % target} "
+              f"({self.max_workers} workers, lotes de análise de até {self.batch_size}); Ctrl+C para encerrar")
+
+        async with server:
+            await stop.wait()
+        dispatcher.cancel()
+        if self.running:
+            print(f"⏳ Terminando {len(self.running)} trabalho(s) em andamento...")
+            await asyncio.gather(*self.running, return_exceptions=True)
+        self.executor.shutdown()
+        if kind == 'unix' and os.path.exists(target):
+            os.remove(target)
+        print("👋 Servidor encerrado")
+
+def submit_job(address: str, op: str, files: List[str], priority: int = 10,
+               job_id: Optional[str] = None) -> Iterator[Dict]:
+    """
+    Cliente simples do servidor --serve: envia um job e devolve as
+    mensagens dele até o "done" (ou um "error")
+
+    Args:
+        address: Endereço do servidor (ver parse_serve_address)
+        op: 'trim' ou 'analyze'
+        files: Caminhos dos arquivos, como o servidor os vê
+        priority: Prioridade do job (menor sai primeiro)
+        job_id: Identificador do job (padrão: aleatório)
+    """
+    kind, target = parse_serve_address(address)
+    family = socket.AF_UNIX if kind == 'unix' else socket.AF_INET6 if ':' in target[0] else socket.AF_INET
+    job_id = job_id or os.urandom(8).hex()
+    with socket.socket(family, socket.SOCK_STREAM) as connection:
+        connection.connect(target)
+        request = {'id': job_id, 'op': op, 'files': files, 'priority': priority}
+        connection.sendall((json.dumps(request) + "\n").encode())
+        with connection.makefile('rb') as stream:
+            for line in stream:
+                message = json.loads(line)
+                yield message
+                if message.get('event') in ('done', 'error'):
+                    return
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Lê as opções de linha de comando"""
+    parser = argparse.ArgumentParser(description="Remove silêncio do início e fim dos áudios da pasta 'audio/'")
+    parser.add_argument("--streaming", action="store_true",
+                        help="Lê e grava os arquivos em blocos, com memória limitada")
+    parser.add_argument("--block-size", type=int, default=None,
+                        help=f"Tamanho do bloco em frames no modo streaming "
+                             f"(padrão: perfil de ajuste ou {DEFAULT_BLOCK_SIZE})")
+    parser.add_argument("--remove-internal-silence", action="store_true",
+                        help="Também encurta pausas internas maiores que --min-silence")
+    parser.add_argument("--min-silence", type=float, default=1.0,
+                        help="Duração mínima (s) de uma pausa interna para ser encurtada (padrão: 1.0)")
+    parser.add_argument("--silence-gap", type=float, default=0.5,
+                        help="Silêncio (s) mantido no lugar de cada pausa encurtada (padrão: 0.5)")
+    parser.add_argument("--edge-scan", action="store_true",
+                        help="Analisa só o começo e o fim de cada arquivo (apenas silêncio das bordas)")
+    parser.add_argument("--batch-size", type=int, default=None,
+                        help="Agrupa N arquivos por detecção vetorizada (0 = um arquivo por thread; "
+                             "padrão: perfil de ajuste ou 0)")
+    parser.add_argument("--memory-budget", type=parse_size, default=default_memory_budget(),
+                        metavar="SIZE",
+                        help="Memória que os arquivos em processamento podem ocupar juntos, estimada "
+                             "pelos cabeçalhos, ex.: 4G, 512M; 0 = sem limite (padrão: metade da RAM)")
+    parser.add_argument("--order", choices=["longest", "input"], default="longest",
+                        help="Ordem de processamento: mais longos primeiro ou a ordem da pasta "
+                             "(padrão: longest)")
+    parser.add_argument("-r", "--recursive", action="store_true",
+                        help="Também processa os arquivos das subpastas (pastas ocultas ficam de fora)")
+    parser.add_argument("--include", action="append", default=[], metavar="GLOB",
+                        help="Só processa os arquivos cujo caminho relativo à pasta casa com o glob "
+                             "(ex.: '2023-*/*.wav'); pode repetir")
+    parser.add_argument("--exclude", action="append", default=[], metavar="GLOB",
+                        help="Ignora os arquivos (e pastas inteiras) cujo caminho relativo casa com o "
+                             "glob; pode repetir")
+    parser.add_argument("--lookahead", type=int, default=DEFAULT_LOOKAHEAD,
+                        help="Arquivos descobertos à frente do processamento, dentro dos quais os mais "
+                             f"longos vão primeiro (padrão: {DEFAULT_LOOKAHEAD})")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Threads de processamento (padrão: perfil de ajuste, ou 4 na GPU e 8 na CPU)")
+    parser.add_argument("--pipeline", action="store_true",
+                        help="Usa o pipeline em etapas (decodificação → análise → codificação)")
+    parser.add_argument("--decode-workers", type=int, default=None,
+                        help="Workers da etapa de decodificação no modo --pipeline "
+                             "(padrão: 2, ou o número de núcleos com --processes)")
+    parser.add_argument("--analyze-workers", type=int, default=1,
+                        help="Workers da etapa de análise no modo --pipeline (padrão: 1)")
+    parser.add_argument("--encode-workers", type=int, default=None,
+                        help="Workers da etapa de codificação no modo --pipeline "
+                             "(padrão: 2, ou o número de núcleos com --processes)")
+    parser.add_argument("--queue-size", type=int, default=4,
+                        help="Capacidade das filas entre etapas do pipeline (padrão: 4)")
+    parser.add_argument("--processes", action="store_true",
+                        help="Decodifica e codifica em processos separados, trocando o áudio por "
+                             "memória compartilhada (evita o GIL; implica --pipeline)")
+    parser.add_argument("--inplace-wav", action="store_true",
+                        help="Corta WAVs PCM no próprio arquivo, sem recodificar (mantém bits e canais)")
+    parser.add_argument("--stream-copy", action="store_true",
+                        help="Corta MP3/AAC/M4A por cópia de stream do ffmpeg, sem recodificar")
+    parser.add_argument("--cache", nargs="?", const=os.path.join("audio", ".silence-cache.sqlite"), default=None,
+                        help="Usa um cache de análises (SQLite) e pula arquivos já processados "
+                             "(padrão do caminho: audio/.silence-cache.sqlite)")
+    parser.add_argument("--journal", default=None, metavar="PATH",
+                        help="Diário de progresso: uma linha por arquivo concluído (padrão: "
+                             ".silence-journal.jsonl na pasta de entrada, audio ou a primeira de --watch; "
+                             "com --distributed, a pasta audio/.silence-journal.d; com --serve, na pasta atual)")
+    parser.add_argument("--no-journal", action="store_true",
+                        help="Não grava o diário de progresso")
+    parser.add_argument("--resume", action="store_true",
+                        help="Retoma um lote interrompido: pula os arquivos que o diário dá como "
+                             "concluídos com os mesmos parâmetros")
+    parser.add_argument("--watch", nargs="*", metavar="DIR",
+                        help="Fica rodando e processa cada arquivo novo das pastas (padrão: audio) "
+                             "assim que ele para de crescer; implica --resume")
+    parser.add_argument("--settle", type=float, default=5.0,
+                        help="Segundos sem mudar de tamanho para um arquivo ser processado no "
+                             "modo --watch (padrão: 5)")
+    parser.add_argument("--poll-interval", type=float, default=2.0,
+                        help="Intervalo (s) da varredura das pastas no modo --watch sem eventos (padrão: 2)")
+    parser.add_argument("--watch-poll", action="store_true",
+                        help="Usa só a varredura periódica, mesmo com o watchdog instalado")
+    parser.add_argument("--serve", metavar="ADDRESS",
+                        help="Fica rodando como servidor de jobs de corte/análise em um socket Unix "
+                             "(caminho) ou em localhost (PORTA ou HOST:PORTA)")
+    parser.add_argument("--serve-batch", type=int, default=16,
+                        help="Análises de clientes diferentes detectadas juntas, no máximo (padrão: 16)")
+    parser.add_argument("--serve-batch-window", type=float, default=20.0,
+                        help="Espera (ms) por outras análises antes de fechar um lote (padrão: 20)")
+    parser.add_argument("--serve-max-queue", type=int, default=10000,
+                        help="Arquivos na fila do servidor antes de recusar jobs (padrão: 10000)")
+    parser.add_argument("--distributed", action="store_true",
+                        help="Divide os arquivos com outros workers (processos ou máquinas) que usam a "
+                             "mesma pasta, por leases; implica --resume")
+    parser.add_argument("--lease-dir", default=os.path.join("audio", ".silence-leases"), metavar="PATH",
+                        help="Pasta das leases do modo --distributed (padrão: audio/.silence-leases)")
+    parser.add_argument("--lease-ttl", type=float, default=60.0,
+                        help="Segundos sem renovação para a lease de um worker ser considerada "
+                             "morta e retomada (padrão: 60)")
+    parser.add_argument("--worker-id", default=f"{platform.node()}-{os.getpid()}",
+                        help="Nome deste worker nas leases e no diário (padrão: host-pid)")
+    parser.add_argument("--cache-max-entries", type=int, default=100000,
+                        help="Número máximo de entradas no cache (padrão: 100000)")
+    parser.add_argument("--backend", choices=BACKENDS, default=None,
+                        help="Backend do envelope: torch (GPU), numba ou numpy; 'auto' escolhe "
+                             "torch com CUDA, senão numba (padrão: perfil de ajuste ou auto)")
+    parser.add_argument("--window-ms", type=float, default=None,
+                        help="Janela do envelope em ms (padrão: perfil de ajuste ou 100)")
+    parser.add_argument("--hop-divisor", type=int, default=None,
+                        help="Saltos por janela; o salto é a janela dividida por N "
+                             "(padrão: perfil de ajuste ou 4)")
+    parser.add_argument("--tuning-profile", default=DEFAULT_PROFILE_PATH, metavar="PATH",
+                        help="Perfil gerado por `check_system.py --autotune` "
+                             f"(padrão: {DEFAULT_PROFILE_PATH})")
+    parser.add_argument("--no-tuning-profile", action="store_true",
+                        help="Ignora o perfil de ajuste e usa os padrões fixos")
+    parser.add_argument("--analyze-only", action="store_true",
+                        help="Só decide os cortes e grava o relatório (--report); nenhum áudio é regravado")
+    parser.add_argument("--report", default="silence_report.json", metavar="PATH",
+                        help="Relatório do modo --analyze-only: .json, .jsonl ou .csv "
+                             "(padrão: silence_report.json)")
+    parser.add_argument("--apply", metavar="REPORT",
+                        help="Corta os arquivos listados em um relatório de --analyze-only, sem "
+                             "analisar de novo (arquivos alterados desde então são reanalisados)")
+    parser.add_argument("--metrics-jsonl", metavar="PATH",
+                        help="Grava uma linha JSON por arquivo com tempos por etapa e contadores")
+    parser.add_argument("--metrics-prom", metavar="PATH",
+                        help="Grava os totais no formato texto do Prometheus (textfile collector)")
+    parser.add_argument("--profile", metavar="PATH",
+                        help="Roda as threads de processamento sob cProfile e grava o perfil (pstats)")
+    args = parser.parse_args(argv)
+    if args.analyze_only and args.apply:
+        parser.error("--analyze-only e --apply não podem ser usados juntos")
+    if (args.resume or args.distributed) and args.no_journal:
+        parser.error("--resume e --distributed precisam do diário (remova --no-journal)")
+    if args.watch is not None and (args.analyze_only or args.apply or args.distributed
+                                   or args.pipeline or args.processes):
+        parser.error("--watch processa um arquivo por thread; não combina com --analyze-only, "
+                     "--apply, --distributed, --pipeline ou --processes")
+    if args.serve and (args.watch is not None or args.analyze_only or args.apply or args.distributed
+                       or args.pipeline or args.processes):
+        parser.error("--serve não combina com --watch, --analyze-only, --apply, --distributed, "
+                     "--pipeline ou --processes (o tipo de job vem de cada pedido)")
+    if args.serve:
+        try:
+            parse_serve_address(args.serve)
+        except ValueError as e:
+            parser.error(str(e))
+    if args.lookahead < 1:
+        parser.error("--lookahead precisa ser pelo menos 1")
+    if args.watch == []:
+        args.watch = ["audio"]
+    if args.distributed and (args.analyze_only or args.pipeline or args.processes):
+        parser.error("--distributed processa um arquivo por thread; não combina com "
+                     "--analyze-only, --pipeline ou --processes")
+    if args.journal is None:
+        # Ao lado das entradas; no --serve elas vêm dos clientes, de qualquer pasta
+        input_dir = os.curdir if args.serve else args.watch[0] if args.watch else "audio"
+        args.journal = os.path.join(input_dir, ".silence-journal.d" if args.distributed
+                                    else ".silence-journal.jsonl")
+    # O nome do worker vira nome de arquivo no diário compartilhado
+    args.worker_id = "".join(char if char.isalnum() or char in "-_." else "_" for char in args.worker_id)
+
+    # Linha de comando > perfil de ajuste da máquina > padrões fixos
+    profile = {} if args.no_tuning_profile else load_tuning_profile(args.tuning_profile)
+    # O lote vetorizado lê e grava cada arquivo inteiro: o batch_size do perfil não
+    # pode desviar os modos que têm caminho próprio de leitura ou gravação
+    if args.inplace_wav or args.stream_copy or args.streaming or args.edge_scan:
+        profile.pop('batch_size', None)
+    if profile:
+        print(f"🎛️  Perfil de ajuste: {', '.join(f'{key}={value}' for key, value in profile.items())}")
+    defaults = {'backend': 'auto', 'workers': None, 'batch_size': 0, 'block_size': DEFAULT_BLOCK_SIZE,
+                'window_ms': 100.0, 'hop_divisor': 4}
+    for key, default in defaults.items():
+        if getattr(args, key) is None:
+            setattr(args, key, profile.get(key, default))
+    return args
+
+def trim_silence_from_audio(argv: Optional[List[str]] = None):
     """Função principal otimizada para GPU"""
+    args = parse_args(argv)
     audio_dir = "audio"
     
-    if not os.path.exists(audio_dir):
+    decisions = {}
+    if args.serve:
+        # Os arquivos chegam depois, nos pedidos dos clientes
+        audio_files = []
+    elif args.watch is not None:
+        # Os arquivos chegam depois, pelo FolderWatcher
+        audio_files = []
+        for directory in args.watch:
+            if not os.path.isdir(directory):
+                print(f"❌ Pasta '{directory}' não encontrada!")
+                return
+    elif not os.path.exists(audio_dir):
         print(f"❌ Pasta '{audio_dir}' não encontrada!")
         return
+    elif args.apply:
+        # Os arquivos vêm do relatório, com os cortes já decididos
+        decisions = {entry['file']: entry for entry in load_report(args.apply)}
+        audio_files = [path for path in decisions if os.path.exists(path)]
+        missing = len(decisions) - len(audio_files)
+        print(f"📋 Relatório {args.apply}: {len(decisions)} arquivo(s)"
+              + (f", {missing} não encontrado(s)" if missing else ""))
+    else:
+        # Encontra arquivos de áudio, entregando cada um assim que aparece
+        audio_files = discover_audio_files([audio_dir], args.recursive,
+                                           InputFilter(args.include, args.exclude))
+        first = next(audio_files, None)
+        audio_files = [] if first is None else itertools.chain([first], audio_files)
+        if not streams_input(args):
+            # Estes modos dividem ou agrupam o lote inteiro
+            audio_files = list(audio_files)
 
-    # Extensões suportadas (librosa suporta mais formatos)
-    audio_extensions = ['.wav', '.mp3', '.m4a', '.flac', '.ogg', '.aac', '.wma']
-
-    # Encontra arquivos de áudio
-    audio_files = []
-    for file in os.listdir(audio_dir):
-        if any(file.lower().endswith(ext) for ext in audio_extensions):
-            audio_files.append(os.path.join(audio_dir, file))
-    
-    if not audio_files:
+    if not audio_files and args.watch is None and not args.serve:
         print(f"❌ Nenhum arquivo de áudio encontrado na pasta '{audio_dir}'!")
         return
     
-    print(f"🎵 Encontrados {len(audio_files)} arquivo(s) de áudio:")
-    for file_path in audio_files:
-        filename = os.path.basename(file_path)
-        print(f"   • {filename}")
+    if args.resume and not args.distributed:
+        # Temporários de gravações interrompidas: o original ao lado está intacto
+        # (no modo distribuído podem ser gravações em andamento de outro worker)
+        cleaned = remove_stale_temps(audio_files)
+        audio_files = list(cleaned) if isinstance(audio_files, list) else cleaned
+
+    if isinstance(audio_files, list) and audio_files:
+        print(f"🎵 Encontrados {len(audio_files)} arquivo(s) de áudio:")
+        for file_path in audio_files:
+            filename = os.path.basename(file_path)
+            print(f"   • {filename}")
+    elif audio_files:
+        print(f"🔎 Procurando arquivos de áudio em '{audio_dir}'"
+              f"{' e subpastas' if args.recursive else ''}; o processamento começa conforme são encontrados")
 
     # Configura processador GPU
     processor = GPUAudioProcessor(
         silence_threshold_db=-40,  # Ajuste conforme necessário
-        min_silence_duration=1.0   # 1 segundo
+        min_silence_duration=args.min_silence,  # 1 segundo por padrão
+        streaming=args.streaming,
+        block_size=args.block_size,
+        remove_internal_silence=args.remove_internal_silence,
+        silence_gap=args.silence_gap,
+        edge_scan=args.edge_scan,
+        inplace_wav=args.inplace_wav,
+        stream_copy=args.stream_copy,
+        cache=AnalysisCache(args.cache, max_entries=args.cache_max_entries) if args.cache else None,
+        metrics=(Metrics(args.metrics_jsonl, args.metrics_prom, args.profile)
+                 if args.metrics_jsonl or args.metrics_prom or args.profile else None),
+        backend=args.backend,
+        window_duration=args.window_ms / 1000,
+        hop_divisor=args.hop_divisor,
+        memory_budget=args.memory_budget,
+        job_order=args.order,
+        journal=(None if args.no_journal else
+                 ProgressJournal(args.journal, writer=args.worker_id if args.distributed else None)),
+        resume=args.resume or args.distributed or args.watch is not None,
+        lookahead=args.lookahead
     )
+    processor.decisions = decisions
     
+    # Com a descoberta em andamento e nos modos --watch e --serve, os arquivos
+    # ainda vão chegar: o limite é só o de workers
+    file_count = len(audio_files) if isinstance(audio_files, list) and args.watch is None \
+        and not args.serve else sys.maxsize
+
     # Determina número de workers baseado na GPU
-    if torch.cuda.is_available():
-        # Para GPU, usa menos workers para evitar sobrecarga de memória
-        max_workers = min(4, len(audio_files))
+    if args.workers:
+        max_workers = min(args.workers, file_count)
+    elif gpu_expected(args.backend):
+        # Para GPU, usa menos workers para evitar sobrecarga de memória (decidido sem
+        # criar o backend, que só é criado se algum arquivo precisar de detecção)
+        max_workers = min(4, file_count)
     else:
         # Para CPU, pode usar mais workers
-        max_workers = min(8, len(audio_files))
+        max_workers = min(8, file_count)
     
     # Processa arquivos em paralelo
-    processor.process_batch_parallel(audio_files, max_workers=max_workers)
+    try:
+        run_processing(processor, audio_files, args, max_workers)
+    finally:
+        processor.metrics.close()
+        if processor.journal is not None:
+            processor.journal.close()
+
+def streams_input(args: argparse.Namespace) -> bool:
+    """Se o modo escolhido consome os arquivos conforme são descobertos (sem a lista inteira)"""
+    return not (args.distributed or args.pipeline or args.processes or args.batch_size > 0)
+
+def run_processing(processor: GPUAudioProcessor, audio_files: Iterable[str],
+                   args: argparse.Namespace, max_workers: int) -> None:
+    """Processa os arquivos no modo escolhido na linha de comando"""
+    if args.serve:
+        import asyncio
+        processor.warm_up()
+        server = TrimServer(processor, max_workers=max_workers, batch_size=args.serve_batch,
+                            batch_window=args.serve_batch_window / 1000, max_queue=args.serve_max_queue)
+        asyncio.run(server.serve(args.serve))
+    elif args.watch is not None:
+        watcher = FolderWatcher(args.watch, InputFilter(args.include, args.exclude), settle=args.settle,
+                                poll_interval=args.poll_interval, use_events=not args.watch_poll,
+                                recursive=args.recursive)
+        # Ctrl+C / SIGTERM: para de aceitar arquivos e termina os que estão em andamento
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: watcher.stop())
+        processor.process_watch(watcher, max_workers=max_workers)
+    elif args.distributed:
+        leases = LeaseManager(args.lease_dir, args.worker_id, ttl=args.lease_ttl)
+        processor.process_batch_distributed(audio_files, leases, max_workers=max_workers)
+    elif args.analyze_only:
+        params = dict(processor.detection_params, edge_scan=processor.edge_scan)
+        report = AnalysisReport(args.report, params)
+        processor.analyze_batch(audio_files, report, max_workers=max_workers)
+        report.close()
+        print(f"📋 Relatório salvo em {args.report}")
+    elif args.pipeline or args.processes:
+        # Em processos, cada núcleo pode decodificar/codificar sem disputar o GIL
+        default_workers = (os.cpu_count() or 2) if args.processes else 2
+        pipeline = StagedPipeline(
+            processor,
+            decode_workers=args.decode_workers or default_workers,
+            analyze_workers=args.analyze_workers,
+            encode_workers=args.encode_workers or default_workers,
+            queue_size=args.queue_size,
+            use_processes=args.processes
+        )
+        pipeline.run(audio_files)
+    elif args.batch_size > 0:
+        processor.process_batch_vectorized(audio_files, batch_size=args.batch_size, max_workers=max_workers)
+    else:
+        processor.process_batch_parallel(audio_files, max_workers=max_workers)
 
 if __name__ == "__main__":
     trim_silence_from_audio()
\ No newline at end of file
@@ -0,0 +1,46 @@
+"""
+Kernels Numba do detector de silêncio (usados pelo backend 'numba' de
+manage-silence.py)
+
+Ficam em um módulo separado para o cache de compilação em disco
+(cache=True) funcionar: o Numba reimporta o módulo do kernel pelo nome ao
+ler o cache, e manage-silence.py roda com nomes diferentes conforme é
+chamado.
+"""
+
+import numba
+import numpy as np
+
+@numba.njit(cache=True, nogil=True)
+def window_energy_kernel(audio, window_size, hop_length, out):
+    """
+    Média dos quadrados de cada janela em uma passada pelas amostras
+
+    Mesma soma acumulada sequencial em float64 de window_energy (NumPy),
+    então o resultado é idêntico bit a bit, mas guarda só a soma corrente e,
+    por janela, a soma no seu início: memória O(janelas), não O(amostras).
+
+    Args:
+        audio: Áudio mono (1D)
+        window_size: Tamanho da janela em amostras
+        hop_length: Salto entre janelas em amostras
+        out: Saída float64 com uma posição por janela (len(audio) // hop_length + 1)
+    """
+    num_samples = audio.shape[0]
+    count = out.shape[0]
+    lower = np.empty(count, dtype=np.float64)
+    total = 0.0
+    next_start = 0
+    next_end = 0
+    for k in range(num_samples + 1):
+        # Janelas que começam em k: guarda a soma até aqui
+        while next_start < count and next_start * hop_length == k:
+            lower[next_start] = total
+            next_start += 1
+        # Janelas que terminam em k (as do fim são cortadas no fim do áudio)
+        while next_end < count and min(next_end * hop_length + window_size, num_samples) == k:
+            out[next_end] = (total - lower[next_end]) / window_size
+            next_end += 1
+        if k < num_samples:
+            value = np.float64(audio[k])
+            total += value * value
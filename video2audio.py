@@ -1,58 +1,329 @@
 import os
-from pydub import AudioSegment
-from pydub.silence import detect_nonsilent
-
-def convert_videos_to_audio():
-    video_dir = r"D:\shorts-igreja\to-do podcasts"
-    audio_dir = r"D:\shorts-igreja\podcasts-done"
-    silence_threshold = -40  # dBFS (ajuste conforme necessário)
-    min_silence_len = 1000   # ms (1 segundo)
-    
+import sys
+import struct
+import wave
+import argparse
+import subprocess
+import threading
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import BinaryIO, Iterator, List, Optional, Tuple
+
+# Tamanho dos pedaços lidos do pipe do ffmpeg (bytes)
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+VIDEO_EXTENSIONS = {'.mp4', '.avi', '.mov', '.mkv', '.wmv', '.flv', '.webm'}
+
+# Formatos de saída do modo --trim: (formato soundfile, subtipo)
+OUTPUT_FORMATS = {
+    'wav': ('WAV', 'PCM_16'),
+    'flac': ('FLAC', 'PCM_16'),
+    'ogg': ('OGG', 'VORBIS'),
+}
+
+print_lock = threading.Lock()
+
+def log(message: str) -> None:
+    """Print que não se mistura com o de outros jobs"""
+    with print_lock:
+        print(message)
+
+def read_exact(stream: BinaryIO, size: int) -> bytes:
+    """Lê exatamente `size` bytes do pipe (ou menos, se ele terminar)"""
+    data = b''
+    while len(data) < size:
+        chunk = stream.read(size - len(data))
+        if not chunk:
+            break
+        data += chunk
+    return data
+
+def read_wav_stream_header(stream: BinaryIO) -> Tuple[int, int, int]:
+    """
+    Lê o cabeçalho WAV que o ffmpeg escreve no pipe, até o início dos dados
+
+    Em um pipe o ffmpeg não sabe o tamanho final, então os campos de tamanho
+    do RIFF e do chunk de dados são ignorados: os dados vão até o fim do pipe.
+
+    Returns:
+        Tuple com (canais, taxa de amostragem, bytes por amostra)
+    """
+    header = read_exact(stream, 12)
+    if len(header) < 12 or header[:4] != b'RIFF' or header[8:12] != b'WAVE':
+        raise RuntimeError("ffmpeg não produziu um stream WAV válido")
+
+    fmt = None
+    while True:
+        chunk_header = read_exact(stream, 8)
+        if len(chunk_header) < 8:
+            raise RuntimeError("stream WAV terminou antes dos dados")
+        chunk_id, chunk_size = struct.unpack('<4sI', chunk_header)
+        if chunk_id == b'data':
+            break
+        body = read_exact(stream, chunk_size + (chunk_size & 1))
+        if chunk_id == b'fmt ':
+            fmt = body
+
+    if fmt is None:
+        raise RuntimeError("stream WAV sem chunk 'fmt '")
+    _, channels, sample_rate, _, block_align, _ = struct.unpack('<HHIIHH', fmt[:16])
+    return channels, sample_rate, block_align // channels
+
+def iter_frames(stream: BinaryIO, chunk_size: int, frame_size: int) -> Iterator[bytes]:
+    """Lê o pipe em pedaços contendo apenas frames completos"""
+    pending = b''
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        # O resto de um frame incompleto espera o próximo pedaço
+        data = pending + chunk
+        usable = len(data) - len(data) % frame_size
+        pending = data[usable:]
+        if usable:
+            yield data[:usable]
+
+def load_silence_module():
+    """Carrega manage-silence.py (o hífen no nome impede um import normal)"""
+    if 'manage_silence' in sys.modules:
+        return sys.modules['manage_silence']
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'manage-silence.py')
+    spec = importlib.util.spec_from_file_location('manage_silence', path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules['manage_silence'] = module
+    spec.loader.exec_module(module)
+    return module
+
+def ffmpeg_audio_command(video_path: str) -> List[str]:
+    """Comando ffmpeg que decodifica a trilha de áudio para WAV PCM 16 bits no stdout"""
+    return [
+        'ffmpeg', '-hide_banner', '-nostats', '-loglevel', 'error',
+        '-i', video_path, '-vn', '-map', '0:a:0', '-map_metadata', '-1',
+        '-acodec', 'pcm_s16le', '-f', 'wav', 'pipe:1',
+    ]
+
+def extract_audio(video_path: str, audio_path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> float:
+    """
+    Extrai a trilha de áudio de um vídeo para WAV, em streaming
+
+    O PCM sai do ffmpeg por um pipe e é gravado pedaço a pedaço, então a
+    memória por job é constante, independente da duração do vídeo. O
+    arquivo só aparece com o nome final depois de completo.
+
+    Args:
+        video_path: Caminho do vídeo
+        audio_path: Caminho do WAV de saída
+        chunk_size: Tamanho dos pedaços lidos do pipe, em bytes
+
+    Returns:
+        Duração do áudio extraído em segundos
+    """
+    temp_path = audio_path + ".part"
+    process = subprocess.Popen(ffmpeg_audio_command(video_path), stdout=subprocess.PIPE,
+                               stderr=subprocess.PIPE)
+    try:
+        channels, sample_rate, sample_width = read_wav_stream_header(process.stdout)
+        frame_size = channels * sample_width
+        frames = 0
+
+        with wave.open(temp_path, 'wb') as output:
+            output.setnchannels(channels)
+            output.setsampwidth(sample_width)
+            output.setframerate(sample_rate)
+
+            for data in iter_frames(process.stdout, chunk_size, frame_size):
+                output.writeframesraw(data)
+                frames += len(data) // frame_size
+
+        stderr = process.stderr.read().decode(errors='replace').strip()
+        if process.wait() != 0:
+            raise RuntimeError(f"ffmpeg falhou: {stderr}")
+
+        os.replace(temp_path, audio_path)
+        return frames / sample_rate
+
+    except Exception as e:
+        process.kill()
+        process.wait()
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        stderr = process.stderr.read().decode(errors='replace').strip()
+        if stderr:
+            raise RuntimeError(f"ffmpeg falhou: {stderr}") from e
+        raise
+
+    finally:
+        process.stdout.close()
+        process.stderr.close()
+
+def extract_trimmed_audio(video_path: str, audio_path: str, processor,
+                          output_format: str = 'wav',
+                          chunk_size: int = DEFAULT_CHUNK_SIZE) -> Tuple[float, float]:
+    """
+    Extrai o áudio de um vídeo já sem silêncio, em uma única passada
+
+    O PCM do ffmpeg passa direto pelo StreamingTrimmer de manage-silence.py:
+    o envelope é calculado enquanto o áudio chega e só o trecho mantido é
+    codificado no formato final, sem WAV intermediário em disco. Como no
+    manage-silence.py, se sobrariam menos de 0.1s (ou nenhum som), o áudio
+    é mantido inteiro: o vídeo é lido de novo, sem corte.
+
+    Args:
+        video_path: Caminho do vídeo
+        audio_path: Caminho do arquivo de saída
+        processor: GPUAudioProcessor com os parâmetros de detecção (None
+            converte o áudio inteiro para o formato, sem corte)
+        output_format: Chave de OUTPUT_FORMATS
+        chunk_size: Tamanho dos pedaços lidos do pipe, em bytes
+
+    Returns:
+        Tuple com (duração original, duração mantida) em segundos
+    """
+    import soundfile as sf
+    import numpy as np
+
+    silence = load_silence_module()
+    container, subtype = OUTPUT_FORMATS[output_format]
+    temp_path = audio_path + ".part"
+    process = subprocess.Popen(ffmpeg_audio_command(video_path), stdout=subprocess.PIPE,
+                               stderr=subprocess.PIPE)
+    try:
+        channels, sample_rate, sample_width = read_wav_stream_header(process.stdout)
+
+        frames = 0
+        with sf.SoundFile(temp_path, 'w', sample_rate, channels, subtype,
+                          format=container) as output:
+            trimmer = silence.StreamingTrimmer(processor, sample_rate, output) if processor else None
+            for data in iter_frames(process.stdout, chunk_size, channels * sample_width):
+                block = np.frombuffer(data, dtype=np.int16).reshape(-1, channels)
+                if trimmer is not None:
+                    trimmer.feed(block)
+                else:
+                    output.write(block)
+                frames += len(block)
+            kept = trimmer.finish() if trimmer is not None else frames
+
+        stderr = process.stderr.read().decode(errors='replace').strip()
+        if process.wait() != 0:
+            raise RuntimeError(f"ffmpeg falhou: {stderr}")
+
+        if trimmer is not None and kept / sample_rate < 0.1:  # Se muito curto, mantém original
+            os.remove(temp_path)
+            log(f"  ⚠️  {os.path.basename(video_path)}: áudio muito curto após remoção, mantendo original")
+            duration, _ = extract_trimmed_audio(video_path, audio_path, None, output_format, chunk_size)
+            return duration, duration
+
+        os.replace(temp_path, audio_path)
+        return frames / sample_rate, kept / sample_rate
+
+    except Exception as e:
+        process.kill()
+        process.wait()
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        stderr = process.stderr.read().decode(errors='replace').strip()
+        if stderr:
+            raise RuntimeError(f"ffmpeg falhou: {stderr}") from e
+        raise
+
+    finally:
+        process.stdout.close()
+        process.stderr.close()
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Lê as opções de linha de comando"""
+    parser = argparse.ArgumentParser(description="Extrai a trilha de áudio de vídeos para WAV")
+    parser.add_argument("--input-dir", default="video",
+                        help="Pasta com os vídeos (padrão: video)")
+    parser.add_argument("--output-dir", default="audio",
+                        help="Pasta onde os WAVs serão salvos (padrão: audio)")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1,
+                        help="Número de vídeos extraídos em paralelo (padrão: número de núcleos)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f"Tamanho dos pedaços lidos do ffmpeg em bytes (padrão: {DEFAULT_CHUNK_SIZE})")
+    parser.add_argument("--trim", action="store_true",
+                        help="Remove o silêncio durante a extração, sem WAV intermediário")
+    parser.add_argument("--format", choices=sorted(OUTPUT_FORMATS), default="wav",
+                        help="Formato de saída do modo --trim (padrão: wav)")
+    parser.add_argument("--threshold-db", type=float, default=-40,
+                        help="Limite de silêncio em dB para --trim (padrão: -40)")
+    parser.add_argument("--remove-internal-silence", action="store_true",
+                        help="Com --trim, também encurta pausas longas no meio do áudio")
+    parser.add_argument("--min-silence", type=float, default=1.0,
+                        help="Duração mínima (s) de uma pausa interna para ser removida (padrão: 1.0)")
+    parser.add_argument("--silence-gap", type=float, default=0.5,
+                        help="Silêncio (s) mantido no lugar de cada pausa removida (padrão: 0.5)")
+    return parser.parse_args(argv)
+
+def convert_videos_to_audio(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+    video_dir = args.input_dir
+    audio_dir = args.output_dir
+
     if not os.path.exists(video_dir):
         print(f"Pasta '{video_dir}' não encontrada!")
         return
-    
+
     if not os.path.exists(audio_dir):
         os.makedirs(audio_dir)
         print(f"Pasta '{audio_dir}' criada.")
-    
-    video_extensions = ['.mp4', '.avi', '.mov', '.mkv', '.wmv', '.flv', '.webm']
-    
+
     video_files = []
-    for file in os.listdir(video_dir):
-        if any(file.lower().endswith(ext) for ext in video_extensions):
+    for file in sorted(os.listdir(video_dir)):
+        if os.path.splitext(file)[1].lower() in VIDEO_EXTENSIONS:
             video_files.append(file)
-    
+
     if not video_files:
         print(f"Nenhum arquivo de vídeo encontrado na pasta '{video_dir}'!")
         return
-    
-    print(f"Encontrados {len(video_files)} arquivo(s) de vídeo para processar:")
+
+    print(f"Encontrados {len(video_files)} arquivo(s) de vídeo para processar "
+          f"({args.jobs} em paralelo):")
     for file in video_files:
         print(f"  - {file}")
-    
-    for i, video_file in enumerate(video_files, 1):
-        try:
-            print(f"\n[{i}/{len(video_files)}] Processando: {video_file}")
-            
-            video_path = os.path.join(video_dir, video_file)
-            
-            audio_filename = os.path.splitext(video_file)[0] + ".wav"
-            audio_path = os.path.join(audio_dir, audio_filename)
-            
-            print(f"  Extraindo áudio de: {video_file}")
-            audio = AudioSegment.from_file(video_path)
-
-            print(f"  Salvando áudio como: {audio_filename}")
-            audio.export(audio_path, format="wav")
-            
-            print(f"  ✓ Concluído: {audio_filename}")
-            
-        except Exception as e:
-            print(f"  ✗ Erro ao processar {video_file}: {str(e)}")
-            continue
-    
+
+    processor = None
+    if args.trim:
+        processor = load_silence_module().GPUAudioProcessor(
+            silence_threshold_db=args.threshold_db,
+            min_silence_duration=args.min_silence,
+            remove_internal_silence=args.remove_internal_silence,
+            silence_gap=args.silence_gap,
+        )
+
+    def convert(video_file: str) -> float:
+        video_path = os.path.join(video_dir, video_file)
+        extension = "." + args.format if args.trim else ".wav"
+        audio_filename = os.path.splitext(video_file)[0] + extension
+        audio_path = os.path.join(audio_dir, audio_filename)
+
+        log(f"  Extraindo áudio de: {video_file}")
+        if processor is not None:
+            duration, kept = extract_trimmed_audio(video_path, audio_path, processor,
+                                                   args.format, args.chunk_size)
+            log(f"  ✓ Concluído: {audio_filename} ({duration:.1f}s → {kept:.1f}s, "
+                f"{duration - kept:.1f}s de silêncio removidos)")
+            return kept
+        duration = extract_audio(video_path, audio_path, args.chunk_size)
+        log(f"  ✓ Concluído: {audio_filename} ({duration:.1f}s de áudio)")
+        return duration
+
+    failed = 0
+    with ThreadPoolExecutor(max_workers=args.jobs) as executor:
+        # O trabalho pesado roda nos processos do ffmpeg; as threads só copiam o pipe
+        futures = {executor.submit(convert, video_file): video_file for video_file in video_files}
+        for i, future in enumerate(as_completed(futures), 1):
+            video_file = futures[future]
+            try:
+                future.result()
+            except Exception as e:
+                failed += 1
+                log(f"  ✗ Erro ao processar {video_file}: {str(e)}")
+            log(f"[{i}/{len(video_files)}] {video_file}")
+
     print(f"\n🎉 Processamento concluído! Arquivos de áudio salvos na pasta '{audio_dir}'.")
+    if failed:
+        print(f"   ✗ Falhas: {failed}")
 
 if __name__ == "__main__":
-    convert_videos_to_audio()
\ No newline at end of file
+    convert_videos_to_audio()